@@ -0,0 +1,222 @@
+"""Per-caller admission control for the search endpoints."""
+import threading
+from typing import Dict, Any, Optional
+from config import Config
+from rate_limiter import TokenBucket
+
+
+class AdmissionRejected(Exception):
+    """Raised when a caller has to back off before sending more work."""
+    
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class CallerState:
+    """Concurrency and cost budget of one caller."""
+    
+    def __init__(self, cost_rate: float, cost_burst: float):
+        """Initialize an idle caller with a full cost budget."""
+        self.budget = TokenBucket(cost_rate, cost_burst)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.cost = 0.0
+        self.released = threading.Condition()
+
+
+class AdmissionTicket:
+    """An admitted request, released when the request ends."""
+    
+    def __init__(self, caller: str, state: CallerState, cost: float):
+        self.caller = caller
+        self.state = state
+        self.cost = cost
+
+
+class AdmissionController:
+    """
+    Per-caller concurrency limits and cost-weighted request budgets.
+    
+    Each caller (API key, token or client address) may run up to
+    ``max_concurrent`` requests at once; further requests wait up to
+    ``queue_timeout`` seconds for a slot, at most ``max_queue`` of them per
+    caller. Every request is also charged its estimated cost (participants
+    × days) against a token bucket refilling at ``cost_rate`` per second up
+    to ``cost_burst``; requests that fail on the server side get their cost
+    back. A request that finds the queue full, its wait over or the budget
+    spent is rejected at once with the seconds to wait.
+    
+    State is kept per process, so with several workers each worker
+    enforces the limits on the requests it serves.
+    """
+    
+    # Idle callers with a full budget are forgotten past this many callers
+    MAX_TRACKED_CALLERS = 10000
+    
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        cost_rate: float = 500,
+        cost_burst: float = 5000,
+        max_queue: int = 8,
+        queue_timeout: float = 2.0
+    ):
+        """
+        Initialize the controller.
+        
+        Args:
+            max_concurrent: Requests a caller may run at once
+            cost_rate: Participant-days a caller is granted per second
+            cost_burst: Participant-days a caller may spend at once
+            max_queue: Requests a caller may have waiting for a slot
+            queue_timeout: Seconds a request waits for a slot
+        """
+        self.max_concurrent = max_concurrent
+        self.cost_rate = cost_rate
+        self.cost_burst = cost_burst
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.callers: Dict[str, CallerState] = {}
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+    
+    def _state(self, caller: str) -> CallerState:
+        with self._lock:
+            state = self.callers.get(caller)
+            if state is None:
+                if len(self.callers) >= self.MAX_TRACKED_CALLERS:
+                    self._forget_idle()
+                state = self.callers[caller] = CallerState(self.cost_rate, self.cost_burst)
+            return state
+    
+    def _forget_idle(self):
+        for caller, state in list(self.callers.items()):
+            if state.in_flight == 0 and state.queued == 0 and state.budget.is_full():
+                del self.callers[caller]
+    
+    def admit(self, caller: str, cost: float, max_wait: Optional[float] = None) -> AdmissionTicket:
+        """
+        Admit a request or reject it.
+        
+        Args:
+            caller: Caller identity
+            cost: Estimated cost in participant-days
+            max_wait: Seconds the request can wait for a slot at most, e.g.
+                until its deadline (queue_timeout if None or longer)
+        
+        Returns:
+            Ticket to pass to release() when the request ends
+        
+        Raises:
+            AdmissionRejected: With the seconds the caller should wait
+        """
+        state = self._state(caller)
+        
+        with state.released:
+            if state.in_flight >= self.max_concurrent:
+                if state.queued >= self.max_queue:
+                    state.rejected += 1
+                    raise AdmissionRejected('Too many concurrent requests', self.queue_timeout)
+                state.queued += 1
+                self._observe_queue_depth()
+                timeout = self.queue_timeout if max_wait is None else max(min(self.queue_timeout, max_wait), 0)
+                try:
+                    waited = state.released.wait_for(
+                        lambda: state.in_flight < self.max_concurrent, timeout
+                    )
+                finally:
+                    state.queued -= 1
+                if not waited:
+                    state.rejected += 1
+                    raise AdmissionRejected('Too many concurrent requests', self.queue_timeout)
+            
+            retry_after = state.budget.try_acquire(cost)
+            if retry_after:
+                state.rejected += 1
+                raise AdmissionRejected('Request budget exhausted', retry_after)
+            
+            state.in_flight += 1
+            state.admitted += 1
+            state.cost += cost
+        return AdmissionTicket(caller, state, cost)
+    
+    def charge(self, ticket: AdmissionTicket, cost: float):
+        """Charge an admitted request for cost found later, e.g. expanded groups."""
+        if cost <= 0:
+            return
+        ticket.state.budget.charge(cost)
+        with ticket.state.released:
+            ticket.state.cost += cost
+        ticket.cost += cost
+    
+    def release(self, ticket: AdmissionTicket, refund: bool = False):
+        """
+        End an admitted request, letting a queued one in.
+        
+        Args:
+            ticket: Ticket returned by admit()
+            refund: Give the request's cost back, e.g. when it failed with a
+                server error or timed out
+        """
+        if refund:
+            ticket.state.budget.refund(ticket.cost)
+        with ticket.state.released:
+            ticket.state.in_flight -= 1
+            if refund:
+                ticket.state.cost -= ticket.cost
+            ticket.state.released.notify()
+    
+    def _observe_queue_depth(self):
+        depth = self.queue_depth()
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+    
+    def queue_depth(self) -> int:
+        """Requests waiting for a slot, over all callers."""
+        with self._lock:
+            return sum(state.queued for state in self.callers.values())
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth and per-caller counters as a JSON-ready dictionary."""
+        with self._lock:
+            callers = {
+                caller: {
+                    'in_flight': state.in_flight,
+                    'queued': state.queued,
+                    'admitted': state.admitted,
+                    'rejected': state.rejected,
+                    'cost': round(state.cost, 1)
+                }
+                for caller, state in self.callers.items()
+            }
+            max_queue_depth = self.max_queue_depth
+        return {
+            'queue_depth': sum(caller['queued'] for caller in callers.values()),
+            'max_queue_depth': max_queue_depth,
+            'in_flight': sum(caller['in_flight'] for caller in callers.values()),
+            'rejected': sum(caller['rejected'] for caller in callers.values()),
+            'callers': callers
+        }
+
+
+_admission_controller: Optional[AdmissionController] = None
+_admission_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """The process-wide admission controller."""
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_controller_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController(
+                    max_concurrent=Config.ADMISSION_MAX_CONCURRENT,
+                    cost_rate=Config.ADMISSION_COST_RATE,
+                    cost_burst=Config.ADMISSION_COST_BURST,
+                    max_queue=Config.ADMISSION_QUEUE_SIZE,
+                    queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT
+                )
+    return _admission_controller
@@ -1,37 +1,652 @@
 """Flask API for Meeting Planner Assistant."""
-from flask import Flask, request, jsonify
-from datetime import datetime
-from mock_graph_client import MockGraphAPIClient
-from meeting_analyzer import MeetingAnalyzer
+from flask import Flask, request, jsonify, g
+from datetime import datetime, timedelta
+from admission import AdmissionRejected, get_admission_controller
+from circuit_breaker import CircuitOpenError
 from config import Config
 from cors_config import init_cors
-import traceback
+from deadline import Deadline, DeadlineExceeded, deadline_scope
+from json_provider import init_json
+from logging_config import init_logging
+from response_format import RESPONSE_FORMATS, shape_suggestions
+from search_strategy import SEARCH_STRATEGIES, get_search_strategy, search_strategies
+from tenants import DEFAULT_TENANT_NAME, GraphClientPool, UnknownTenantError, load_tenants
+import hashlib
+import logging
+import math
+import threading
+import time
 
 
 app = Flask(__name__)
 # Enable CORS for Power Platform
 app = init_cors(app)
+# Faster, pluggable JSON encoding for responses
+app = init_json(app, Config.JSON_ENCODER)
+# Structured logging written off the request thread
+app = init_logging(app, Config)
 
+logger = logging.getLogger(__name__)
 
-def get_graph_client():
-    """Get appropriate Graph API client based on mode."""
+
+# grid scans availabilityView strings; intervals sweeps scheduleItems
+ANALYSIS_ENGINES = ('grid', 'intervals')
+
+# Upper bound on slots per bulk availability check
+MAX_BULK_SLOTS = 500
+
+# Upper bound on meetings per bulk create
+MAX_BULK_MEETINGS = 200
+
+# HTTP status of single-create outcomes other than success
+CREATE_STATUS_CODES = {'invalid': 400, 'conflict': 422, 'in_progress': 409, 'failed': 500}
+
+# API endpoints that report on the process rather than act for a tenant
+TENANT_FREE_ENDPOINTS = {'search_metrics'}
+
+# One Graph client per tenant and process, shared by all request threads
+_graph_client_pool = None
+_graph_client_lock = threading.Lock()
+_idempotency_store = None
+_precomputer = None
+
+
+def build_graph_client(tenant):
+    """Build the Graph API client of a tenant based on mode."""
+    if Config.USE_MOCK_API:
+        from mock_graph_client import MockGraphAPIClient
+        return MockGraphAPIClient(tenant)
+    # Import real client only when needed
+    from graph_client import GraphAPIClient
+    return GraphAPIClient(tenant)
+
+
+def get_graph_client_pool():
+    """Get the process-wide pool of per-tenant Graph clients."""
+    global _graph_client_pool
+    if _graph_client_pool is None:
+        with _graph_client_lock:
+            if _graph_client_pool is None:
+                default = (Config.DEFAULT_TENANT or None) if Config.TENANTS else DEFAULT_TENANT_NAME
+                _graph_client_pool = GraphClientPool(build_graph_client, load_tenants(), default)
+    return _graph_client_pool
+
+
+def get_graph_client(tenant=None):
+    """Get the Graph API client of a tenant (the default tenant if None)."""
+    return get_graph_client_pool().get(tenant)
+
+
+def preload_modules():
+    """
+    Import the modules that are otherwise loaded on the first request.
+    
+    The analyzer (pytz) and the Graph client (msal, requests) are imported
+    lazily to keep cold start short; this pulls them in ahead of traffic.
+    """
+    import meeting_analyzer  # noqa: F401
     if Config.USE_MOCK_API:
-        return MockGraphAPIClient()
+        import mock_graph_client  # noqa: F401
     else:
-        # Import real client only when needed
-        from graph_client import GraphAPIClient
-        return GraphAPIClient()
+        import graph_client  # noqa: F401
+
+
+def warm_up():
+    """
+    Validate configuration and build the Graph clients ahead of traffic.
+    
+    The production server calls this in the master process before forking
+    workers, so every worker starts with imports, configuration and an
+    authenticated client for every tenant already in memory.
+    """
+    Config.validate()
+    preload_modules()
+    pool = get_graph_client_pool()
+    for tenant in pool.tenants:
+        try:
+            pool.get(tenant)
+        except Exception as e:
+            if not Config.TENANTS:
+                raise
+            # One tenant failing to sign in must not keep the others from starting;
+            # its client is built again on its first request
+            logger.exception(f"Building the Graph client of tenant {tenant} failed: {str(e)}")
+
+
+def fetch_day_schedules(graph_client, timeline, participants, deadline=None):
+    """
+    Query the schedule of every day in a timeline.
+    
+    Days that fail (Graph errors, timeouts, an open circuit) are logged and
+    left out, so the search continues with the remaining days; they are
+    reported in the coverage so the response can say it is partial. Once
+    the deadline has passed the remaining days are not queried at all.
+    
+    Returns:
+        (day_schedules, coverage): getSchedule data keyed by timeline day
+        index, and {'missing_days': [...], 'stale_participants': set(),
+        'deadline_exceeded': bool}
+    """
+    day_schedules = {}
+    coverage = new_coverage()
+    
+    for day in range(len(timeline)):
+        if deadline is not None and deadline.expired():
+            coverage['missing_days'].extend(range(day, len(timeline)))
+            coverage['deadline_exceeded'] = True
+            break
+        slot_start, slot_end = timeline.day_bounds(day)
+        try:
+            with deadline_scope(deadline):
+                day_schedules[day] = graph_client.get_schedule(
+                    emails=participants,
+                    start_time=slot_start,
+                    end_time=slot_end,
+                    interval=timeline.interval_minutes
+                )
+        except Exception as e:
+            logger.warning(f"Error processing slot {slot_start}: {str(e)}")
+            coverage['missing_days'].append(day)
+            if deadline is not None and deadline.expired():
+                coverage['deadline_exceeded'] = True
+            continue
+        coverage['stale_participants'].update(
+            schedule.get('scheduleId', '') for schedule in day_schedules[day].get('value', [])
+            if schedule.get('stale')
+        )
+    
+    return day_schedules, coverage
+
+
+def new_coverage():
+    """Coverage of a search that has not left anything out yet."""
+    return {'missing_days': [], 'stale_participants': set(), 'deadline_exceeded': False}
+
+
+def coverage_fields(timeline, coverage=None):
+    """
+    Response fields saying whether a result is partial or built on stale data.
+    
+    Returns:
+        {'partial': bool, 'stale': bool}, plus 'missing_days' (ISO dates),
+        'stale_participants' and 'deadline_exceeded' when they are set
+    """
+    missing_days = coverage['missing_days'] if coverage else []
+    stale_participants = coverage['stale_participants'] if coverage else set()
+    fields = {'partial': bool(missing_days), 'stale': bool(stale_participants)}
+    if missing_days:
+        fields['missing_days'] = [timeline.day_dates[day].isoformat() for day in missing_days]
+    if stale_participants:
+        fields['stale_participants'] = sorted(stale_participants)
+    if coverage and coverage['deadline_exceeded']:
+        fields['deadline_exceeded'] = True
+    return fields
+
+
+def request_deadline(data):
+    """
+    Deadline of a search, from "deadlineMs" or the X-Deadline-Ms header.
+    
+    Returns:
+        Deadline counting from now, or None when neither the request nor
+        DEFAULT_DEADLINE_MS sets one
+    
+    Raises:
+        ValueError: When the value is not a positive number of milliseconds
+    """
+    value = data.get('deadlineMs', request.headers.get('X-Deadline-Ms'))
+    if value is None:
+        if not Config.DEFAULT_DEADLINE_MS:
+            return None
+        value = Config.DEFAULT_DEADLINE_MS
+    try:
+        milliseconds = float(value)
+    except (TypeError, ValueError):
+        milliseconds = 0
+    if isinstance(value, bool) or not milliseconds > 0:
+        raise ValueError('deadlineMs must be a positive number of milliseconds')
+    return Deadline(milliseconds / 1000, Config.DEADLINE_RESERVE_MS / 1000)
+
+
+def search_number_error(duration, min_percentage=None, top_n=None):
+    """
+    Error message for an invalid duration, minPercentage or topN, or None if they are valid.
+    
+    duration and topN must be positive integers and minPercentage a number
+    from 0 to 100; strings such as "60" are rejected here rather than
+    failing later in the analysis.
+    """
+    def is_integer(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    
+    if not is_integer(duration) or duration <= 0:
+        return 'duration must be a positive whole number of minutes'
+    if min_percentage is not None and (
+        not isinstance(min_percentage, (int, float)) or isinstance(min_percentage, bool)
+        or not 0 <= min_percentage <= 100
+    ):
+        return 'minPercentage must be a number between 0 and 100'
+    if top_n is not None and (not is_integer(top_n) or top_n <= 0):
+        return 'topN must be a positive integer'
+    return None
+
+
+def graph_unavailable(error):
+    """503 response for a call refused by the Graph circuit breaker."""
+    response = jsonify({
+        'success': False,
+        'error': str(error)
+    })
+    response.headers['Retry-After'] = str(max(int(error.retry_after), 1))
+    return response, 503
+
+
+def schedules_unavailable(timeline, coverage):
+    """
+    Response for a search none of whose days could be fetched.
+    
+    504 if the request's deadline ran out first, 503 otherwise.
+    """
+    if coverage['deadline_exceeded']:
+        return jsonify({
+            'success': False,
+            'error': 'The request deadline passed before any schedule could be fetched',
+            **coverage_fields(timeline, coverage)
+        }), 504
+    response = jsonify({
+        'success': False,
+        'error': 'Schedules are currently unavailable from Microsoft Graph; try again later',
+        **coverage_fields(timeline, coverage)
+    })
+    response.headers['Retry-After'] = str(int(Config.CIRCUIT_RESET_TIMEOUT))
+    return response, 503
+
+
+def add_unanalyzed_days(coverage, analyzer):
+    """Count the days an analysis skipped at its deadline as missing."""
+    if analyzer.unanalyzed_days:
+        coverage['missing_days'] = sorted(set(coverage['missing_days']) | set(analyzer.unanalyzed_days))
+        coverage['deadline_exceeded'] = True
+
+
+def get_precomputer():
+    """Get the process-wide hot participant set precomputer, or None if disabled."""
+    global _precomputer
+    if _precomputer is None and Config.PRECOMPUTE_HOT_SETS:
+        with _graph_client_lock:
+            if _precomputer is None:
+                from precompute import Precomputer
+                from schedule_cache import build_cache_backend
+                _precomputer = Precomputer(
+                    build_materialized_view,
+                    interval_seconds=Config.PRECOMPUTE_INTERVAL,
+                    min_searches=Config.PRECOMPUTE_MIN_SEARCHES,
+                    max_sets=Config.PRECOMPUTE_MAX_SETS,
+                    round_budget=Config.PRECOMPUTE_ROUND_BUDGET,
+                    max_live_requests=Config.PRECOMPUTE_MAX_LIVE_REQUESTS,
+                    max_age=min(2 * Config.PRECOMPUTE_INTERVAL, Config.SCHEDULE_CACHE_TTL),
+                    backend=build_cache_backend()
+                )
+    return _precomputer
+
+
+def build_materialized_view(shape, participants, budget):
+    """
+    Score every window of a search shape over the next PRECOMPUTE_DAYS business days.
+    
+    Schedules are fetched within ``budget`` seconds; a view that would miss
+    days or rely on stale schedules is not built.
+    
+    Returns:
+        MaterializedView, or None
+    """
+    from meeting_analyzer import MeetingAnalyzer
+    from parallel_analysis import get_parallel_scanner
+    from precompute import MaterializedView, business_days
+    
+    analyzer = MeetingAnalyzer(shape.time_zone, scanner=get_parallel_scanner())
+    start_date, end_date = business_days(shape.time_zone, Config.PRECOMPUTE_DAYS)
+    timeline = analyzer.build_timeline(start_date, end_date, shape.time_range, interval_minutes=30)
+    day_schedules, coverage = fetch_day_schedules(
+        get_graph_client(shape.tenant), timeline, participants, Deadline(budget)
+    )
+    if coverage['missing_days'] or coverage['stale_participants']:
+        return None
+    day_schedules = apply_search_settings(timeline, day_schedules, shape.respect_working_hours)
+    
+    roster = list(participants)
+    slots = analyzer.analyze_timeline(
+        timeline,
+        day_schedules,
+        duration_minutes=shape.duration,
+        min_percentage=0,
+        top_n=None,
+        formatted=True,
+        roster=roster
+    )
+    return MaterializedView(shape, timeline, slots, roster)
+
+
+@app.before_request
+def select_tenant():
+    """Pick the tenant an API request acts for from its X-Tenant-ID header (name or tenant ID)."""
+    if not request.path.startswith('/api/') or request.endpoint in TENANT_FREE_ENDPOINTS:
+        return
+    try:
+        g.tenant = get_graph_client_pool().resolve(request.headers.get('X-Tenant-ID')).name
+    except UnknownTenantError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+@app.before_request
+def count_live_request():
+    """Let the precomputer see live API traffic, so it can stay out of its way."""
+    if _precomputer is not None and request.path.startswith('/api/'):
+        g.precompute_counted = _precomputer
+        _precomputer.request_started()
+
+
+@app.teardown_request
+def uncount_live_request(error=None):
+    """End of a request counted by count_live_request."""
+    precomputer = g.pop('precompute_counted', None)
+    if precomputer is not None:
+        precomputer.request_finished()
+
+
+@app.after_request
+def settle_admission(response):
+    """Free the caller's slot taken by admit_search, refunding searches that failed on our side."""
+    ticket = g.pop('admission_ticket', None)
+    if ticket is not None:
+        get_admission_controller().release(ticket, refund=response.status_code >= 500)
+    return response
+
+
+@app.teardown_request
+def release_admission(error=None):
+    """Free the slot of a search that ended in an unhandled error, refunding it."""
+    ticket = g.pop('admission_ticket', None)
+    if ticket is not None:
+        get_admission_controller().release(ticket, refund=True)
+
+
+def caller_identity():
+    """
+    Who a request is charged to: its API key, else its bearer token, else its client address.
+    
+    Keys and tokens are hashed so they never show up in metrics. With
+    several tenants the tenant is part of the identity, so tenants behind
+    one gateway address still get separate budgets.
+    """
+    caller = None
+    for header, kind in (('X-API-Key', 'key'), ('Authorization', 'token')):
+        value = request.headers.get(header)
+        if value:
+            caller = f"{kind}:{hashlib.sha256(value.encode('utf-8')).hexdigest()[:12]}"
+            break
+    if caller is None:
+        forwarded = request.headers.get('X-Forwarded-For', '')
+        caller = f"ip:{forwarded.split(',')[0].strip() or request.remote_addr}"
+    if Config.TENANTS:
+        caller = f"{g.tenant}|{caller}"
+    return caller
+
+
+def weekday_count(start_date, end_date):
+    """Number of weekdays from start_date to end_date (YYYY-MM-DD), inclusive."""
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    return sum(
+        1 for offset in range((end - start).days + 1)
+        if (start + timedelta(days=offset)).weekday() < 5
+    )
+
+
+def admit_search(cost, deadline=None):
+    """
+    Admit a search costing ``cost`` participant-days for the current caller.
+    
+    The caller's slot is released when the request ends; a search waiting
+    for a slot waits no longer than its deadline allows.
+    
+    Raises:
+        AdmissionRejected: When the caller is over its concurrency limit or budget
+    """
+    if not Config.ADMISSION_CONTROL:
+        return
+    max_wait = deadline.remaining() if deadline is not None else None
+    g.admission_ticket = get_admission_controller().admit(caller_identity(), cost, max_wait)
+
+
+def charge_search(cost):
+    """Charge the admitted search for cost found after admission, e.g. expanded groups."""
+    ticket = g.get('admission_ticket')
+    if ticket is not None:
+        get_admission_controller().charge(ticket, cost)
+
+
+def too_many_requests(error):
+    """429 response for a search refused by admission control."""
+    response = jsonify({
+        'success': False,
+        'error': str(error)
+    })
+    response.headers['Retry-After'] = str(max(math.ceil(error.retry_after), 1))
+    return response, 429
+
+
+def get_idempotency_store():
+    """Get the process-wide idempotency key store."""
+    global _idempotency_store
+    if _idempotency_store is None:
+        with _graph_client_lock:
+            if _idempotency_store is None:
+                from idempotency import build_idempotency_store
+                _idempotency_store = build_idempotency_store()
+    return _idempotency_store
+
+
+def meeting_summary(meeting):
+    """Fields of a created event returned to callers."""
+    return {
+        'id': meeting.get('id'),
+        'webLink': meeting.get('webLink'),
+        'onlineMeeting': meeting.get('onlineMeeting'),
+        'subject': meeting.get('subject'),
+        'start': meeting.get('start'),
+        'end': meeting.get('end')
+    }
+
+
+def create_meeting_once(graph_client, item, idempotency_key=None):
+    """
+    Validate and create one meeting, at most once per idempotency key.
+    
+    Returns:
+        (status, payload): status is 'created', 'duplicate', 'in_progress',
+        'conflict', 'invalid' or 'failed'; payload holds 'meeting' or 'error'
+    """
+    if not isinstance(item, dict):
+        return 'invalid', {'error': 'Each meeting must be an object'}
+    for field in ('subject', 'startTime', 'endTime', 'attendees'):
+        if field not in item:
+            return 'invalid', {'error': f'Missing required field: {field}'}
+    attendees = item['attendees']
+    if not isinstance(attendees, list) or len(attendees) == 0:
+        return 'invalid', {'error': 'Attendees must be a non-empty list'}
+    if idempotency_key is not None and (not isinstance(idempotency_key, str) or not idempotency_key.strip()):
+        return 'invalid', {'error': 'idempotencyKey must be a non-empty string'}
+    
+    request_fields = {
+        'subject': item['subject'],
+        'start_time': item['startTime'],
+        'end_time': item['endTime'],
+        'attendees': attendees,
+        'body': item.get('body', '')
+    }
+    
+    store = None
+    fingerprint = None
+    if idempotency_key:
+        store = get_idempotency_store()
+        fingerprint = store.fingerprint(request_fields)
+        # Tenants choose their keys independently, so each has its own key space
+        store_key = graph_client.tenant.namespace + idempotency_key
+        existing = store.claim(store_key, fingerprint)
+        if existing is not None:
+            if existing.get('fingerprint') != fingerprint:
+                return 'conflict', {'error': 'idempotencyKey was already used for a different meeting'}
+            if 'meeting' not in existing:
+                return 'in_progress', {'error': 'A request with this idempotencyKey is still in progress'}
+            return 'duplicate', {'meeting': existing['meeting']}
+    
+    try:
+        meeting = graph_client.create_meeting(
+            **request_fields,
+            is_online=True,
+            transaction_id=idempotency_key
+        )
+    except Exception as e:
+        if store is not None:
+            store.release(store_key)
+        logger.exception(f"Error creating meeting '{item['subject']}': {str(e)}")
+        return 'failed', {'error': str(e)}
+    
+    # Precomputed availability of these attendees no longer holds
+    if _precomputer is not None:
+        _precomputer.invalidate(attendees, graph_client.tenant.name)
+    
+    summary = meeting_summary(meeting)
+    if store is not None:
+        store.complete(store_key, fingerprint, summary)
+    return 'created', {'meeting': summary}
+
+
+def expand_groups(graph_client, participants, required_participants, expand):
+    """
+    Replace group and distribution-list addresses with their members.
+    
+    A required group makes each of its members required.
+    
+    Returns:
+        (participants, required_participants, expanded_groups), where
+        expanded_groups maps each group address to its member count
+    
+    Raises:
+        ValueError: When expansion yields more than MAX_EXPANDED_PARTICIPANTS
+    """
+    if not expand:
+        return participants, required_participants, {}
+    
+    participants, groups = graph_client.expand_participants(participants)
+    if required_participants:
+        required_participants, _ = graph_client.expand_participants(required_participants)
+    if len(participants) > Config.MAX_EXPANDED_PARTICIPANTS:
+        raise ValueError(
+            f'Participants expand to {len(participants)} people; '
+            f'the limit is {Config.MAX_EXPANDED_PARTICIPANTS}'
+        )
+    return participants, required_participants, groups
+
+
+def count_fetch_calls(graph_client, timeline, participants):
+    """Number of days whose schedule query would still have to call Graph."""
+    calls = 0
+    for day in range(len(timeline)):
+        slot_start, slot_end = timeline.day_bounds(day)
+        cached = graph_client.count_cached_schedules(
+            participants, slot_start, slot_end, timeline.interval_minutes
+        )
+        if cached < len(participants):
+            calls += 1
+    return calls
+
+
+def apply_search_settings(timeline, day_schedules, respect_working_hours):
+    """
+    Mask time outside participants' working hours, unless disabled.
+    
+    Returns:
+        getSchedule data keyed by timeline day index
+    """
+    if not respect_working_hours:
+        return day_schedules
+    from working_hours import apply_working_hours
+    return apply_working_hours(timeline, day_schedules)
+
+
+def is_known_time_zone(name):
+    """Whether ``name`` is an IANA time zone name."""
+    import pytz
+    return isinstance(name, str) and name in pytz.all_timezones_set
+
+
+def check_slots_availability(graph_client, analyzer, participants, slots, include_participants=True):
+    """
+    Check many (start, end) slots with a single schedule query.
+    
+    The schedule of the window covering every slot is fetched once; each
+    slot is then answered from per-participant prefix sums.
+    
+    Returns:
+        One availability entry per slot, in request order
+    """
+    plan = analyzer.plan_slot_checks(slots)
+    
+    # Graph getSchedule accepts at most 62 days per request
+    if any(end - plan['origin'] > 62 * 24 * 60 for _, end in plan['minutes']):
+        raise ValueError('Slots must fall within a 62-day window')
+    
+    schedule_data = graph_client.get_schedule(
+        emails=participants,
+        start_time=plan['start_time'],
+        end_time=plan['end_time'],
+        interval=plan['interval']
+    )
+    return analyzer.check_slots(schedule_data, plan, include_participants=include_participants)
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
+    health = {
         'status': 'healthy',
         'service': 'Meeting Planner Assistant',
         'mode': 'MOCK' if Config.USE_MOCK_API else 'PRODUCTION',
         'timestamp': datetime.utcnow().isoformat()
-    })
+    }
+    log_handler = app.extensions.get('log_handler')
+    if log_handler is not None:
+        health['log_records_dropped'] = log_handler.dropped
+    # Only reported once a client exists, so health checks never build one
+    clients = _graph_client_pool.clients if _graph_client_pool is not None else {}
+    breakers = {
+        tenant: client.breaker.snapshot()
+        for tenant, client in list(clients.items()) if getattr(client, 'breaker', None) is not None
+    }
+    if Config.TENANTS:
+        health['graph_circuits'] = breakers
+    elif DEFAULT_TENANT_NAME in breakers:
+        health['graph_circuit'] = breakers[DEFAULT_TENANT_NAME]
+    return jsonify(health)
+
+
+@app.route('/api/search-metrics', methods=['GET'])
+def search_metrics():
+    """Search path latency, precomputation and admission queues of this process."""
+    metrics = {'success': True}
+    if Config.TENANTS:
+        metrics['search_strategies'] = {
+            tenant: strategy.snapshot() for tenant, strategy in search_strategies().items()
+        }
+    else:
+        metrics.update(get_search_strategy(DEFAULT_TENANT_NAME).snapshot())
+    if _precomputer is not None:
+        metrics['precompute'] = _precomputer.snapshot()
+    if Config.ADMISSION_CONTROL:
+        metrics['admission'] = get_admission_controller().snapshot()
+    return jsonify(metrics)
 
 
 @app.route('/api/find-meeting-times', methods=['POST'])
@@ -45,9 +660,68 @@ def find_meeting_times():
         "endDate": "2025-11-22",
         "timeRange": "09:00-17:00",
         "participants": ["user1@example.com", "user2@example.com"],
-        "duration": 60  // optional, default 60 minutes
+        "duration": 60,  // optional, default 60 minutes
+        "minPercentage": 50,  // optional, default 50
+        "topN": 5,  // optional, default 5
+        "requiredParticipants": ["user1@example.com"],  // optional
+        "responseFormat": "full",  // optional: full, compact or columnar
+        "includeParticipants": true,  // optional, default true
+        "engine": "grid",  // optional: grid (availabilityView) or intervals
+        "timeZone": "Europe/Istanbul",  // optional, default DEFAULT_TIMEZONE
+        "respectWorkingHours": true,  // optional, default RESPECT_WORKING_HOURS
+        "strategy": "auto",  // optional: auto, local or server
+        "expandGroups": true,  // optional, default EXPAND_GROUPS
+        "deadlineMs": 8000  // optional, also X-Deadline-Ms header
     }
     
+    "partial": true means some days could not be fetched from Graph (they
+    are listed under "missing_days"); "stale": true means some schedules
+    came from the cache past their TTL while Graph was being re-queried
+    ("stale_participants"). If no day can be fetched the response is 503.
+    
+    With a deadline, Graph calls are cut short when it runs out, no further
+    days are fetched or analyzed, and the best suggestions found in the
+    days covered so far are returned with "deadline_exceeded": true and the
+    rest under "missing_days". If it runs out before any day is fetched the
+    response is 504.
+    
+    With ANALYSIS_PROCESSES set, the window scan of very large grid
+    searches is split by day across a process pool.
+    
+    Searches are admitted per caller (X-API-Key, else the bearer token,
+    else the client address): a caller over its concurrency limit or its
+    budget of participants × days gets 429 with Retry-After.
+    
+    Group and distribution-list addresses in participants and
+    requiredParticipants are replaced with their members (nested groups
+    included); the member count of each group is returned under
+    "expanded_groups".
+    
+    The "local" strategy fetches getSchedule data and analyzes it here;
+    "server" asks Graph findMeetingTimes. "auto" (SEARCH_STRATEGY) picks
+    whichever is predicted to answer faster from the participant count,
+    the number of days, how much is already cached and measured latencies.
+    Both return the same suggestion format; the path taken is returned as
+    "strategy". Latency per path is available at /api/search-metrics.
+    
+    Participant sets that are searched often are precomputed in the
+    background for the next PRECOMPUTE_DAYS business days; a grid search
+    of such a set (same time range, duration, time zone and working-hours
+    setting) within those days is answered from the precomputed windows,
+    with "strategy": "precomputed" and "computed_at".
+    
+    Dates and the time range are read in ``timeZone``. Time outside each
+    participant's own working hours (from their mailbox settings, in their
+    own time zone) counts as unavailable unless respectWorkingHours is false.
+    
+    The "intervals" engine works on the busy intervals in scheduleItems
+    and returns windows exact to the minute, each with the latest start
+    time that keeps the same participants.
+    
+    The response format can also be chosen with the ``format`` query
+    parameter. Compact and columnar responses list the participants once
+    under "participants" and refer to them by index in each suggestion.
+    
     Response:
     {
         "success": true,
@@ -80,6 +754,13 @@ def find_meeting_times():
         time_range = data['timeRange']
         participants = data['participants']
         duration = data.get('duration', 60)
+        min_percentage = data.get('minPercentage', 50.0)
+        top_n = data.get('topN', 5)
+        required_participants = data.get('requiredParticipants', [])
+        response_format = request.args.get('format', data.get('responseFormat', 'full'))
+        include_participants = data.get('includeParticipants', True)
+        engine = data.get('engine', 'grid')
+        expand_group_addresses = data.get('expandGroups', Config.EXPAND_GROUPS)
         
         if not isinstance(participants, list) or len(participants) == 0:
             return jsonify({
@@ -87,60 +768,542 @@ def find_meeting_times():
                 'error': 'Participants must be a non-empty list'
             }), 400
         
+        number_error = search_number_error(duration, min_percentage, top_n)
+        if number_error:
+            return jsonify({
+                'success': False,
+                'error': number_error
+            }), 400
+        
+        if engine not in ANALYSIS_ENGINES:
+            return jsonify({
+                'success': False,
+                'error': f"engine must be one of: {', '.join(ANALYSIS_ENGINES)}"
+            }), 400
+        
+        if not isinstance(required_participants, list):
+            return jsonify({
+                'success': False,
+                'error': 'requiredParticipants must be a list'
+            }), 400
+        
+        if response_format not in RESPONSE_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f"responseFormat must be one of: {', '.join(RESPONSE_FORMATS)}"
+            }), 400
+        
+        time_zone = data.get('timeZone', Config.DEFAULT_TIMEZONE)
+        respect_working_hours = data.get('respectWorkingHours', Config.RESPECT_WORKING_HOURS)
+        
+        if not is_known_time_zone(time_zone):
+            return jsonify({
+                'success': False,
+                'error': f'Unknown timeZone: {time_zone}'
+            }), 400
+        
+        strategy = data.get('strategy', Config.SEARCH_STRATEGY)
+        if strategy not in SEARCH_STRATEGIES:
+            return jsonify({
+                'success': False,
+                'error': f"strategy must be one of: {', '.join(SEARCH_STRATEGIES)}"
+            }), 400
+        
+        # findMeetingTimes has no minute-precision latest start time
+        if strategy == 'server' and engine == 'intervals':
+            return jsonify({
+                'success': False,
+                'error': 'The intervals engine needs the local strategy'
+            }), 400
+        
+        try:
+            deadline = request_deadline(data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        days = weekday_count(start_date, end_date)
+        try:
+            admit_search(len(participants) * days, deadline)
+        except AdmissionRejected as e:
+            return too_many_requests(e)
+        
         # Initialize clients (mock or real based on config)
-        graph_client = get_graph_client()
-        analyzer = MeetingAnalyzer()
+        from meeting_analyzer import MeetingAnalyzer
+        from parallel_analysis import get_parallel_scanner
+        graph_client = get_graph_client(g.tenant)
+        analyzer = MeetingAnalyzer(time_zone, scanner=get_parallel_scanner())
+        search_strategy = get_search_strategy(g.tenant)
+        
+        requested = len(participants)
+        try:
+            with deadline_scope(deadline):
+                participants, required_participants, expanded_groups = expand_groups(
+                    graph_client, participants, required_participants, expand_group_addresses
+                )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        charge_search((len(participants) - requested) * days)
         
-        # Generate date range slots
-        date_slots = analyzer.generate_date_range_slots(start_date, end_date, time_range)
+        # Represent the whole date range as one integer-offset timeline
+        timeline = analyzer.build_timeline(start_date, end_date, time_range, interval_minutes=30)
+        participant_days = len(participants) * len(timeline)
+        roster = None if response_format == 'full' else list(participants)
         
-        all_time_slots = []
+        precomputer = get_precomputer() if engine == 'grid' and strategy != 'server' else None
+        if precomputer is not None:
+            from precompute import search_shape
+            shape = search_shape(
+                participants, time_range, duration, time_zone, respect_working_hours, g.tenant
+            )
+            precomputer.record_search(shape, participants)
+            view = precomputer.lookup(shape, timeline)
+            if view is not None:
+                suggestions, considered = view.suggestions(
+                    timeline,
+                    participants,
+                    min_percentage=min_percentage,
+                    top_n=top_n,
+                    required_attendees=required_participants,
+                    roster=roster,
+                    include_participants=include_participants
+                )
+                response = {
+                    'success': True,
+                    **shape_suggestions(suggestions, response_format, roster),
+                    'total_slots_analyzed': considered,
+                    'strategy': 'precomputed',
+                    'computed_at': datetime.utcfromtimestamp(view.built_at).isoformat(),
+                    **coverage_fields(timeline)
+                }
+                if expanded_groups:
+                    response['expanded_groups'] = expanded_groups
+                return jsonify(response)
         
-        # Query schedule for each day
-        for slot_start, slot_end in date_slots:
+        path = strategy
+        fetch_calls = None
+        if strategy == 'auto':
+            fetch_calls = count_fetch_calls(graph_client, timeline, participants)
+            path, _ = search_strategy.choose(
+                len(participants), len(timeline), fetch_calls,
+                server_supported=engine != 'intervals'
+            )
+        
+        formatted_suggestions = None
+        coverage = None
+        if path == 'server':
+            started = time.perf_counter()
             try:
-                schedule_data = graph_client.get_schedule(
-                    emails=participants,
-                    start_time=slot_start,
-                    end_time=slot_end,
-                    interval=30
+                with deadline_scope(deadline):
+                    result = graph_client.find_meeting_times(
+                        participants,
+                        start_date,
+                        end_date,
+                        time_range,
+                        duration,
+                        timeslots=[timeline.day_bounds(day) for day in range(len(timeline))],
+                        required_attendees=required_participants or None,
+                        minimum_attendee_percentage=min_percentage,
+                        max_candidates=max(top_n * 4, 20) if top_n else None,
+                        respect_working_hours=respect_working_hours
+                    )
+            except Exception as e:
+                if deadline is not None and deadline.expired():
+                    # Nothing was found in time, and there is no time left to search locally
+                    coverage = new_coverage()
+                    coverage['missing_days'] = list(range(len(timeline)))
+                    coverage['deadline_exceeded'] = True
+                    return schedules_unavailable(timeline, coverage)
+                if strategy == 'server':
+                    raise
+                # Fall back to the local path and avoid the server for a while
+                logger.warning(f"findMeetingTimes failed, analyzing locally: {str(e)}")
+                search_strategy.record_server_failure()
+                path = 'local'
+            else:
+                formatted_suggestions = analyzer.analyze_meeting_time_suggestions(
+                    timeline,
+                    result,
+                    participants,
+                    duration_minutes=duration,
+                    min_percentage=min_percentage,
+                    top_n=top_n,
+                    required_attendees=required_participants,
+                    formatted=True,
+                    roster=roster,
+                    include_participants=include_participants
                 )
-                
-                # Analyze the schedule data
-                start_dt = datetime.fromisoformat(slot_start)
-                time_slots = analyzer.analyze_schedule_data(
-                    schedule_data=schedule_data,
-                    start_time=start_dt,
-                    interval_minutes=30,
-                    duration_minutes=duration
+                search_strategy.record_server((time.perf_counter() - started) * 1000, participant_days)
+        
+        if path == 'local':
+            started = time.perf_counter()
+            day_schedules, coverage = fetch_day_schedules(graph_client, timeline, participants, deadline)
+            if not day_schedules and len(timeline):
+                return schedules_unavailable(timeline, coverage)
+            day_schedules = apply_search_settings(timeline, day_schedules, respect_working_hours)
+            fetched = time.perf_counter()
+            
+            # Score every window of the range in one pass; datetimes and strings
+            # are only built for the suggestions that are returned
+            analyze = analyzer.analyze_intervals if engine == 'intervals' else analyzer.analyze_timeline
+            formatted_suggestions = analyze(
+                timeline,
+                day_schedules,
+                duration_minutes=duration,
+                min_percentage=min_percentage,
+                top_n=top_n,
+                required_attendees=required_participants,
+                formatted=True,
+                roster=roster,
+                include_participants=include_participants,
+                deadline=deadline
+            )
+            add_unanalyzed_days(coverage, analyzer)
+            # A search cut short by its deadline says little about the cost of a full one
+            if not coverage['deadline_exceeded']:
+                search_strategy.record_local(
+                    (fetched - started) * 1000,
+                    fetch_calls,
+                    (time.perf_counter() - fetched) * 1000,
+                    participant_days
                 )
-                
-                all_time_slots.extend(time_slots)
-                
-            except Exception as e:
-                print(f"Error processing slot {slot_start}: {str(e)}")
-                continue
-        
-        # Get top suggestions
-        top_suggestions = analyzer.get_top_suggestions(all_time_slots, top_n=5, min_percentage=50.0)
-        
-        # Format suggestions
-        formatted_suggestions = []
-        for suggestion in top_suggestions:
-            formatted_suggestions.append({
-                **suggestion,
-                'formatted': analyzer.format_suggestion(suggestion)
-            })
+        
+        response = {
+            'success': True,
+            **shape_suggestions(formatted_suggestions, response_format, roster),
+            'total_slots_analyzed': analyzer.windows_analyzed,
+            'strategy': path,
+            **coverage_fields(timeline, coverage)
+        }
+        if expanded_groups:
+            response['expanded_groups'] = expanded_groups
+        return jsonify(response)
+        
+    except DeadlineExceeded as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 504
+        
+    except Exception as e:
+        logger.exception(f"Error in find_meeting_times: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/find-recurring-meeting-times', methods=['POST'])
+def find_recurring_meeting_times():
+    """
+    Find a weekly meeting time that works across several weeks.
+    
+    Request body:
+    {
+        "startDate": "2025-11-17",
+        "weeks": 12,
+        "timeRange": "09:00-17:00",
+        "participants": ["user1@example.com", "user2@example.com"],
+        "duration": 60,  // optional, default 60 minutes
+        "minPercentage": 50,  // optional, applied to the worst week
+        "topN": 5,  // optional, default 5
+        "timeZone": "Europe/Istanbul",  // optional, default DEFAULT_TIMEZONE
+        "respectWorkingHours": true,  // optional, default RESPECT_WORKING_HOURS
+        "expandGroups": true,  // optional, default EXPAND_GROUPS
+        "deadlineMs": 8000  // optional, also X-Deadline-Ms header
+    }
+    
+    Weeks whose schedules could not be fetched before the deadline are
+    left out and listed under "missing_days", as in find-meeting-times.
+    
+    Response:
+    {
+        "success": true,
+        "suggestions": [
+            {
+                "weekday": "tuesday",
+                "start_time": "2025-11-18T10:00:00+03:00",
+                "end_time": "2025-11-18T11:00:00+03:00",
+                "occurrences": 12,
+                "total_participants": 5,
+                "worst_case_count": 4,
+                "worst_case_percentage": 80.0,
+                "average_count": 4.75,
+                "average_percentage": 95.0,
+                "available_every_week": [...],
+                "occurrence_counts": [5, 4, ...],
+                "formatted": "Her Tuesday, 10:00 - 11:00 (en kötü hafta 4/5, ortalama %95, 12 hafta)"
+            }
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        # Validate input
+        required_fields = ['startDate', 'weeks', 'timeRange', 'participants']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({
+                    'success': False,
+                    'error': f'Missing required field: {field}'
+                }), 400
+        
+        start_date = data['startDate']
+        weeks = data['weeks']
+        time_range = data['timeRange']
+        participants = data['participants']
+        duration = data.get('duration', 60)
+        min_percentage = data.get('minPercentage', 50.0)
+        top_n = data.get('topN', 5)
+        
+        if not isinstance(participants, list) or len(participants) == 0:
+            return jsonify({
+                'success': False,
+                'error': 'Participants must be a non-empty list'
+            }), 400
+        
+        if isinstance(weeks, bool) or not isinstance(weeks, int) or not 1 <= weeks <= 52:
+            return jsonify({
+                'success': False,
+                'error': 'weeks must be an integer between 1 and 52'
+            }), 400
+        
+        number_error = search_number_error(duration, min_percentage, top_n)
+        if number_error:
+            return jsonify({
+                'success': False,
+                'error': number_error
+            }), 400
+        
+        time_zone = data.get('timeZone', Config.DEFAULT_TIMEZONE)
+        respect_working_hours = data.get('respectWorkingHours', Config.RESPECT_WORKING_HOURS)
+        
+        if not is_known_time_zone(time_zone):
+            return jsonify({
+                'success': False,
+                'error': f'Unknown timeZone: {time_zone}'
+            }), 400
+        
+        try:
+            deadline = request_deadline(data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        days = weeks * 5
+        try:
+            admit_search(len(participants) * days, deadline)
+        except AdmissionRejected as e:
+            return too_many_requests(e)
+        
+        from meeting_analyzer import MeetingAnalyzer
+        graph_client = get_graph_client(g.tenant)
+        analyzer = MeetingAnalyzer(time_zone)
+        
+        requested = len(participants)
+        try:
+            with deadline_scope(deadline):
+                participants, _, expanded_groups = expand_groups(
+                    graph_client, participants, [], data.get('expandGroups', Config.EXPAND_GROUPS)
+                )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        charge_search((len(participants) - requested) * days)
+        
+        # One timeline over all weeks; each weekday/time is folded across weeks
+        end_date = (
+            datetime.strptime(start_date, '%Y-%m-%d') + timedelta(weeks=weeks, days=-1)
+        ).strftime('%Y-%m-%d')
+        timeline = analyzer.build_timeline(start_date, end_date, time_range, interval_minutes=30)
+        day_schedules, coverage = fetch_day_schedules(graph_client, timeline, participants, deadline)
+        if not day_schedules and len(timeline):
+            return schedules_unavailable(timeline, coverage)
+        day_schedules = apply_search_settings(timeline, day_schedules, respect_working_hours)
+        
+        suggestions = analyzer.analyze_recurring(
+            timeline,
+            day_schedules,
+            roster=list(participants),
+            duration_minutes=duration,
+            min_percentage=min_percentage,
+            top_n=top_n
+        )
+        
+        response = {
+            'success': True,
+            'suggestions': suggestions,
+            'weeks': weeks,
+            'total_slots_analyzed': analyzer.windows_analyzed,
+            **coverage_fields(timeline, coverage)
+        }
+        if expanded_groups:
+            response['expanded_groups'] = expanded_groups
+        return jsonify(response)
+        
+    except DeadlineExceeded as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 504
+        
+    except Exception as e:
+        logger.exception(f"Error in find_recurring_meeting_times: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/schedule-meetings', methods=['POST'])
+def schedule_meetings():
+    """
+    Jointly schedule several meetings that share participants.
+    
+    Request body:
+    {
+        "startDate": "2025-11-18",
+        "endDate": "2025-11-22",
+        "timeRange": "09:00-17:00",
+        "meetings": [
+            {"id": "track-a", "participants": ["user1@example.com", "user2@example.com"], "duration": 60},
+            {"id": "track-b", "participants": ["user2@example.com", "user3@example.com"], "duration": 90}
+        ],
+        "timeLimitMs": 2000,  // optional, search time budget
+        "timeZone": "Europe/Istanbul",  // optional, default DEFAULT_TIMEZONE
+        "respectWorkingHours": true  // optional, default RESPECT_WORKING_HOURS
+    }
+    
+    Response:
+    {
+        "success": true,
+        "assignments": [
+            {"id": "track-a", "start_time": "...", "end_time": "...", "available_count": 2, ...},
+            {"id": "track-b", "start_time": "...", ...}
+        ],
+        "total_attendance": 4,
+        "optimal": true
+    }
+    
+    Meetings that share a participant never overlap. A meeting that cannot
+    be placed is returned with "scheduled": false.
+    """
+    try:
+        data = request.get_json()
+        
+        # Validate input
+        required_fields = ['startDate', 'endDate', 'timeRange', 'meetings']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({
+                    'success': False,
+                    'error': f'Missing required field: {field}'
+                }), 400
+        
+        start_date = data['startDate']
+        end_date = data['endDate']
+        time_range = data['timeRange']
+        meetings = data['meetings']
+        time_limit_ms = data.get('timeLimitMs', 2000)
+        
+        if not isinstance(meetings, list) or not 1 <= len(meetings) <= 50:
+            return jsonify({
+                'success': False,
+                'error': 'Meetings must be a list of 1 to 50 meetings'
+            }), 400
+        
+        if (
+            isinstance(time_limit_ms, bool) or not isinstance(time_limit_ms, int)
+            or not 0 < time_limit_ms <= Config.SCHEDULE_MEETINGS_MAX_TIME_MS
+        ):
+            return jsonify({
+                'success': False,
+                'error': (
+                    'timeLimitMs must be a whole number of milliseconds from 1 to '
+                    f'{Config.SCHEDULE_MEETINGS_MAX_TIME_MS}'
+                )
+            }), 400
+        
+        for meeting in meetings:
+            participants = meeting.get('participants') if isinstance(meeting, dict) else None
+            if (
+                not isinstance(participants, list) or len(participants) == 0
+                or not all(isinstance(email, str) and email for email in participants)
+            ):
+                return jsonify({
+                    'success': False,
+                    'error': 'Each meeting needs a non-empty list of participant email addresses'
+                }), 400
+            number_error = search_number_error(meeting.get('duration', 60))
+            if number_error:
+                return jsonify({
+                    'success': False,
+                    'error': number_error
+                }), 400
+        
+        time_zone = data.get('timeZone', Config.DEFAULT_TIMEZONE)
+        respect_working_hours = data.get('respectWorkingHours', Config.RESPECT_WORKING_HOURS)
+        
+        if not is_known_time_zone(time_zone):
+            return jsonify({
+                'success': False,
+                'error': f'Unknown timeZone: {time_zone}'
+            }), 400
+        
+        # Fetch every participant once, whichever meetings they are in
+        roster = list(dict.fromkeys(
+            email for meeting in meetings for email in meeting['participants']
+        ))
+        try:
+            admit_search(len(roster) * weekday_count(start_date, end_date))
+        except AdmissionRejected as e:
+            return too_many_requests(e)
+        
+        from meeting_analyzer import MeetingAnalyzer
+        graph_client = get_graph_client(g.tenant)
+        analyzer = MeetingAnalyzer(time_zone)
+        
+        timeline = analyzer.build_timeline(start_date, end_date, time_range, interval_minutes=30)
+        day_schedules, coverage = fetch_day_schedules(graph_client, timeline, roster)
+        if not day_schedules and len(timeline):
+            return schedules_unavailable(timeline, coverage)
+        day_schedules = apply_search_settings(timeline, day_schedules, respect_working_hours)
+        
+        result = analyzer.schedule_meetings(
+            timeline,
+            day_schedules,
+            meetings,
+            roster,
+            time_limit_ms=time_limit_ms
+        )
+        
+        assignments = []
+        for index, (meeting, slot) in enumerate(zip(meetings, result['assignments'])):
+            assignment = {'id': meeting.get('id', index), 'scheduled': slot is not None}
+            if meeting.get('subject'):
+                assignment['subject'] = meeting['subject']
+            assignments.append({**assignment, **(slot or {})})
         
         return jsonify({
             'success': True,
-            'suggestions': formatted_suggestions,
-            'total_slots_analyzed': len(all_time_slots)
+            'assignments': assignments,
+            'total_attendance': result['total_attendance'],
+            'optimal': result['optimal'],
+            **coverage_fields(timeline, coverage)
         })
         
     except Exception as e:
-        print(f"Error in find_meeting_times: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"Error in schedule_meetings: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -158,9 +1321,13 @@ def create_meeting():
         "startTime": "2025-11-19T10:00:00",
         "endTime": "2025-11-19T11:00:00",
         "attendees": ["user1@example.com", "user2@example.com"],
-        "body": "Toplantı açıklaması"  // optional
+        "body": "Toplantı açıklaması",  // optional
+        "idempotencyKey": "crm-4711"  // optional, or the Idempotency-Key header
     }
     
+    A retry with the same idempotency key returns the meeting created by
+    the first request ("duplicate": true) instead of creating another one.
+    
     Response:
     {
         "success": true,
@@ -176,55 +1343,140 @@ def create_meeting():
     try:
         data = request.get_json()
         
-        # Validate input
-        required_fields = ['subject', 'startTime', 'endTime', 'attendees']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'success': False,
-                    'error': f'Missing required field: {field}'
-                }), 400
+        # Initialize Graph client (mock or real based on config)
+        graph_client = get_graph_client(g.tenant)
         
-        subject = data['subject']
-        start_time = data['startTime']
-        end_time = data['endTime']
-        attendees = data['attendees']
-        body = data.get('body', '')
+        # Create the meeting
+        status, result = create_meeting_once(
+            graph_client,
+            data,
+            data.get('idempotencyKey') or request.headers.get('Idempotency-Key')
+        )
+        
+        if status in CREATE_STATUS_CODES:
+            return jsonify({
+                'success': False,
+                'error': result['error']
+            }), CREATE_STATUS_CODES[status]
+        
+        response = {
+            'success': True,
+            'meeting': result['meeting']
+        }
+        if status == 'duplicate':
+            response['duplicate'] = True
+        return jsonify(response)
+        
+    except Exception as e:
+        logger.exception(f"Error in create_meeting: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/create-meetings-bulk', methods=['POST'])
+def create_meetings_bulk():
+    """
+    Create many Teams meetings in one call.
+    
+    Request body:
+    {
+        "meetings": [
+            {
+                "idempotencyKey": "cohort-7-session-1",  // optional but recommended
+                "subject": "Eğitim - Oturum 1",
+                "startTime": "2025-11-19T10:00:00",
+                "endTime": "2025-11-19T11:00:00",
+                "attendees": ["user1@example.com", "user2@example.com"],
+                "body": "Toplantı açıklaması"  // optional
+            }
+        ]
+    }
+    
+    Meetings are created concurrently (BULK_CREATE_CONCURRENCY at a time,
+    paced by the Graph write rate limiter). The whole call is safe to
+    retry: items whose idempotency key already created a meeting return
+    that meeting with status "duplicate".
+    
+    Response:
+    {
+        "success": true,  // false if any item was not created
+        "results": [
+            {
+                "index": 0,
+                "idempotencyKey": "cohort-7-session-1",
+                "status": "created",  // created, duplicate, in_progress, conflict, invalid or failed
+                "meeting": {"id": "event_id", "webLink": "https://...", ...}
+            }
+        ],
+        "created": 1,
+        "duplicates": 0,
+        "failed": 0
+    }
+    """
+    try:
+        data = request.get_json()
         
-        if not isinstance(attendees, list) or len(attendees) == 0:
+        if 'meetings' not in data:
             return jsonify({
                 'success': False,
-                'error': 'Attendees must be a non-empty list'
+                'error': 'Missing required field: meetings'
             }), 400
         
-        # Initialize Graph client (mock or real based on config)
-        graph_client = get_graph_client()
+        meetings = data['meetings']
         
-        # Create the meeting
-        meeting = graph_client.create_meeting(
-            subject=subject,
-            start_time=start_time,
-            end_time=end_time,
-            attendees=attendees,
-            body=body,
-            is_online=True
-        )
+        if not isinstance(meetings, list) or not 1 <= len(meetings) <= MAX_BULK_MEETINGS:
+            return jsonify({
+                'success': False,
+                'error': f'meetings must be a list of 1 to {MAX_BULK_MEETINGS} meetings'
+            }), 400
+        
+        keys = [meeting.get('idempotencyKey') if isinstance(meeting, dict) else None for meeting in meetings]
+        # Keys that are not strings are reported per meeting by create_meeting_once
+        string_keys = [key for key in keys if isinstance(key, str) and key]
+        repeated = {key for key in string_keys if string_keys.count(key) > 1}
+        if repeated:
+            return jsonify({
+                'success': False,
+                'error': f"Duplicate idempotencyKey in request: {', '.join(sorted(repeated))}"
+            }), 400
+        
+        from concurrent.futures import ThreadPoolExecutor
+        graph_client = get_graph_client(g.tenant)
         
+        def create_one(pair):
+            # One meeting failing unexpectedly must not lose the results of the others
+            try:
+                return create_meeting_once(graph_client, *pair)
+            except Exception as e:
+                logger.exception(f"Error creating meeting in bulk: {str(e)}")
+                return 'failed', {'error': str(e)}
+        
+        workers = max(1, min(Config.BULK_CREATE_CONCURRENCY, len(meetings)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(create_one, zip(meetings, keys)))
+        
+        results = []
+        for index, ((status, result), key) in enumerate(zip(outcomes, keys)):
+            results.append({
+                'index': index,
+                'idempotencyKey': key,
+                'status': status,
+                **result
+            })
+        
+        statuses = [status for status, _ in outcomes]
         return jsonify({
-            'success': True,
-            'meeting': {
-                'id': meeting.get('id'),
-                'webLink': meeting.get('webLink'),
-                'onlineMeeting': meeting.get('onlineMeeting'),
-                'subject': meeting.get('subject'),
-                'start': meeting.get('start'),
-                'end': meeting.get('end')
-            }
+            'success': all(status in ('created', 'duplicate') for status in statuses),
+            'results': results,
+            'created': statuses.count('created'),
+            'duplicates': statuses.count('duplicate'),
+            'failed': len(statuses) - statuses.count('created') - statuses.count('duplicate')
         })
         
     except Exception as e:
-        print(f"Error in create_meeting: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"Error in create_meetings_bulk: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -277,44 +1529,136 @@ def check_availability():
             }), 400
         
         # Initialize clients (mock or real based on config)
-        graph_client = get_graph_client()
-        analyzer = MeetingAnalyzer().get_schedule(
-            emails=participants,
-            start_time=start_time,
-            end_time=end_time,
-            interval=30
-        )
+        from meeting_analyzer import MeetingAnalyzer
+        graph_client = get_graph_client(g.tenant)
+        analyzer = MeetingAnalyzer(Config.DEFAULT_TIMEZONE)
         
         # Analyze availability
-        start_dt = datetime.fromisoformat(start_time)
-        time_slots = analyzer.analyze_schedule_data(
-            schedule_data=schedule_data,
-            start_time=start_dt,
-            interval_minutes=30,
-            duration_minutes=60
-        )
+        slot = check_slots_availability(
+            graph_client, analyzer, participants, [(start_time, end_time)]
+        )[0]
+        
+        return jsonify({
+            'success': True,
+            'availability': slot
+        })
+        
+    except CircuitOpenError as e:
+        return graph_unavailable(e)
+        
+    except ValueError as e:
+        # Unparseable times or a range Graph cannot serve
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+        
+    except Exception as e:
+        logger.exception(f"Error in check_availability: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/check-availability-bulk', methods=['POST'])
+def check_availability_bulk():
+    """
+    Check availability for many time slots in one call.
+    
+    Request body:
+    {
+        "participants": ["user1@example.com", "user2@example.com"],
+        "slots": [
+            {"startTime": "2025-11-19T10:00:00", "endTime": "2025-11-19T11:00:00"},
+            {"startTime": "2025-11-19T14:30:00", "endTime": "2025-11-19T15:00:00"}
+        ],
+        "includeParticipants": true  // optional, default true
+    }
+    
+    Response:
+    {
+        "success": true,
+        "results": [
+            {
+                "startTime": "2025-11-19T10:00:00",
+                "endTime": "2025-11-19T11:00:00",
+                "available_count": 2,
+                "total_participants": 2,
+                "availability_percentage": 100.0,
+                "available_participants": [...],
+                "busy_participants": [...]
+            }
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        # Validate input
+        required_fields = ['participants', 'slots']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({
+                    'success': False,
+                    'error': f'Missing required field: {field}'
+                }), 400
+        
+        participants = data['participants']
+        slots = data['slots']
+        include_participants = data.get('includeParticipants', True)
         
-        if time_slots:
-            slot = time_slots[0]
+        if not isinstance(participants, list) or len(participants) == 0:
             return jsonify({
-                'success': True,
-                'availability': {
-                    'available_count': slot['available_count'],
-                    'total_participants': slot['total_participants'],
-                    'availability_percentage': slot['availability_percentage'],
-                    'available_participants': slot['available_participants'],
-                    'busy_participants': slot['busy_participants']
-                }
-            })
-        else:
+                'success': False,
+                'error': 'Participants must be a non-empty list'
+            }), 400
+        
+        if not isinstance(slots, list) or not 1 <= len(slots) <= MAX_BULK_SLOTS:
             return jsonify({
                 'success': False,
-                'error': 'Could not analyze availability'
-            }), 500
+                'error': f'Slots must be a list of 1 to {MAX_BULK_SLOTS} slots'
+            }), 400
+        
+        for slot in slots:
+            if not isinstance(slot, dict) or 'startTime' not in slot or 'endTime' not in slot:
+                return jsonify({
+                    'success': False,
+                    'error': 'Each slot needs startTime and endTime'
+                }), 400
+        
+        from meeting_analyzer import MeetingAnalyzer
+        graph_client = get_graph_client(g.tenant)
+        analyzer = MeetingAnalyzer(Config.DEFAULT_TIMEZONE)
+        
+        results = check_slots_availability(
+            graph_client,
+            analyzer,
+            participants,
+            [(slot['startTime'], slot['endTime']) for slot in slots],
+            include_participants=include_participants
+        )
+        
+        return jsonify({
+            'success': True,
+            'results': [
+                {'startTime': slot['startTime'], 'endTime': slot['endTime'], **result}
+                for slot, result in zip(slots, results)
+            ]
+        })
+        
+    except CircuitOpenError as e:
+        return graph_unavailable(e)
+        
+    except ValueError as e:
+        # Unparseable times or a range Graph cannot serve
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
         
     except Exception as e:
-        print(f"Error in check_availability: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"Error in check_availability_bulk: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -325,6 +1669,9 @@ if __name__ == '__main__':
     try:
         Config.validate()
         print("Configuration validated successfully")
+        if Config.PREWARM:
+            # Load heavy modules and the Graph client off the request path
+            threading.Thread(target=warm_up, daemon=True).start()
         print(f"Starting Meeting Planner Assistant API on port {Config.FLASK_PORT}")
         app.run(
             host='0.0.0.0',
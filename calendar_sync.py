@@ -0,0 +1,359 @@
+"""Local free/busy mirror kept up to date with Graph calendarView delta queries."""
+import bisect
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from datetime import datetime, timedelta, timezone as dt_timezone
+import requests
+import pytz
+from timeline import to_epoch_minute
+
+
+logger = logging.getLogger(__name__)
+
+
+# showAs values mapped to getSchedule availability codes
+SHOW_AS_CODES = {
+    'free': 0,
+    'tentative': 1,
+    'busy': 2,
+    'oof': 3,
+    'workingElsewhere': 4,
+    'unknown': 2
+}
+CODE_STATUS = {0: 'free', 1: 'tentative', 2: 'busy', 3: 'oof', 4: 'workingElsewhere'}
+
+
+class BusyIntervalIndex:
+    """
+    Per-user index of busy intervals, updated one event at a time.
+    
+    Intervals are kept sorted by start so a range lookup is a binary search
+    plus a short scan; events are also indexed by id so delta updates and
+    removals don't need a rebuild.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._events: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+        self._sorted: Dict[str, List[Tuple[int, int, int, str]]] = {}
+        self._longest: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def upsert(self, user: str, event_id: str, start: int, end: int, code: int):
+        """Add or replace an event's busy interval."""
+        with self._lock:
+            self._remove(user, event_id)
+            if code == 0 or end <= start:
+                return
+            self._events.setdefault(user, {})[event_id] = (start, end, code)
+            bisect.insort(self._sorted.setdefault(user, []), (start, end, code, event_id))
+            self._longest[user] = max(self._longest.get(user, 0), end - start)
+    
+    def remove(self, user: str, event_id: str):
+        """Remove an event, if it is indexed."""
+        with self._lock:
+            self._remove(user, event_id)
+    
+    def _remove(self, user: str, event_id: str):
+        entry = self._events.get(user, {}).pop(event_id, None)
+        if entry is None:
+            return
+        intervals = self._sorted[user]
+        index = bisect.bisect_left(intervals, (*entry, event_id))
+        if index < len(intervals) and intervals[index][3] == event_id:
+            del intervals[index]
+    
+    def clear(self, user: str):
+        """Forget every interval of a user."""
+        with self._lock:
+            self._events.pop(user, None)
+            self._sorted.pop(user, None)
+            self._longest.pop(user, None)
+    
+    def overlapping(self, user: str, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """Return (start, end, code) of the user's intervals overlapping [start, end)."""
+        with self._lock:
+            intervals = self._sorted.get(user, [])
+            # Nothing starting earlier than start - longest can still overlap
+            first = bisect.bisect_left(intervals, (start - self._longest.get(user, 0),))
+            result = []
+            for interval_start, interval_end, code, _ in intervals[first:]:
+                if interval_start >= end:
+                    break
+                if interval_end > start:
+                    result.append((interval_start, interval_end, code))
+            return result
+
+
+class CalendarSync:
+    """
+    Background mirror of tracked users' calendars.
+    
+    Each tracked user's calendarView over a rolling window is followed with
+    Graph delta queries, and the changes are applied to a BusyIntervalIndex.
+    getSchedule-compatible data for tracked users is then served locally,
+    with the workingHours of their mailbox settings.
+    """
+    
+    def __init__(
+        self,
+        users: List[str],
+        base_url: str,
+        get_headers: Callable[[], Dict[str, str]],
+        window_days: int = 30,
+        interval_seconds: int = 60,
+        timezone: str = "Europe/Istanbul",
+        request: Optional[Callable[..., requests.Response]] = None
+    ):
+        """
+        Initialize the mirror.
+        
+        Args:
+            users: Email addresses to track
+            base_url: Graph API base URL (a local stand-in server in tests)
+            get_headers: Returns the authorization headers for a request
+            window_days: Days ahead of today to mirror
+            interval_seconds: Seconds between delta rounds
+            timezone: Time zone for naive date-times
+            request: Sends a request like requests.Session.request, with
+                its own timeout (a plain session with a 30 second timeout
+                if None)
+        """
+        self.users = [user.lower() for user in users]
+        self.base_url = base_url.rstrip('/')
+        self.get_headers = get_headers
+        self.window_days = window_days
+        self.interval_seconds = interval_seconds
+        self.timezone = pytz.timezone(timezone)
+        if request is None:
+            session = requests.Session()
+            
+            def request(method, url, **kwargs):
+                return session.request(method, url, timeout=30, **kwargs)
+        self.request = request
+        self.index = BusyIntervalIndex()
+        self._delta_links: Dict[str, str] = {}
+        self._windows: Dict[str, Tuple[int, int]] = {}
+        self._working_hours: Dict[str, Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._pid = None
+    
+    def ensure_started(self):
+        """Start the background thread in this process, e.g. after a fork."""
+        with self._thread_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='calendar-sync', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync_all()
+            self._stop.wait(self.interval_seconds)
+    
+    def sync_all(self):
+        """Run one delta round for every tracked user."""
+        for user in self.users:
+            try:
+                self.sync_user(user)
+            except Exception as e:
+                logger.exception(f"Calendar sync failed for {user}: {str(e)}")
+    
+    def sync_user(self, user: str):
+        """
+        Apply the calendar changes of one user since the last round.
+        
+        The first round (and the first round of each new day, when the
+        window rolls forward) starts a fresh delta query and reloads the
+        user's working hours; later rounds follow the stored deltaLink.
+        """
+        today = datetime.now(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        window_end = today + timedelta(days=self.window_days)
+        window = (int(today.timestamp()) // 60, int(window_end.timestamp()) // 60)
+        
+        url = self._delta_links.get(user)
+        params = None
+        if url is None or self._windows.get(user) != window:
+            url = f"{self.base_url}/users/{user}/calendarView/delta"
+            params = {
+                'startDateTime': today.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'endDateTime': window_end.strftime('%Y-%m-%dT%H:%M:%SZ')
+            }
+            # Stop serving the user before emptying the index, so a search
+            # running meanwhile fetches from Graph instead of reading it as free
+            self._windows.pop(user, None)
+            self._delta_links.pop(user, None)
+            self.index.clear(user)
+            self._load_working_hours(user)
+        
+        headers = {**self.get_headers(), 'Prefer': 'outlook.timezone="UTC", odata.maxpagesize=200'}
+        
+        while url:
+            response = self.request('GET', url, headers=headers, params=params)
+            params = None
+            if response.status_code == 410:
+                # Sync state expired; start over on the next round
+                self._delta_links.pop(user, None)
+                self._windows.pop(user, None)
+                return
+            if response.status_code != 200:
+                raise Exception(f"Delta query failed: {response.status_code} - {response.text}")
+            
+            page = response.json()
+            for event in page.get('value', []):
+                self._apply(user, event)
+            
+            url = page.get('@odata.nextLink')
+            if '@odata.deltaLink' in page:
+                self._delta_links[user] = page['@odata.deltaLink']
+                self._windows[user] = window
+    
+    def _load_working_hours(self, user: str):
+        """
+        Load a user's working hours from the mailbox settings.
+        
+        Without them the user is served with no workingHours, so the
+        working-hours mask leaves the user's time unmasked.
+        """
+        try:
+            response = self.request(
+                'GET',
+                f"{self.base_url}/users/{user}/mailboxSettings/workingHours",
+                headers=self.get_headers()
+            )
+        except Exception as e:
+            logger.warning(f"Loading working hours of {user} failed: {str(e)}")
+            return
+        if response.status_code != 200:
+            logger.warning(f"Loading working hours of {user} failed: {response.status_code} - {response.text}")
+            return
+        working_hours = response.json()
+        working_hours.pop('@odata.context', None)
+        self._working_hours[user] = working_hours
+    
+    def _apply(self, user: str, event: Dict[str, Any]):
+        """Apply one event (or removal) from a delta page to the index."""
+        event_id = event.get('id', '')
+        if '@removed' in event or event.get('isCancelled'):
+            self.index.remove(user, event_id)
+            return
+        if 'start' not in event or 'end' not in event:
+            return
+        self.index.upsert(
+            user,
+            event_id,
+            to_epoch_minute(event['start']['dateTime'], pytz.utc),
+            to_epoch_minute(event['end']['dateTime'], pytz.utc),
+            SHOW_AS_CODES.get(event.get('showAs', 'busy'), 2)
+        )
+    
+    def to_minute(self, value: str) -> int:
+        """Epoch minute of an ISO 8601 string; naive values use the mirror's time zone."""
+        return to_epoch_minute(value, self.timezone)
+    
+    def covers(self, user: str, start: int, end: int) -> bool:
+        """Whether the mirror is synced for ``user`` over [start, end)."""
+        window = self._windows.get(user.lower())
+        return window is not None and window[0] <= start and end <= window[1]
+    
+    def schedule_for(self, user: str, start: int, end: int, interval: int) -> Dict[str, Any]:
+        """
+        Build one scheduleInformation entry from the local index.
+        
+        Args:
+            user: Email address
+            start: Range start in epoch minutes
+            end: Range end in epoch minutes
+            interval: Interval in minutes
+        
+        Returns:
+            Entry in the format of getSchedule's ``value`` list
+        """
+        length = (end - start) // interval
+        view = [0] * length
+        items = []
+        
+        for interval_start, interval_end, code in self.index.overlapping(user.lower(), start, end):
+            first = max((interval_start - start) // interval, 0)
+            last = min(-(-(interval_end - start) // interval), length)
+            for position in range(first, last):
+                if code > view[position]:
+                    view[position] = code
+            items.append({
+                'status': CODE_STATUS[code],
+                'start': {'dateTime': self._utc_iso(interval_start), 'timeZone': 'UTC'},
+                'end': {'dateTime': self._utc_iso(interval_end), 'timeZone': 'UTC'}
+            })
+        
+        schedule = {
+            'scheduleId': user,
+            'availabilityView': ''.join(map(str, view)),
+            'scheduleItems': items
+        }
+        working_hours = self._working_hours.get(user.lower())
+        if working_hours is not None:
+            schedule['workingHours'] = working_hours
+        return schedule
+    
+    def get_schedule(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int,
+        fetch: Callable[[List[str], str, str, int], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Return getSchedule data, serving mirrored users from the local index.
+        
+        Users that are not tracked, or not synced over the range yet, are
+        fetched with ``fetch`` in one call.
+        
+        Args:
+            emails: List of participant email addresses
+            start_time: Start time in ISO 8601 format
+            end_time: End time in ISO 8601 format
+            interval: Interval in minutes
+            fetch: Function with the get_schedule signature for the rest
+        
+        Returns:
+            Schedule data in Graph API format, in the order of ``emails``
+        """
+        self.ensure_started()
+        start = self.to_minute(start_time)
+        end = self.to_minute(end_time)
+        
+        schedules = {}
+        missing = []
+        for email in emails:
+            if email.lower() in self.users and self.covers(email, start, end):
+                schedules[email.lower()] = self.schedule_for(email, start, end, interval)
+            else:
+                missing.append(email)
+        
+        response: Dict[str, Any] = {}
+        if missing:
+            response = fetch(missing, start_time, end_time, interval)
+            for schedule in response.get('value', []):
+                schedules[schedule.get('scheduleId', '').lower()] = schedule
+        
+        return {
+            **{key: value for key, value in response.items() if key != 'value'},
+            'value': [
+                schedules[email.lower()] for email in emails if email.lower() in schedules
+            ]
+        }
+    
+    @staticmethod
+    def _utc_iso(epoch_minute: int) -> str:
+        return datetime.fromtimestamp(epoch_minute * 60, dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
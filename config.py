@@ -1,8 +1,28 @@
 """Configuration settings for the Meeting Planner Assistant."""
+import logging
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+def _find_env_file():
+    """Find .env the way python-dotenv does, walking up from this file."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# Deployments configured through the environment skip importing python-dotenv
+_env_file = _find_env_file()
+if _env_file:
+    from dotenv import load_dotenv
+    load_dotenv(_env_file)
+
+logger = logging.getLogger(__name__)
 
 class Config:
     """Application configuration."""
@@ -18,21 +38,139 @@ class Config:
     # Graph API endpoints
     AUTHORITY = f'https://login.microsoftonline.com/{TENANT_ID}'
     SCOPE = ['https://graph.microsoft.com/.default']
-    GRAPH_API_ENDPOINT = 'https://graph.microsoft.com/v1.0'
+    GRAPH_API_ENDPOINT = os.getenv('GRAPH_API_ENDPOINT', 'https://graph.microsoft.com/v1.0')
+    
+    # Customer tenants served by this deployment (comma-separated names, each configured
+    # with <NAME>_TENANT_ID, <NAME>_CLIENT_ID and <NAME>_CLIENT_SECRET) and the tenant of
+    # requests without an X-Tenant-ID header (empty = the header is required). Unset
+    # serves the single tenant above.
+    TENANTS = [name.strip() for name in os.getenv('TENANTS', '').split(',') if name.strip()]
+    DEFAULT_TENANT = os.getenv('DEFAULT_TENANT', '').strip()
+    
+    # Local free/busy mirror kept up to date with calendarView delta queries
+    CALENDAR_SYNC_USERS = [
+        user.strip() for user in os.getenv('CALENDAR_SYNC_USERS', '').split(',') if user.strip()
+    ]
+    CALENDAR_SYNC_INTERVAL = int(os.getenv('CALENDAR_SYNC_INTERVAL', 60))
+    CALENDAR_SYNC_WINDOW_DAYS = int(os.getenv('CALENDAR_SYNC_WINDOW_DAYS', 30))
+    
+    # Time zone for searches and Graph requests without an explicit one
+    DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'Europe/Istanbul')
+    # Treat time outside each participant's workingHours as unavailable
+    RESPECT_WORKING_HOURS = os.getenv('RESPECT_WORKING_HOURS', 'True').lower() == 'true'
+    
+    # Search path for find-meeting-times: auto (cheaper of the two), local or server
+    SEARCH_STRATEGY = os.getenv('SEARCH_STRATEGY', 'auto').lower()
     
     # Flask settings
     FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Production server (gunicorn.conf.py); workers default to one per core
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', os.cpu_count() or 1))
+    SERVER_THREADS = int(os.getenv('SERVER_THREADS', 4))
+    SERVER_TIMEOUT = int(os.getenv('SERVER_TIMEOUT', 120))
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+    SERVER_KEEPALIVE = int(os.getenv('SERVER_KEEPALIVE', 5))
+    SERVER_MAX_REQUESTS = int(os.getenv('SERVER_MAX_REQUESTS', 0))
+    
+    # Free/busy cache shared by all workers on a node ('sqlite', 'memory' or 'none')
+    SCHEDULE_CACHE_BACKEND = os.getenv('SCHEDULE_CACHE_BACKEND', 'sqlite').lower()
+    SCHEDULE_CACHE_PATH = os.getenv('SCHEDULE_CACHE_PATH')
+    SCHEDULE_CACHE_TTL = int(os.getenv('SCHEDULE_CACHE_TTL', 300))
+    SCHEDULE_CACHE_MAX_ENTRIES = int(os.getenv('SCHEDULE_CACHE_MAX_ENTRIES', 50000))
+    # Seconds past the TTL an entry is still served (flagged stale) while it is refreshed in the background
+    SCHEDULE_CACHE_STALE_TTL = int(os.getenv('SCHEDULE_CACHE_STALE_TTL', 3600))
+    
+    # Event creation: Graph write rate per process, and concurrent creates per bulk call
+    GRAPH_WRITE_RATE = float(os.getenv('GRAPH_WRITE_RATE', 4))
+    GRAPH_WRITE_BURST = int(os.getenv('GRAPH_WRITE_BURST', 4))
+    BULK_CREATE_CONCURRENCY = int(os.getenv('BULK_CREATE_CONCURRENCY', 4))
+    
+    # Idempotency keys of created meetings ('sqlite', 'memory'); kept for IDEMPOTENCY_TTL seconds
+    IDEMPOTENCY_BACKEND = os.getenv('IDEMPOTENCY_BACKEND', 'sqlite').lower()
+    IDEMPOTENCY_PATH = os.getenv('IDEMPOTENCY_PATH')
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 86400))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', 100000))
+    
+    # Graph request timeouts (seconds) and circuit breaker: open after N consecutive
+    # failures, try again after CIRCUIT_RESET_TIMEOUT seconds
+    GRAPH_CONNECT_TIMEOUT = float(os.getenv('GRAPH_CONNECT_TIMEOUT', 3.05))
+    GRAPH_READ_TIMEOUT = float(os.getenv('GRAPH_READ_TIMEOUT', 10))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', 30))
+    
+    # Search deadline in milliseconds when a request sets none (0 = no deadline); the last
+    # DEADLINE_RESERVE_MS are kept for analyzing what was fetched and sending the response
+    DEFAULT_DEADLINE_MS = int(os.getenv('DEFAULT_DEADLINE_MS', 0))
+    DEADLINE_RESERVE_MS = int(os.getenv('DEADLINE_RESERVE_MS', 250))
+    # Longest solver time budget (timeLimitMs) a schedule-meetings request may ask for
+    SCHEDULE_MEETINGS_MAX_TIME_MS = int(os.getenv('SCHEDULE_MEETINGS_MAX_TIME_MS', 10000))
+    
+    # Admission control per caller (API key, token or client address) and worker: concurrent
+    # searches, a queue of ADMISSION_QUEUE_SIZE waiting up to ADMISSION_QUEUE_TIMEOUT seconds,
+    # and a budget of participant-days refilling at ADMISSION_COST_RATE per second
+    ADMISSION_CONTROL = os.getenv('ADMISSION_CONTROL', 'False').lower() == 'true'
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', 4))
+    ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', 8))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 2))
+    ADMISSION_COST_RATE = float(os.getenv('ADMISSION_COST_RATE', 500))
+    ADMISSION_COST_BURST = float(os.getenv('ADMISSION_COST_BURST', 5000))
+    
+    # Group and distribution-list expansion; memberships are cached for GROUP_CACHE_TTL seconds
+    EXPAND_GROUPS = os.getenv('EXPAND_GROUPS', 'True').lower() == 'true'
+    GROUP_CACHE_TTL = int(os.getenv('GROUP_CACHE_TTL', 3600))
+    MAX_EXPANDED_PARTICIPANTS = int(os.getenv('MAX_EXPANDED_PARTICIPANTS', 500))
+    # Parallel Graph reads (membership pages, schedule chunks) and schedules per getSchedule call
+    GRAPH_PARALLEL_REQUESTS = int(os.getenv('GRAPH_PARALLEL_REQUESTS', 8))
+    SCHEDULE_CHUNK_SIZE = int(os.getenv('SCHEDULE_CHUNK_SIZE', 20))
+    
+    # Precomputed availability of frequently searched participant sets for the next
+    # PRECOMPUTE_DAYS business days, refreshed every PRECOMPUTE_INTERVAL seconds and served for
+    # at most SCHEDULE_CACHE_TTL seconds. A set is hot while its search count, halving every
+    # hour, is at least PRECOMPUTE_MIN_SEARCHES (so it takes one search more than that).
+    # Each round refreshes at most PRECOMPUTE_MAX_SETS sets within PRECOMPUTE_ROUND_BUDGET
+    # seconds and waits while more than PRECOMPUTE_MAX_LIVE_REQUESTS requests are served
+    PRECOMPUTE_HOT_SETS = os.getenv('PRECOMPUTE_HOT_SETS', 'False').lower() == 'true'
+    PRECOMPUTE_DAYS = int(os.getenv('PRECOMPUTE_DAYS', 10))
+    PRECOMPUTE_INTERVAL = int(os.getenv('PRECOMPUTE_INTERVAL', 300))
+    PRECOMPUTE_MIN_SEARCHES = float(os.getenv('PRECOMPUTE_MIN_SEARCHES', 2))
+    PRECOMPUTE_MAX_SETS = int(os.getenv('PRECOMPUTE_MAX_SETS', 20))
+    PRECOMPUTE_ROUND_BUDGET = float(os.getenv('PRECOMPUTE_ROUND_BUDGET', 30))
+    PRECOMPUTE_MAX_LIVE_REQUESTS = int(os.getenv('PRECOMPUTE_MAX_LIVE_REQUESTS', 2))
+    
+    # Worker processes for large window scans (0 = scan in the request thread) and the
+    # participant-intervals a scan needs before it is handed to them
+    ANALYSIS_PROCESSES = int(os.getenv('ANALYSIS_PROCESSES', 0))
+    PARALLEL_ANALYSIS_MIN_CELLS = int(os.getenv('PARALLEL_ANALYSIS_MIN_CELLS', 200000))
+    
+    # Log level, output format (json or text) and records buffered for the writer thread
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    # Share of requests whose info/debug records are kept, overall and per route
+    # ("/health=0,/api/check-availability=0.1"); warnings and errors are always kept
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+    
+    # Import heavy modules and build the Graph client in the background at startup
+    PREWARM = os.getenv('PREWARM', 'True').lower() == 'true'
+    
+    # Response encoding ('auto' uses orjson when installed, else the standard library)
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto').lower()
+    
     @staticmethod
     def validate():
         """Validate that required configuration is present."""
+        if Config.DEFAULT_TENANT and Config.DEFAULT_TENANT not in Config.TENANTS:
+            raise ValueError(f"DEFAULT_TENANT is not one of TENANTS: {Config.DEFAULT_TENANT}")
+        
         # Skip validation if using mock API
         if Config.USE_MOCK_API:
-            print("⚠️  Running in MOCK MODE - No real Graph API calls will be made")
+            logger.warning("⚠️  Running in MOCK MODE - No real Graph API calls will be made")
             return
             
-        required = ['CLIENT_ID', 'CLIENT_SECRET', 'TENANT_ID']
-        missing = [key for key in required if not getattr(Config, key)]
+        from tenants import load_tenants, missing_credentials
+        missing = missing_credentials(load_tenants())
         if missing:
             raise ValueError(f"Missing required configuration: {', '.join(missing)}")
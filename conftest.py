@@ -0,0 +1,8 @@
+"""Shared pytest setup: mock Graph mode and process-local caches."""
+import os
+
+# Config reads the environment when it is first imported
+os.environ.setdefault('USE_MOCK_API', 'True')
+os.environ.setdefault('SCHEDULE_CACHE_BACKEND', 'memory')
+os.environ.setdefault('IDEMPOTENCY_BACKEND', 'memory')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
@@ -0,0 +1,71 @@
+"""Per-request deadlines that bound Graph calls and analysis."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting work the request no longer has time for."""
+
+
+class Deadline:
+    """
+    Point in time by which a request has to answer.
+    
+    ``reserve`` seconds are kept back for analysis and serializing the
+    response, so fetching stops early enough for a partial answer to
+    still arrive in time.
+    """
+    
+    def __init__(self, seconds: float, reserve: float = 0.0):
+        """Initialize a deadline ``seconds`` from now."""
+        self.budget = seconds
+        self.reserve = min(reserve, seconds / 2)
+        self.expires_at = time.monotonic() + seconds
+    
+    def remaining(self) -> float:
+        """Seconds left for fetching, after the reserve."""
+        return self.expires_at - self.reserve - time.monotonic()
+    
+    def expired(self) -> bool:
+        """Whether there is no time left to start more work."""
+        return self.remaining() <= 0
+    
+    def passed(self) -> bool:
+        """Whether the deadline itself, reserve included, is over."""
+        return time.monotonic() >= self.expires_at
+    
+    def timeout(self, connect: float, read: float) -> Tuple[float, float]:
+        """
+        Connect and read timeouts cut down to the time left.
+        
+        Raises:
+            DeadlineExceeded: If there is no time left
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded('Request deadline exceeded')
+        return min(connect, remaining), min(read, remaining)
+    
+    def truncates(self, connect: float, read: float) -> bool:
+        """Whether the deadline is shorter than the regular timeouts."""
+        return self.remaining() < max(connect, read)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar('deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request being handled, if it has one."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """Make ``deadline`` the current deadline inside the block."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -1,40 +1,166 @@
 """Microsoft Graph API client for calendar operations."""
+import os
+import threading
+import time
 import requests
 import msal
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
 from config import Config
+from schedule_cache import build_schedule_cache, MemoryCacheBackend
+from calendar_sync import CalendarSync
+from rate_limiter import TokenBucket
+from circuit_breaker import CircuitBreaker
+from group_expansion import GroupExpander, graph_members
+from deadline import current_deadline, deadline_scope
+from tenants import Tenant, single_tenant
+from concurrent.futures import ThreadPoolExecutor
 
 
 class GraphAPIClient:
     """Client for interacting with Microsoft Graph API."""
     
-    def __init__(self):
-        """Initialize the Graph API client."""
+    # Refresh the token this many seconds before it actually expires
+    TOKEN_REFRESH_MARGIN = 300
+    
+    # Attempts at a throttled (429/503) event creation before giving up
+    MAX_WRITE_ATTEMPTS = 4
+    
+    def __init__(self, tenant: Optional[Tenant] = None):
+        """
+        Initialize the Graph API client.
+        
+        Args:
+            tenant: Tenant to act for (the one of CLIENT_ID/CLIENT_SECRET/TENANT_ID if None)
+        """
         self.config = Config
+        self.tenant = tenant or single_tenant()
         self.access_token = None
+        self.token_expires_at = 0.0
+        # A token cache of its own, so tokens never cross tenants
+        self.msal_app = msal.ConfidentialClientApplication(
+            self.tenant.client_id,
+            authority=self.tenant.authority,
+            client_credential=self.tenant.client_secret,
+            token_cache=msal.TokenCache()
+        )
+        self._session: Optional[requests.Session] = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+        self.schedule_cache = build_schedule_cache(self.tenant.namespace)
+        self.breaker = CircuitBreaker(
+            'Microsoft Graph' if not self.tenant.namespace else f'Microsoft Graph ({self.tenant.name})',
+            failure_threshold=self.config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=self.config.CIRCUIT_RESET_TIMEOUT
+        )
+        self.write_limiter = TokenBucket(self.config.GRAPH_WRITE_RATE, self.config.GRAPH_WRITE_BURST)
+        self.group_expander = GroupExpander(
+            self._lookup_groups,
+            self._list_group_members,
+            self.schedule_cache.backend if self.schedule_cache is not None else MemoryCacheBackend(),
+            ttl=self.config.GROUP_CACHE_TTL,
+            max_workers=self.config.GRAPH_PARALLEL_REQUESTS
+        )
+        self.calendar_sync = None
+        if self.tenant.calendar_sync_users:
+            self.calendar_sync = CalendarSync(
+                self.tenant.calendar_sync_users,
+                self.config.GRAPH_API_ENDPOINT,
+                self._get_headers,
+                window_days=self.config.CALENDAR_SYNC_WINDOW_DAYS,
+                interval_seconds=self.config.CALENDAR_SYNC_INTERVAL,
+                timezone=self.config.DEFAULT_TIMEZONE,
+                # Sync shares this client's connection pool, timeouts and circuit breaker
+                request=self._request
+            )
         self._authenticate()
     
     def _authenticate(self):
         """Authenticate with Microsoft Graph API using client credentials flow."""
-        app = msal.ConfidentialClientApplication(
-            self.config.CLIENT_ID,
-            authority=self.config.AUTHORITY,
-            client_credential=self.config.CLIENT_SECRET,
-        )
-        
-        result = app.acquire_token_silent(self.config.SCOPE, account=None)
+        result = self.msal_app.acquire_token_silent(self.config.SCOPE, account=None)
         
         if not result:
-            result = app.acquire_token_for_client(scopes=self.config.SCOPE)
+            result = self.msal_app.acquire_token_for_client(scopes=self.config.SCOPE)
         
         if "access_token" in result:
             self.access_token = result['access_token']
+            self.token_expires_at = (
+                time.time() + int(result.get('expires_in', 3600)) - self.TOKEN_REFRESH_MARGIN
+            )
         else:
             raise Exception(f"Authentication failed: {result.get('error_description', 'Unknown error')}")
     
+    def _graph_datetime(self, value: str) -> Dict[str, str]:
+        """
+        Build a Graph dateTimeTimeZone from an ISO 8601 string.
+        
+        Graph reads dateTime in the given timeZone and ignores UTC offsets,
+        so values with an offset are sent as UTC and naive values in the
+        default time zone.
+        """
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            return {"dateTime": value, "timeZone": self.config.DEFAULT_TIMEZONE}
+        utc = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return {"dateTime": utc.isoformat(), "timeZone": "UTC"}
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a Graph request with a timeout, through the circuit breaker.
+        
+        Timeouts, connection errors, 5xx and 429 responses count as
+        failures; once the circuit is open, calls raise CircuitOpenError
+        immediately instead of waiting on Graph.
+        
+        Within a request deadline the timeouts are cut down to the time
+        left (DeadlineExceeded if none is); a timeout caused by the deadline
+        is not held against Graph.
+        """
+        timeout = (self.config.GRAPH_CONNECT_TIMEOUT, self.config.GRAPH_READ_TIMEOUT)
+        deadline = current_deadline()
+        truncated = False
+        if deadline is not None:
+            truncated = deadline.truncates(*timeout)
+            timeout = deadline.timeout(*timeout)
+        self.breaker.before_call()
+        try:
+            response = self._http().request(method, url, timeout=timeout, **kwargs)
+        except requests.Timeout:
+            if truncated:
+                self.breaker.record_abandoned()
+            else:
+                self.breaker.record_failure()
+            raise
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+    
+    def _http(self) -> requests.Session:
+        """This client's connection pool; each process opens its own, as sockets don't survive a fork."""
+        if self._session is None or self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_maxsize=self.config.SERVER_THREADS * self.config.GRAPH_PARALLEL_REQUESTS
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+    
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests."""
+        # The client is shared for the lifetime of a worker, so renew the token
+        if time.time() >= self.token_expires_at:
+            self._authenticate()
         return {
             'Authorization': f'Bearer {self.access_token}',
             'Content-Type': 'application/json'
@@ -59,28 +185,163 @@ class GraphAPIClient:
         Returns:
             Schedule data from Microsoft Graph API
         """
+        # Tracked users come from the local mirror without a Graph round-trip
+        if self.calendar_sync is not None:
+            return self.calendar_sync.get_schedule(
+                emails, start_time, end_time, interval, self._cached_schedule
+            )
+        return self._cached_schedule(emails, start_time, end_time, interval)
+    
+    def count_cached_schedules(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int = 30
+    ) -> int:
+        """
+        Number of participants get_schedule can answer without calling Graph.
+        
+        Args:
+            emails: List of participant email addresses
+            start_time: Start time in ISO 8601 format
+            end_time: End time in ISO 8601 format
+            interval: Interval in minutes
+        
+        Returns:
+            Count of participants served from the mirror or the cache
+        """
+        remaining = list(emails)
+        mirrored = 0
+        if self.calendar_sync is not None:
+            start = self.calendar_sync.to_minute(start_time)
+            end = self.calendar_sync.to_minute(end_time)
+            remaining = [
+                email for email in emails
+                if not (email.lower() in self.calendar_sync.users and self.calendar_sync.covers(email, start, end))
+            ]
+            mirrored = len(emails) - len(remaining)
+        if self.schedule_cache is None:
+            return mirrored
+        return mirrored + self.schedule_cache.count_cached(remaining, start_time, end_time, interval)
+    
+    def _cached_schedule(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int = 30
+    ) -> Dict[str, Any]:
+        """Get schedules through the shared cache, if one is configured."""
+        if self.schedule_cache is None:
+            return self._fetch_schedule(emails, start_time, end_time, interval)
+        return self.schedule_cache.get_schedule(
+            emails, start_time, end_time, interval, self._fetch_schedule
+        )
+    
+    def _fetch_schedule(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int = 30
+    ) -> Dict[str, Any]:
+        """
+        Call Graph getSchedule for the given users, bypassing the cache.
+        
+        getSchedule accepts a limited number of schedules per request, so
+        larger lists (e.g. expanded groups) are split into chunks that are
+        fetched in parallel and merged in order.
+        """
+        size = self.config.SCHEDULE_CHUNK_SIZE
+        if len(emails) <= size:
+            return self._fetch_schedule_chunk(emails, start_time, end_time, interval)
+        
+        chunks = [emails[start:start + size] for start in range(0, len(emails), size)]
+        deadline = current_deadline()
+        
+        def fetch_chunk(chunk):
+            # Worker threads do not inherit the request's deadline by themselves
+            with deadline_scope(deadline):
+                return self._fetch_schedule_chunk(chunk, start_time, end_time, interval)
+        
+        with ThreadPoolExecutor(max_workers=min(self.config.GRAPH_PARALLEL_REQUESTS, len(chunks))) as executor:
+            responses = list(executor.map(fetch_chunk, chunks))
+        return {
+            **{key: value for key, value in responses[0].items() if key != 'value'},
+            'value': [schedule for response in responses for schedule in response.get('value', [])]
+        }
+    
+    def _fetch_schedule_chunk(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int = 30
+    ) -> Dict[str, Any]:
+        """Call Graph getSchedule once."""
         url = f"{self.config.GRAPH_API_ENDPOINT}/users/me/calendar/getSchedule"
         
         payload = {
             "schedules": emails,
-            "startTime": {
-                "dateTime": start_time,
-                "timeZone": "Europe/Istanbul"
-            },
-            "endTime": {
-                "dateTime": end_time,
-                "timeZone": "Europe/Istanbul"
-            },
+            "startTime": self._graph_datetime(start_time),
+            "endTime": self._graph_datetime(end_time),
             "availabilityViewInterval": interval
         }
         
-        response = requests.post(url, headers=self._get_headers(), json=payload)
+        response = self._request('POST', url, headers=self._get_headers(), json=payload)
         
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Failed to get schedule: {response.status_code} - {response.text}")
     
+    def expand_participants(self, addresses: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Replace group and distribution-list addresses with their members.
+        
+        Args:
+            addresses: Participant or group email addresses
+        
+        Returns:
+            (participants, groups): de-duplicated participant addresses and
+            the member count of each expanded group
+        """
+        return self.group_expander.expand(addresses)
+    
+    def _lookup_groups(self, addresses: List[str]) -> Dict[str, str]:
+        """Return {address: group id} for the addresses that are groups."""
+        quoted = ', '.join("'" + address.replace("'", "''") + "'" for address in addresses)
+        response = self._request(
+            'GET',
+            f"{self.config.GRAPH_API_ENDPOINT}/groups",
+            headers=self._get_headers(),
+            params={'$filter': f"mail in ({quoted})", '$select': 'id,mail'}
+        )
+        if response.status_code != 200:
+            raise Exception(f"Failed to look up groups: {response.status_code} - {response.text}")
+        return {group['mail']: group['id'] for group in response.json().get('value', []) if group.get('mail')}
+    
+    def _list_group_members(self, group_id: str) -> Tuple[List[str], List[str]]:
+        """Return (member emails, nested group ids) of a group, following every page."""
+        url = f"{self.config.GRAPH_API_ENDPOINT}/groups/{group_id}/members"
+        params = {'$select': 'id,mail,userPrincipalName', '$top': '999'}
+        users: List[str] = []
+        groups: List[str] = []
+        
+        while url:
+            response = self._request('GET', url, headers=self._get_headers(), params=params)
+            params = None
+            if response.status_code != 200:
+                raise Exception(f"Failed to list group members: {response.status_code} - {response.text}")
+            page = response.json()
+            page_users, page_groups = graph_members(page)
+            users.extend(page_users)
+            groups.extend(page_groups)
+            url = page.get('@odata.nextLink')
+        
+        return users, groups
+    
     def create_meeting(
         self,
         subject: str,
@@ -88,11 +349,15 @@ class GraphAPIClient:
         end_time: str,
         attendees: List[str],
         body: Optional[str] = None,
-        is_online: bool = True
+        is_online: bool = True,
+        transaction_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a meeting event with Teams link.
         
+        Requests go through the write rate limiter, and throttled requests
+        are retried after the Retry-After delay Graph asks for.
+        
         Args:
             subject: Meeting subject/title
             start_time: Start time in ISO 8601 format
@@ -100,6 +365,8 @@ class GraphAPIClient:
             attendees: List of attendee email addresses
             body: Optional meeting description
             is_online: Whether to create a Teams online meeting (default: True)
+            transaction_id: Client identifier Graph uses to drop a repeated
+                POST of the same event
         
         Returns:
             Created event data from Microsoft Graph API
@@ -123,22 +390,28 @@ class GraphAPIClient:
                 "contentType": "HTML",
                 "content": body or "Toplantı detayları"
             },
-            "start": {
-                "dateTime": start_time,
-                "timeZone": "Europe/Istanbul"
-            },
-            "end": {
-                "dateTime": end_time,
-                "timeZone": "Europe/Istanbul"
-            },
+            "start": self._graph_datetime(start_time),
+            "end": self._graph_datetime(end_time),
             "attendees": attendee_list,
             "isOnlineMeeting": is_online,
             "onlineMeetingProvider": "teamsForBusiness" if is_online else None
         }
+        if transaction_id:
+            payload["transactionId"] = transaction_id
         
-        response = requests.post(url, headers=self._get_headers(), json=payload)
+        for attempt in range(self.MAX_WRITE_ATTEMPTS):
+            if not self.write_limiter.acquire():
+                raise Exception("Failed to create meeting: rate limit wait timed out")
+            response = self._request('POST', url, headers=self._get_headers(), json=payload)
+            if response.status_code not in (429, 503) or attempt == self.MAX_WRITE_ATTEMPTS - 1:
+                break
+            # Throttled: hold back every writer for the requested delay
+            self.write_limiter.pause(float(response.headers.get('Retry-After', 2 ** attempt)))
         
         if response.status_code == 201:
+            # The attendees' cached free/busy no longer includes this meeting
+            if self.schedule_cache is not None:
+                self.schedule_cache.invalidate(attendees)
             return response.json()
         else:
             raise Exception(f"Failed to create meeting: {response.status_code} - {response.text}")
@@ -149,7 +422,12 @@ class GraphAPIClient:
         start_date: str,
         end_date: str,
         time_range: str = "09:00-17:00",
-        duration: int = 60
+        duration: int = 60,
+        timeslots: Optional[List[Tuple[str, str]]] = None,
+        required_attendees: Optional[List[str]] = None,
+        minimum_attendee_percentage: float = 50,
+        max_candidates: Optional[int] = None,
+        respect_working_hours: bool = True
     ) -> Dict[str, Any]:
         """
         Find optimal meeting times using Microsoft Graph findMeetingTimes API.
@@ -160,15 +438,23 @@ class GraphAPIClient:
             end_date: End date (YYYY-MM-DD)
             time_range: Time range (HH:MM-HH:MM)
             duration: Meeting duration in minutes (default: 60)
+            timeslots: ISO 8601 (start, end) windows to search, e.g. one per
+                day; defaults to a single window from start_date to end_date
+            required_attendees: Attendees sent as required; when given, the
+                rest are sent as optional (default: everyone is required)
+            minimum_attendee_percentage: Minimum confidence of a suggestion
+            max_candidates: Maximum number of suggestions to return
+            respect_working_hours: Search only attendees' working hours
         
         Returns:
             Meeting time suggestions from Microsoft Graph API
         """
         url = f"{self.config.GRAPH_API_ENDPOINT}/users/me/findMeetingTimes"
         
+        required = {email.lower() for email in required_attendees} if required_attendees else None
         attendee_list = [
             {
-                "type": "required",
+                "type": "required" if required is None or email.lower() in required else "optional",
                 "emailAddress": {
                     "address": email
                 }
@@ -176,32 +462,32 @@ class GraphAPIClient:
             for email in attendees
         ]
         
-        # Parse time range
-        start_hour, end_hour = time_range.split('-')
+        if timeslots is None:
+            # Parse time range
+            start_hour, end_hour = time_range.split('-')
+            timeslots = [(f"{start_date}T{start_hour}:00", f"{end_date}T{end_hour}:00")]
         
         payload = {
             "attendees": attendee_list,
             "timeConstraint": {
-                "activityDomain": "work",
+                "activityDomain": "work" if respect_working_hours else "unrestricted",
                 "timeslots": [
                     {
-                        "start": {
-                            "dateTime": f"{start_date}T{start_hour}:00",
-                            "timeZone": "Europe/Istanbul"
-                        },
-                        "end": {
-                            "dateTime": f"{end_date}T{end_hour}:00",
-                            "timeZone": "Europe/Istanbul"
-                        }
+                        "start": self._graph_datetime(slot_start),
+                        "end": self._graph_datetime(slot_end)
                     }
+                    for slot_start, slot_end in timeslots
                 ]
             },
             "meetingDuration": f"PT{duration}M",
+            "isOrganizerOptional": True,
             "returnSuggestionReasons": True,
-            "minimumAttendeePercentage": 50
+            "minimumAttendeePercentage": minimum_attendee_percentage
         }
+        if max_candidates is not None:
+            payload["maxCandidates"] = max_candidates
         
-        response = requests.post(url, headers=self._get_headers(), json=payload)
+        response = self._request('POST', url, headers=self._get_headers(), json=payload)
         
         if response.status_code == 200:
             return response.json()
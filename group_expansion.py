@@ -0,0 +1,160 @@
+"""Expansion of group and distribution-list addresses into their members."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from deadline import current_deadline, deadline_scope
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+
+class GroupExpander:
+    """
+    Resolves group addresses to the people in them.
+    
+    Which addresses are groups, and the direct members of each group, are
+    cached with a TTL on a cache backend (the schedule cache's by default),
+    so repeated searches over the same department skip the membership
+    calls. Nested groups are walked level by level: every group of a level
+    is fetched in parallel, and a group reached twice is only expanded once.
+    """
+    
+    def __init__(
+        self,
+        lookup_groups: Callable[[List[str]], Dict[str, str]],
+        list_members: Callable[[str], Tuple[List[str], List[str]]],
+        backend,
+        ttl: int = 3600,
+        max_workers: int = 8,
+        lookup_chunk_size: int = 15
+    ):
+        """
+        Initialize the expander.
+        
+        Args:
+            lookup_groups: Returns {address: group id} for the addresses
+                that are groups
+            list_members: Returns (member emails, nested group ids) of a group,
+                following every page
+            backend: Cache backend with get/set
+            ttl: Seconds to keep lookups and memberships
+            max_workers: Parallel Graph calls
+            lookup_chunk_size: Addresses per group lookup call
+        """
+        self.lookup_groups = lookup_groups
+        self.list_members = list_members
+        self.backend = backend
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.lookup_chunk_size = lookup_chunk_size
+    
+    def expand(self, addresses: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Replace group addresses with their members.
+        
+        Args:
+            addresses: Participant or group email addresses
+        
+        Returns:
+            (participants, groups): de-duplicated participant addresses in
+            request order, and the member count of each expanded group
+        """
+        group_ids = self._group_ids(addresses)
+        
+        participants: Dict[str, str] = {}
+        groups: Dict[str, int] = {}
+        for address in addresses:
+            group_id = group_ids.get(address.lower())
+            if group_id is None:
+                participants.setdefault(address.lower(), address)
+                continue
+            members = self._transitive_members(group_id)
+            groups[address] = len(members)
+            for member in members:
+                participants.setdefault(member.lower(), member)
+        
+        return list(participants.values()), groups
+    
+    def _group_ids(self, addresses: List[str]) -> Dict[str, str]:
+        """Group id of every address that is a group, keyed by lowercase address."""
+        group_ids: Dict[str, str] = {}
+        missing = []
+        for address in dict.fromkeys(address.lower() for address in addresses):
+            cached = self.backend.get(f"group|{address}")
+            if cached is None:
+                missing.append(address)
+                continue
+            group_id = json.loads(cached)
+            if group_id:
+                group_ids[address] = group_id
+        
+        chunks = [
+            missing[start:start + self.lookup_chunk_size]
+            for start in range(0, len(missing), self.lookup_chunk_size)
+        ]
+        for chunk, found in zip(chunks, self._parallel(self.lookup_groups, chunks)):
+            found = {address.lower(): group_id for address, group_id in found.items()}
+            for address in chunk:
+                # Plain mailboxes are cached too (as null) so they are not looked up again
+                self.backend.set(
+                    f"group|{address}", json.dumps(found.get(address)).encode('utf-8'), self.ttl
+                )
+            group_ids.update(found)
+        
+        return group_ids
+    
+    def _transitive_members(self, group_id: str) -> List[str]:
+        """Every person in a group and its nested groups."""
+        members: Dict[str, str] = {}
+        visited = {group_id}
+        level = [group_id]
+        
+        while level:
+            next_level = []
+            for users, nested in self._parallel(self._direct_members, level):
+                for user in users:
+                    members.setdefault(user.lower(), user)
+                for nested_id in nested:
+                    if nested_id not in visited:
+                        visited.add(nested_id)
+                        next_level.append(nested_id)
+            level = next_level
+        
+        return list(members.values())
+    
+    def _direct_members(self, group_id: str) -> Tuple[List[str], List[str]]:
+        """Direct members of a group, from the cache or Graph."""
+        cached = self.backend.get(f"members|{group_id}")
+        if cached is not None:
+            users, nested = json.loads(cached)
+            return users, nested
+        users, nested = self.list_members(group_id)
+        self.backend.set(
+            f"members|{group_id}", json.dumps([users, nested]).encode('utf-8'), self.ttl
+        )
+        return users, nested
+    
+    def _parallel(self, function: Callable, items: List[Any]) -> List[Any]:
+        """Map ``function`` over ``items`` on a thread pool, keeping order."""
+        if len(items) <= 1:
+            return [function(item) for item in items]
+        deadline = current_deadline()
+        
+        def call(item):
+            with deadline_scope(deadline):
+                return function(item)
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(call, items))
+
+
+def graph_members(page: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Split one page of a Graph members listing into user emails and group ids."""
+    users = []
+    groups = []
+    for member in page.get('value', []):
+        kind = member.get('@odata.type', '')
+        if kind == '#microsoft.graph.group':
+            groups.append(member['id'])
+        elif kind == '#microsoft.graph.user':
+            address: Optional[str] = member.get('mail') or member.get('userPrincipalName')
+            if address:
+                users.append(address)
+    return users, groups
@@ -0,0 +1,45 @@
+"""
+Gunicorn configuration for production serving
+Run with: gunicorn -c gunicorn.conf.py
+"""
+from config import Config
+
+wsgi_app = 'app:app'
+bind = f'0.0.0.0:{Config.FLASK_PORT}'
+
+# One process per core, each serving several requests on threads
+workers = Config.SERVER_WORKERS
+threads = Config.SERVER_THREADS
+worker_class = 'gthread'
+
+timeout = Config.SERVER_TIMEOUT
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT
+keepalive = Config.SERVER_KEEPALIVE
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = Config.SERVER_MAX_REQUESTS // 10
+
+# Import the app in the master so workers fork with warm state
+preload_app = True
+# Requests are logged by the app (logging_config) with their request id
+accesslog = None
+errorlog = '-'
+
+
+def when_ready(server):
+    """Validate configuration and build the Graph client before workers fork."""
+    from app import warm_up
+    warm_up()
+    server.log.info(
+        f"Meeting Planner Assistant ready: {workers} workers x {threads} threads on {bind}"
+    )
+
+
+def post_fork(server, worker):
+    """Give each worker its own random state for mock data."""
+    import random
+    random.seed()
+
+
+def worker_int(worker):
+    """Log workers interrupted during a graceful shutdown."""
+    worker.log.info(f"Worker {worker.pid} shutting down")
@@ -0,0 +1,87 @@
+"""Idempotency keys for meeting creation, shared by all worker processes on a node."""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Any, Optional
+from config import Config
+from schedule_cache import MemoryCacheBackend, SQLiteCacheBackend
+
+
+class IdempotencyStore:
+    """
+    Records which idempotency keys have already created a meeting.
+    
+    A key is claimed atomically before the meeting is created, so two
+    concurrent retries cannot both create it. The record holds a hash of
+    the request, which catches a key reused for a different meeting, and
+    the created meeting once it exists.
+    """
+    
+    # Seconds a claim without a result blocks retries, in case a worker dies mid-request
+    PENDING_TTL = 120
+    
+    def __init__(self, backend, ttl: int = 86400):
+        """Initialize the store on top of a cache backend with add/get/set/delete."""
+        self.backend = backend
+        self.ttl = ttl
+    
+    @staticmethod
+    def fingerprint(request: Dict[str, Any]) -> str:
+        """Stable hash of a create request."""
+        encoded = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"idempotency|{key}"
+    
+    def claim(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim a key for a new request.
+        
+        Returns:
+            None if the key was free and is now claimed; otherwise the
+            existing record, with 'fingerprint' and, once the meeting
+            exists, 'meeting'
+        """
+        record = json.dumps({'fingerprint': fingerprint}).encode('utf-8')
+        if self.backend.add(self._key(key), record, self.PENDING_TTL):
+            return None
+        existing = self.backend.get(self._key(key))
+        if existing is None:
+            # Expired between the two calls; try once more
+            if self.backend.add(self._key(key), record, self.PENDING_TTL):
+                return None
+            existing = self.backend.get(self._key(key)) or record
+        return json.loads(existing)
+    
+    def complete(self, key: str, fingerprint: str, meeting: Dict[str, Any]):
+        """Store the meeting created for a claimed key."""
+        self.backend.set(
+            self._key(key),
+            json.dumps({'fingerprint': fingerprint, 'meeting': meeting}).encode('utf-8'),
+            self.ttl
+        )
+    
+    def release(self, key: str):
+        """Drop a claim whose request failed, so a retry can create the meeting."""
+        self.backend.delete(self._key(key))
+
+
+def build_idempotency_store() -> IdempotencyStore:
+    """Build the idempotency store configured in Config."""
+    backend_name = Config.IDEMPOTENCY_BACKEND
+    
+    if backend_name == 'memory':
+        backend = MemoryCacheBackend(Config.IDEMPOTENCY_MAX_ENTRIES)
+    elif backend_name == 'sqlite':
+        path = Config.IDEMPOTENCY_PATH or os.path.join(
+            '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+            'meeting-planner-idempotency.sqlite'
+        )
+        backend = SQLiteCacheBackend(path, Config.IDEMPOTENCY_MAX_ENTRIES)
+    else:
+        raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {backend_name}")
+    
+    return IdempotencyStore(backend, ttl=Config.IDEMPOTENCY_TTL)
@@ -0,0 +1,139 @@
+"""Minute-precision free-window search over busy intervals."""
+import bisect
+from typing import List, Dict, Any, Tuple
+import pytz
+from timeline import Timeline, to_epoch_minute
+
+
+# scheduleItems statuses that make a participant unavailable; tentative
+# counts as available, as in the availabilityView analysis
+BUSY_STATUSES = {'busy', 'oof', 'workingElsewhere', 'unknown'}
+
+
+def busy_intervals(schedule: Dict[str, Any], timeline: Timeline, day: int, tz) -> List[Tuple[int, int]]:
+    """
+    Merged busy intervals of one participant for one timeline day.
+    
+    Intervals come from ``scheduleItems`` at minute precision. When Graph
+    returned no items but the availabilityView shows busy time (items can
+    be hidden by permissions), the view's intervals are used instead.
+    
+    Args:
+        schedule: One entry of getSchedule's ``value`` list
+        timeline: Timeline the schedule was fetched for
+        day: Timeline day index
+        tz: pytz timezone for items without a time zone
+    
+    Returns:
+        Sorted, non-overlapping (start, end) pairs in epoch minutes
+    """
+    intervals = []
+    items = schedule.get('scheduleItems') or []
+    
+    for item in items:
+        if item.get('status') not in BUSY_STATUSES:
+            continue
+        start, end = item['start'], item['end']
+        item_tz = _timezone(start.get('timeZone'), tz)
+        intervals.append((
+            to_epoch_minute(start['dateTime'], item_tz),
+            to_epoch_minute(end['dateTime'], item_tz)
+        ))
+    
+    if not items:
+        view = schedule.get('availabilityView', '')
+        step = timeline.interval_minutes
+        for index, code in enumerate(view):
+            if code not in '01':
+                start = timeline.minute_of(day, index)
+                intervals.append((start, start + step))
+    
+    intervals.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _timezone(name: str, default):
+    """pytz timezone for an IANA name, falling back to ``default`` (e.g. Windows names)."""
+    if not name:
+        return default
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        return default
+
+
+def valid_starts(
+    busy: List[Tuple[int, int]],
+    range_start: int,
+    range_end: int,
+    duration: int
+) -> List[Tuple[int, int]]:
+    """
+    Start minutes at which a participant is free for ``duration`` minutes.
+    
+    Args:
+        busy: Merged busy intervals
+        range_start: Earliest meeting start (epoch minutes)
+        range_end: Latest meeting end (epoch minutes)
+        duration: Meeting duration in minutes
+    
+    Returns:
+        Half-open [first, last + 1) ranges of valid start minutes
+    """
+    starts = []
+    cursor = range_start
+    for busy_start, busy_end in busy:
+        if busy_end <= cursor:
+            continue
+        if busy_start >= range_end:
+            break
+        if busy_start - cursor >= duration:
+            starts.append((cursor, busy_start - duration + 1))
+        cursor = max(cursor, busy_end)
+    if range_end - cursor >= duration:
+        starts.append((cursor, range_end - duration + 1))
+    return starts
+
+
+def sweep(participant_starts: List[List[Tuple[int, int]]]) -> List[Tuple[int, int, int]]:
+    """
+    Sweep line over every participant's valid-start ranges.
+    
+    Args:
+        participant_starts: valid_starts() result per participant
+    
+    Returns:
+        (start, end, available_count) segments with a constant count, in
+        time order; segments nobody is available in are left out
+    """
+    events = []
+    for ranges in participant_starts:
+        for first, stop in ranges:
+            events.append((first, 1))
+            events.append((stop, -1))
+    events.sort()
+    
+    segments = []
+    count = 0
+    index = 0
+    while index < len(events):
+        minute = events[index][0]
+        while index < len(events) and events[index][0] == minute:
+            count += events[index][1]
+            index += 1
+        if index < len(events) and count > 0:
+            segments.append((minute, events[index][0], count))
+    return segments
+
+
+def is_free(ranges: List[Tuple[int, int]], minute: int) -> bool:
+    """Whether ``minute`` falls in one of the half-open ranges."""
+    position = bisect.bisect_right(ranges, (minute, float('inf'))) - 1
+    return position >= 0 and ranges[position][0] <= minute < ranges[position][1]
@@ -0,0 +1,50 @@
+"""Fast JSON encoding for Flask responses, with orjson when it is installed."""
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that skips key sorting and pretty printing."""
+    
+    sort_keys = False
+    ensure_ascii = False
+    compact = True
+    
+    def __init__(self, app, encoder: str = 'auto'):
+        """
+        Initialize the provider.
+        
+        Args:
+            app: Flask application
+            encoder: 'orjson', 'stdlib' or 'auto' (orjson when installed)
+        """
+        super().__init__(app)
+        if encoder == 'orjson' and orjson is None:
+            raise ValueError("JSON_ENCODER=orjson but the orjson package is not installed")
+        self.use_orjson = orjson is not None and encoder in ('auto', 'orjson')
+    
+    def dumps(self, obj, **kwargs) -> str:
+        """Serialize data as a JSON string."""
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+    
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        """Serialize data as UTF-8 encoded JSON."""
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(obj, default=self.default)
+        
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs).encode('utf-8')
+
+
+def init_json(app, encoder: str = 'auto'):
+    """Install the fast JSON provider on the Flask app."""
+    app.json = FastJSONProvider(app, encoder)
+    return app
@@ -0,0 +1,190 @@
+"""Structured, non-blocking logging for the Flask API, written by a background thread."""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from flask import g, has_request_context, request
+
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with extra fields and the request id."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_') and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Tag records with the current request and apply per-route sampling.
+    
+    Whether a request is sampled is decided once when it starts, so either
+    all of its debug/info records are kept or none are; warnings and errors
+    are always kept.
+    """
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not has_request_context():
+            return True
+        record.request_id = g.get('request_id')
+        record.route = request.path
+        record.tenant = g.get('tenant')
+        if record.levelno < logging.WARNING and not g.get('log_sampled', True):
+            return False
+        return True
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Queue handler whose writer thread follows the process.
+    
+    The writer thread does not survive a fork (e.g. Gunicorn workers
+    forked from a preloaded master), so each process starts its own on its
+    first record. When the queue is full records are dropped and counted
+    in ``dropped`` (per process, reported by /health) instead of blocking
+    the request.
+    """
+    
+    _traceback_formatter = logging.Formatter()
+    
+    def __init__(self, target: logging.Handler, max_size: int = 10000):
+        """Initialize the handler writing to ``target``."""
+        super().__init__(queue.Queue(max_size))
+        self.target = target
+        self.max_size = max_size
+        self.dropped = 0
+        self._listener: Optional[QueueListener] = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+    
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Records queued before a fork belong to the parent's writer
+            self.queue = queue.Queue(self.max_size)
+            self.dropped = 0
+            self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Render the message and traceback now, while their arguments are still current."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+    
+    def flush(self):
+        """Write out everything queued so far and restart the writer."""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener.start()
+    
+    def close(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+        super().close()
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "route=rate,route=rate" (e.g. "/health=0,/api/check-availability=0.1")."""
+    rates = {}
+    for item in value.split(','):
+        route, separator, rate = item.strip().partition('=')
+        if separator:
+            rates[route.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def init_logging(app, config):
+    """
+    Send log records through a background writer and log every request.
+    
+    Each request gets an id (the incoming X-Request-ID header, or a new
+    one) that is attached to its log records and returned in the
+    X-Request-ID response header.
+    """
+    target = logging.StreamHandler(sys.stdout)
+    if config.LOG_FORMAT == 'json':
+        target.setFormatter(JSONFormatter())
+    else:
+        target.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s',
+            defaults={'request_id': '-'}
+        ))
+    
+    handler = BackgroundQueueHandler(target, config.LOG_QUEUE_SIZE)
+    handler.addFilter(RequestContextFilter())
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, BackgroundQueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(config.LOG_LEVEL)
+    atexit.register(handler.close)
+    
+    sample_rates = parse_sample_rates(config.LOG_SAMPLE_RATES)
+    access_logger = logging.getLogger('access')
+    
+    @app.before_request
+    def start_request_log():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        g.log_sampled = random.random() < sample_rates.get(route, config.LOG_SAMPLE_RATE)
+    
+    @app.after_request
+    def finish_request_log(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        elapsed = time.perf_counter() - g.get('request_started', time.perf_counter())
+        access_logger.info(
+            f"{request.method} {request.path} {response.status_code}",
+            extra={
+                'method': request.method,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 1)
+            }
+        )
+        return response
+    
+    app.extensions['log_handler'] = handler
+    return app
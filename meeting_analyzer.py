@@ -1,15 +1,34 @@
 """Meeting availability analyzer to find optimal meeting times."""
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Sequence
 from datetime import datetime, timedelta
+import bisect
+import heapq
+import math
+import time
 import pytz
+from timeline import Timeline, to_epoch_minute
+from deadline import Deadline
+import interval_engine
 
 
 class MeetingAnalyzer:
     """Analyzes participant schedules to find optimal meeting times."""
     
-    def __init__(self, timezone: str = "Europe/Istanbul"):
-        """Initialize the analyzer with a timezone."""
+    def __init__(self, timezone: str = "Europe/Istanbul", scanner=None):
+        """
+        Initialize the analyzer with a timezone.
+        
+        Args:
+            timezone: Time zone for dates and display
+            scanner: Optional ParallelScanner that takes over window scans
+                large enough to be worth spreading over processes
+        """
         self.timezone = pytz.timezone(timezone)
+        self.scanner = scanner
+        self.windows_analyzed = 0
+        self.windows_pruned = 0
+        # Days left out of the last analysis because its deadline passed
+        self.unanalyzed_days: List[int] = []
     
     def parse_availability_view(self, availability_view: str) -> List[int]:
         """
@@ -30,21 +49,55 @@ class MeetingAnalyzer:
         """
         return [int(code) for code in availability_view]
     
+    def build_timeline(
+        self,
+        start_date: str,
+        end_date: str,
+        time_range: str = "09:00-17:00",
+        interval_minutes: int = 30
+    ) -> Timeline:
+        """
+        Build the integer-offset timeline for a date range.
+        
+        Args:
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            time_range: Daily time range (HH:MM-HH:MM)
+            interval_minutes: Interval in minutes for availability views
+        
+        Returns:
+            Timeline with one entry per weekday in the range
+        """
+        return Timeline.from_date_range(
+            start_date, end_date, time_range, self.timezone, interval_minutes
+        )
+    
     def analyze_schedule_data(
         self,
         schedule_data: Dict[str, Any],
         start_time: datetime,
         interval_minutes: int = 30,
-        duration_minutes: int = 60
+        duration_minutes: int = 60,
+        min_percentage: float = 0.0,
+        top_n: Optional[int] = None,
+        required_attendees: Optional[Iterable[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Analyze schedule data to find time slots with maximum availability.
         
+        When a threshold, a top-N target or required attendees are given, a
+        window is abandoned as soon as its best possible count can no longer
+        reach the threshold or beat the current Nth-best window, or as soon
+        as a required attendee turns out to be busy.
+        
         Args:
             schedule_data: Schedule data from Graph API getSchedule
             start_time: Start time of the search period
             interval_minutes: Interval in minutes for availability view
             duration_minutes: Desired meeting duration in minutes
+            min_percentage: Minimum availability percentage to keep a window
+            top_n: Keep only the N best windows (None keeps every window)
+            required_attendees: Attendees that must be free in every window
         
         Returns:
             List of available time slots with participant information
@@ -55,57 +108,803 @@ class MeetingAnalyzer:
             return []
         
         # Get the length of availability view
-        first_schedule = schedules[0]
-        availability_length = len(first_schedule.get('availabilityView', ''))
+        availability_length = len(schedules[0].get('availabilityView', ''))
         
         if availability_length == 0:
             return []
         
-        # Calculate how many intervals needed for the meeting duration
-        intervals_needed = duration_minutes // interval_minutes
+        timeline = Timeline.from_start(start_time, availability_length, interval_minutes)
+        return self.analyze_timeline(
+            timeline,
+            {0: schedule_data},
+            duration_minutes=duration_minutes,
+            min_percentage=min_percentage,
+            top_n=top_n,
+            required_attendees=required_attendees
+        )
+    
+    def analyze_timeline(
+        self,
+        timeline: Timeline,
+        day_schedules: Dict[int, Dict[str, Any]],
+        duration_minutes: int = 60,
+        min_percentage: float = 0.0,
+        top_n: Optional[int] = None,
+        required_attendees: Optional[Iterable[str]] = None,
+        formatted: bool = False,
+        roster: Optional[List[str]] = None,
+        include_participants: bool = True,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Score every window of a timeline in one pass.
         
-        # Analyze each time slot
-        time_slots = []
+        Windows are addressed by epoch minute and scanned through the
+        timeline's precomputed day/window index, so the pruning bounds of
+        ``analyze_schedule_data`` hold across the whole date range.
+        Datetimes and ISO strings are only built for the windows returned.
+        
+        Args:
+            timeline: Timeline the schedules were fetched for
+            day_schedules: getSchedule data keyed by timeline day index
+            duration_minutes: Desired meeting duration in minutes
+            min_percentage: Minimum availability percentage to keep a window
+            top_n: Keep only the N best windows (None keeps every window)
+            required_attendees: Attendees that must be free in every window
+            formatted: Also add the display string of each slot
+            roster: Shared participant list; when given, participant lists
+                hold indices into it instead of email addresses (unknown
+                addresses are appended)
+            include_participants: Whether to list available/busy participants
+            deadline: Stop at the first day reached after the deadline has
+                passed; skipped days are left in ``unanalyzed_days``
+        
+        Returns:
+            List of available time slots with participant information
+        """
+        interval_minutes = timeline.interval_minutes
+        # Every interval the meeting touches must be free: a 45-minute meeting
+        # on 30-minute intervals checks an hour, a 15-minute one half an hour
+        intervals_needed = -(-duration_minutes // interval_minutes)
+        required = set(required_attendees or ())
+        
+        # Per-day participant columns, required attendees first so a busy one
+        # ends the window early
+        days: Dict[int, Tuple[List[str], list, int]] = {}
+        for day, schedule_data in day_schedules.items():
+            schedules = schedule_data.get('value', [])
+            if not schedules:
+                continue
+            emails = [schedule.get('scheduleId', '') for schedule in schedules]
+            participants = sorted(
+                (
+                    (
+                        index,
+                        emails[index] in required,
+                        self._free_run_lengths(schedule.get('availabilityView', ''))
+                    )
+                    for index, schedule in enumerate(schedules)
+                ),
+                key=lambda participant: not participant[1]
+            )
+            labels = emails if roster is None else self._roster_indices(roster, emails)
+            days[day] = (labels, participants, len(schedules))
+        
+        scan_days = {day: (participants, total) for day, (_, participants, total) in days.items()}
+        if self.scanner is not None and self.scanner.worthwhile(scan_days):
+            windows, analyzed, pruned, self.unanalyzed_days = self.scanner.scan(
+                scan_days, timeline, intervals_needed, min_percentage, top_n, deadline
+            )
+        else:
+            window_days, window_offsets = timeline.window_index(intervals_needed)
+            windows, analyzed, pruned, self.unanalyzed_days = scan_windows(
+                scan_days, window_days, window_offsets, timeline.day_starts,
+                interval_minutes, intervals_needed, min_percentage, top_n, deadline
+            )
+        self.windows_analyzed += analyzed
+        self.windows_pruned += pruned
+        
+        # Sort by available count (descending) and then by time
+        ranked = sorted(windows.items(), key=lambda item: (-len(item[1][1]), item[0]))
+        
+        return [
+            self._materialize_slot(
+                timeline, day, minute, duration_minutes,
+                days[day][0], available, busy, formatted, include_participants
+            )
+            for minute, (day, available, busy) in ranked
+        ]
+    
+    def analyze_intervals(
+        self,
+        timeline: Timeline,
+        day_schedules: Dict[int, Dict[str, Any]],
+        duration_minutes: int = 60,
+        min_percentage: float = 0.0,
+        top_n: Optional[int] = None,
+        required_attendees: Optional[Iterable[str]] = None,
+        formatted: bool = False,
+        roster: Optional[List[str]] = None,
+        include_participants: bool = True,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find free windows at minute precision from ``scheduleItems``.
+        
+        Each participant's busy intervals are merged and turned into the
+        ranges of minutes a meeting of this duration could start at; a
+        sweep line over those ranges yields every stretch of start times
+        with a constant number of available participants. The cost is
+        O(events log events), independent of the availabilityView interval.
+        
+        Args:
+            timeline: Timeline the schedules were fetched for
+            day_schedules: getSchedule data keyed by timeline day index
+            duration_minutes: Desired meeting duration in minutes
+            min_percentage: Minimum availability percentage to keep a window
+            top_n: Keep only the N best windows (None keeps every window)
+            required_attendees: Attendees that must be free in every window
+            formatted: Also add the display string of each slot
+            roster: Shared participant list; when given, participant lists
+                hold indices into it instead of email addresses
+            include_participants: Whether to list available/busy participants
+            deadline: Stop at the first day reached after the deadline has
+                passed; skipped days are left in ``unanalyzed_days``
+        
+        Returns:
+            Slots in the analyze_timeline format, plus the 'latest_start_time'
+            the meeting could start at with the same participants
+        """
+        starts_by_email: Dict[str, List[Tuple[int, int]]] = {}
+        self.unanalyzed_days = []
+        
+        for day in sorted(day_schedules):
+            if deadline is not None and deadline.passed():
+                self.unanalyzed_days = [later for later in sorted(day_schedules) if later >= day]
+                break
+            range_start = timeline.day_starts[day]
+            range_end = range_start + timeline.day_spans[day]
+            for schedule in day_schedules[day].get('value', []):
+                email = schedule.get('scheduleId', '')
+                busy = interval_engine.busy_intervals(schedule, timeline, day, self.timezone)
+                starts_by_email.setdefault(email, []).extend(
+                    interval_engine.valid_starts(busy, range_start, range_end, duration_minutes)
+                )
+        
+        emails = list(starts_by_email)
+        total = len(emails)
+        if total == 0:
+            return []
         
-        for i in range(availability_length - intervals_needed + 1):
-            slot_start = start_time + timedelta(minutes=i * interval_minutes)
-            slot_end = slot_start + timedelta(minutes=duration_minutes)
+        labels = emails if roster is None else self._roster_indices(roster, emails)
+        starts = [starts_by_email[email] for email in emails]
+        required_set = set(required_attendees or ())
+        required = [index for index, email in enumerate(emails) if email in required_set]
+        min_count = self._min_count_for_percentage(min_percentage, total)
+        
+        segments = interval_engine.sweep(starts)
+        self.windows_analyzed += len(segments)
+        
+        kept = [
+            segment for segment in segments
+            if segment[2] >= min_count and all(
+                interval_engine.is_free(starts[index], segment[0]) for index in required
+            )
+        ]
+        self.windows_pruned += len(segments) - len(kept)
+        kept.sort(key=lambda segment: (-segment[2], segment[0]))
+        if top_n is not None:
+            kept = kept[:top_n]
+        
+        slots = []
+        for first, stop, _ in kept:
+            day = bisect.bisect_right(timeline.day_starts, first) - 1
+            available = [index for index in range(total) if interval_engine.is_free(starts[index], first)]
+            busy = [index for index in range(total) if not interval_engine.is_free(starts[index], first)]
+            slot = self._materialize_slot(
+                timeline, day, first, duration_minutes, labels,
+                available, busy, formatted, include_participants
+            )
+            slot['latest_start_time'] = timeline.isoformat(day, stop - 1)
+            slots.append(slot)
+        
+        return slots
+    
+    def analyze_meeting_time_suggestions(
+        self,
+        timeline: Timeline,
+        result: Dict[str, Any],
+        participants: List[str],
+        duration_minutes: int = 60,
+        min_percentage: float = 0.0,
+        top_n: Optional[int] = None,
+        required_attendees: Optional[Iterable[str]] = None,
+        formatted: bool = False,
+        roster: Optional[List[str]] = None,
+        include_participants: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Turn a Graph findMeetingTimes result into slots.
+        
+        Suggestions outside the timeline's search windows are dropped, and
+        the same percentage, required-attendee and ranking rules as
+        analyze_timeline are applied, so both paths return the same format.
+        Free and tentative attendees count as available.
+        
+        Args:
+            timeline: Timeline the search covers
+            result: findMeetingTimes response
+            participants: Participant email addresses
+            duration_minutes: Meeting duration in minutes
+            min_percentage: Minimum availability percentage to keep a slot
+            top_n: Keep only the N best slots (None keeps every slot)
+            required_attendees: Attendees that must be free in every slot
+            formatted: Also add the display string of each slot
+            roster: Shared participant list; when given, participant lists
+                hold indices into it instead of email addresses
+            include_participants: Whether to list available/busy participants
+        
+        Returns:
+            List of slots in the analyze_timeline format
+        """
+        total = len(participants)
+        if total == 0:
+            return []
+        
+        positions = {email.lower(): index for index, email in enumerate(participants)}
+        labels = participants if roster is None else self._roster_indices(roster, participants)
+        required = {positions[email.lower()] for email in required_attendees or () if email.lower() in positions}
+        min_count = self._min_count_for_percentage(min_percentage, total)
+        
+        windows: Dict[int, Tuple[int, List[int], List[int]]] = {}
+        suggestions = result.get('meetingTimeSuggestions', [])
+        self.windows_analyzed += len(suggestions)
+        
+        for suggestion in suggestions:
+            start = suggestion.get('meetingTimeSlot', {}).get('start')
+            if not start:
+                continue
+            tz = interval_engine._timezone(start.get('timeZone'), self.timezone)
+            minute = to_epoch_minute(start['dateTime'], tz)
+            day = bisect.bisect_right(timeline.day_starts, minute) - 1
+            if day < 0 or minute + duration_minutes > timeline.day_starts[day] + timeline.day_spans[day]:
+                continue
             
-            available_participants = []
-            busy_participants = []
+            free = set()
+            for entry in suggestion.get('attendeeAvailability', []):
+                address = entry.get('attendee', {}).get('emailAddress', entry.get('emailAddress'))
+                if isinstance(address, dict):
+                    address = address.get('address')
+                if entry.get('availability') in ('free', 'tentative') and address:
+                    index = positions.get(address.lower())
+                    if index is not None:
+                        free.add(index)
             
-            for schedule in schedules:
-                email = schedule.get('scheduleId', '')
-                availability_view = schedule.get('availabilityView', '')
-                
-                if len(availability_view) <= i:
+            if len(free) < min_count or not required <= free:
+                self.windows_pruned += 1
+                continue
+            windows[minute] = (
+                day,
+                sorted(free),
+                [index for index in range(total) if index not in free]
+            )
+        
+        ranked = sorted(windows.items(), key=lambda item: (-len(item[1][1]), item[0]))
+        if top_n is not None:
+            ranked = ranked[:top_n]
+        
+        return [
+            self._materialize_slot(
+                timeline, day, minute, duration_minutes,
+                labels, available, busy, formatted, include_participants
+            )
+            for minute, (day, available, busy) in ranked
+        ]
+    
+    def _materialize_slot(
+        self,
+        timeline: Timeline,
+        day: int,
+        minute: int,
+        duration_minutes: int,
+        labels: List[Any],
+        available: List[int],
+        busy: List[int],
+        formatted: bool = False,
+        include_participants: bool = True
+    ) -> Dict[str, Any]:
+        """Turn a scored window into the slot dictionary returned by the API."""
+        slot_start = timeline.to_datetime(day, minute)
+        slot_end = slot_start + timedelta(minutes=duration_minutes)
+        total = len(labels)
+        
+        slot = {
+            'start_time': slot_start.isoformat(),
+            'end_time': slot_end.isoformat(),
+            'available_count': len(available),
+            'total_participants': total
+        }
+        if include_participants:
+            slot['available_participants'] = [labels[index] for index in sorted(available)]
+            slot['busy_participants'] = [labels[index] for index in sorted(busy)]
+        slot['availability_percentage'] = len(available) / total * 100
+        if formatted:
+            slot['formatted'] = self.format_window(
+                slot_start, slot_end, slot['available_count'], total,
+                slot['availability_percentage']
+            )
+        return slot
+    
+    def window_masks(
+        self,
+        schedule_data: Dict[str, Any],
+        intervals_needed: int,
+        roster: List[str]
+    ) -> List[int]:
+        """
+        Build one availability bitmask per window of a day.
+        
+        Bit ``k`` of a mask is set when roster participant ``k`` is free for
+        the whole window, so combining days or weeks is a bitwise AND and a
+        count is ``int.bit_count``.
+        
+        Args:
+            schedule_data: Schedule data from Graph API getSchedule
+            intervals_needed: Number of intervals a window spans
+            roster: Shared participant list defining the bit positions
+        
+        Returns:
+            List of bitmasks, one per window start
+        """
+        schedules = schedule_data.get('value', [])
+        if not schedules:
+            return []
+        
+        length = len(schedules[0].get('availabilityView', ''))
+        masks = [0] * max(length - intervals_needed + 1, 0)
+        bits = self._roster_indices(roster, [s.get('scheduleId', '') for s in schedules])
+        
+        for bit, schedule in zip(bits, schedules):
+            free_runs = self._free_run_lengths(schedule.get('availabilityView', ''))
+            flag = 1 << bit
+            for i in range(min(len(masks), len(free_runs))):
+                if free_runs[i] >= min(intervals_needed, len(free_runs) - i):
+                    masks[i] |= flag
+        
+        return masks
+    
+    def analyze_recurring(
+        self,
+        timeline: Timeline,
+        day_schedules: Dict[int, Dict[str, Any]],
+        roster: List[str],
+        duration_minutes: int = 60,
+        min_percentage: float = 0.0,
+        top_n: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find weekly slots that work across every week of a timeline.
+        
+        Windows at the same weekday and time are folded together: their
+        masks are AND-ed to find who is free every week, and their counts
+        give the worst-case and average occurrence availability. The work
+        grows with weeks x windows and needs no API calls beyond the
+        schedules already fetched.
+        
+        Args:
+            timeline: Timeline covering the weeks to search
+            day_schedules: getSchedule data keyed by timeline day index
+            roster: Participant list defining the bit positions
+            duration_minutes: Desired meeting duration in minutes
+            min_percentage: Minimum worst-case availability percentage
+            top_n: Keep only the N best weekly slots (None keeps all)
+        
+        Returns:
+            Weekly slots ranked by worst-case, then average availability
+        """
+        interval_minutes = timeline.interval_minutes
+        intervals_needed = -(-duration_minutes // interval_minutes)
+        
+        # (weekday, window index) -> [first day, AND mask, counts per week]
+        folded: Dict[Tuple[int, int], list] = {}
+        for day in sorted(day_schedules):
+            weekday = timeline.day_dates[day].weekday()
+            masks = self.window_masks(day_schedules[day], intervals_needed, roster)
+            for i, mask in enumerate(masks):
+                self.windows_analyzed += 1
+                entry = folded.get((weekday, i))
+                if entry is None:
+                    folded[(weekday, i)] = [day, mask, [mask.bit_count()]]
+                else:
+                    entry[1] &= mask
+                    entry[2].append(mask.bit_count())
+        
+        total = len(roster)
+        min_count = self._min_count_for_percentage(min_percentage, total)
+        slots = []
+        
+        for (weekday, i), (day, common_mask, counts) in folded.items():
+            worst_case = min(counts)
+            if worst_case < min_count:
+                continue
+            slots.append((worst_case, sum(counts) / len(counts), day, i, common_mask, counts))
+        
+        slots.sort(key=lambda slot: (-slot[0], -slot[1], timeline.minute_of(slot[2], slot[3])))
+        if top_n is not None:
+            slots = slots[:top_n]
+        
+        return [
+            self._materialize_recurring_slot(
+                timeline, day, i, duration_minutes, roster,
+                worst_case, average, common_mask, counts
+            )
+            for worst_case, average, day, i, common_mask, counts in slots
+        ]
+    
+    def _materialize_recurring_slot(
+        self,
+        timeline: Timeline,
+        day: int,
+        index: int,
+        duration_minutes: int,
+        roster: List[str],
+        worst_case: int,
+        average: float,
+        common_mask: int,
+        counts: List[int]
+    ) -> Dict[str, Any]:
+        """Turn a folded weekly window into the slot dictionary returned by the API."""
+        slot_start = timeline.to_datetime(day, timeline.minute_of(day, index))
+        slot_end = slot_start + timedelta(minutes=duration_minutes)
+        total = len(roster)
+        
+        return {
+            'weekday': slot_start.strftime('%A').lower(),
+            'start_time': slot_start.isoformat(),
+            'end_time': slot_end.isoformat(),
+            'occurrences': len(counts),
+            'total_participants': total,
+            'worst_case_count': worst_case,
+            'worst_case_percentage': worst_case / total * 100,
+            'average_count': average,
+            'average_percentage': average / total * 100,
+            'available_every_week': [
+                email for bit, email in enumerate(roster) if common_mask >> bit & 1
+            ],
+            'occurrence_counts': counts,
+            'formatted': (
+                f"Her {slot_start.strftime('%A')}, "
+                f"{slot_start.strftime('%H:%M')} - {slot_end.strftime('%H:%M')} "
+                f"(en kötü hafta {worst_case}/{total}, "
+                f"ortalama %{average / total * 100:.0f}, {len(counts)} hafta)"
+            )
+        }
+    
+    def schedule_meetings(
+        self,
+        timeline: Timeline,
+        day_schedules: Dict[int, Dict[str, Any]],
+        meetings: List[Dict[str, Any]],
+        roster: List[str],
+        max_candidates: int = 50,
+        time_limit_ms: int = 2000
+    ) -> Dict[str, Any]:
+        """
+        Assign non-conflicting slots to several meetings at once.
+        
+        Each meeting's candidate windows are scored against precomputed
+        availability masks of the union of all participants. A
+        branch-and-bound search then picks one candidate per meeting
+        (or leaves it unscheduled) so that meetings sharing a participant
+        never overlap and total attendance is maximal. The search stops at
+        ``time_limit_ms`` and returns the best assignment found so far.
+        
+        The candidate list of a meeting starts with windows that do not
+        overlap each other, so meetings competing for the same people can
+        be spread over the whole range instead of its first hours.
+        
+        Args:
+            timeline: Timeline the schedules were fetched for
+            day_schedules: getSchedule data of every participant, keyed by day
+            meetings: Dicts with 'participants' and optional 'duration' (minutes)
+            roster: Union of all participants, defining the mask bit positions
+            max_candidates: Windows kept per meeting
+            time_limit_ms: Search time budget in milliseconds
+        
+        Returns:
+            Dictionary with 'assignments' (one per meeting, None when it could
+            not be placed), 'total_attendance' and 'optimal' (the search
+            finished, and either no candidate list was cut or every meeting
+            got its best attendance)
+        """
+        interval_minutes = timeline.interval_minutes
+        deadline = time.monotonic() + time_limit_ms / 1000
+        
+        # Availability masks per window, computed once per distinct duration
+        masks_by_duration: Dict[int, Dict[int, List[int]]] = {}
+        for meeting in meetings:
+            duration = meeting.get('duration', 60)
+            if duration not in masks_by_duration:
+                masks_by_duration[duration] = {
+                    day: self.window_masks(schedule_data, -(-duration // interval_minutes), roster)
+                    for day, schedule_data in day_schedules.items()
+                }
+        
+        positions = {email: bit for bit, email in enumerate(roster)}
+        meeting_masks = []
+        candidates = []
+        truncated = False
+        
+        for meeting in meetings:
+            duration = meeting.get('duration', 60)
+            meeting_mask = 0
+            for email in meeting['participants']:
+                meeting_mask |= 1 << positions[email]
+            meeting_masks.append(meeting_mask)
+            
+            scored = []
+            for day, masks in masks_by_duration[duration].items():
+                for i, mask in enumerate(masks):
+                    self.windows_analyzed += 1
+                    attending = mask & meeting_mask
+                    start = timeline.minute_of(day, i)
+                    scored.append((-attending.bit_count(), start, start + duration, day, i, attending))
+            scored.sort()
+            truncated = truncated or len(scored) > max_candidates
+            candidates.append(self._spread_candidates(scored, max_candidates))
+        
+        # Larger meetings first: they constrain the others the most
+        order = sorted(range(len(meetings)), key=lambda m: -meeting_masks[m].bit_count())
+        best_rest = [0] * (len(order) + 1)
+        for k in range(len(order) - 1, -1, -1):
+            top = candidates[order[k]]
+            best_rest[k] = best_rest[k + 1] + (-top[0][0] if top else 0)
+        
+        best = {'score': -1, 'choice': [None] * len(meetings)}
+        chosen: List[Optional[tuple]] = [None] * len(meetings)
+        state = {'nodes': 0, 'timed_out': False}
+        
+        def conflicts(m: int, candidate: tuple) -> bool:
+            for other, picked in enumerate(chosen):
+                if picked is None or other == m:
                     continue
-                
-                # Check if participant is available for the entire duration
-                slot_availability = availability_view[i:i + intervals_needed]
-                
-                # Consider available if all intervals are 0 (Free) or 1 (Tentative)
-                is_available = all(int(code) <= 1 for code in slot_availability)
-                
-                if is_available:
-                    available_participants.append(email)
+                shares_people = meeting_masks[m] & meeting_masks[other]
+                if shares_people and candidate[1] < picked[2] and picked[1] < candidate[2]:
+                    return True
+            return False
+        
+        def search(k: int, score: int):
+            state['nodes'] += 1
+            if state['nodes'] % 1024 == 0 and time.monotonic() > deadline:
+                state['timed_out'] = True
+            if state['timed_out']:
+                return
+            if k == len(order):
+                if score > best['score']:
+                    best['score'] = score
+                    best['choice'] = list(chosen)
+                return
+            if score + best_rest[k] <= best['score']:
+                return
+            
+            m = order[k]
+            for candidate in candidates[m]:
+                if score - candidate[0] + best_rest[k + 1] <= best['score']:
+                    break
+                if conflicts(m, candidate):
+                    continue
+                chosen[m] = candidate
+                search(k + 1, score - candidate[0])
+                chosen[m] = None
+            
+            # Leaving the meeting unscheduled keeps every branch feasible
+            search(k + 1, score)
+        
+        search(0, 0)
+        
+        assignments = []
+        for m, candidate in enumerate(best['choice']):
+            if candidate is None:
+                assignments.append(None)
+                continue
+            _, start, _, day, _, attending = candidate
+            emails = meetings[m]['participants']
+            available = [index for index, email in enumerate(emails) if attending >> positions[email] & 1]
+            busy = [index for index, email in enumerate(emails) if not attending >> positions[email] & 1]
+            assignments.append(self._materialize_slot(
+                timeline, day, start, meetings[m].get('duration', 60),
+                emails, available, busy, formatted=True
+            ))
+        
+        # A cut candidate list may have left out the windows of a better
+        # assignment, unless every meeting already got its best attendance
+        return {
+            'assignments': assignments,
+            'total_attendance': max(best['score'], 0),
+            'optimal': not state['timed_out'] and (not truncated or best['score'] == best_rest[0]),
+            'nodes_explored': state['nodes']
+        }
+    
+    @staticmethod
+    def _spread_candidates(scored: List[tuple], limit: int) -> List[tuple]:
+        """
+        Pick up to ``limit`` candidates from windows sorted best first.
+        
+        Each window that overlaps no better picked window is taken first;
+        the rest of ``limit`` goes to the best remaining windows. The result
+        keeps the best-first order.
+        """
+        picked = []
+        overlapping = []
+        for candidate in scored:
+            if len(picked) == limit:
+                break
+            start, end = candidate[1], candidate[2]
+            if any(start < other[2] and other[1] < end for other in picked):
+                overlapping.append(candidate)
+            else:
+                picked.append(candidate)
+        return sorted(picked + overlapping[:limit - len(picked)])
+    
+    def plan_slot_checks(self, slots: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Work out the single schedule window that covers a list of slots.
+        
+        The interval is the largest one (up to a day) that every slot
+        boundary falls on, but never below Graph's 5-minute minimum; slots
+        off that grid are checked against every interval they touch.
+        
+        Args:
+            slots: (start, end) pairs in ISO 8601 format; naive times are
+                read in the analyzer's timezone
+        
+        Returns:
+            Dictionary with the slots in epoch minutes ('minutes'), the
+            window 'start_time'/'end_time' in ISO format, its 'origin' in
+            epoch minutes and the 'interval' to request
+        
+        Raises:
+            ValueError: If a time cannot be parsed or a slot does not end
+                after it starts
+        """
+        minutes = [
+            (to_epoch_minute(start, self.timezone), to_epoch_minute(end, self.timezone))
+            for start, end in slots
+        ]
+        for (start, end), (slot_start, slot_end) in zip(slots, minutes):
+            if slot_end <= slot_start:
+                raise ValueError(f'Slot must end after it starts: {start} - {end}')
+        origin = min(start for start, _ in minutes)
+        end = max(end for _, end in minutes)
+        
+        step = 0
+        for slot_start, slot_end in minutes:
+            step = math.gcd(step, slot_start - origin, slot_end - origin)
+        interval = max(math.gcd(step, 1440) if step else 30, 5)
+        end = origin + -(-(end - origin) // interval) * interval
+        
+        return {
+            'minutes': minutes,
+            'origin': origin,
+            'interval': interval,
+            'start_time': datetime.fromtimestamp(origin * 60, self.timezone).isoformat(),
+            'end_time': datetime.fromtimestamp(end * 60, self.timezone).isoformat()
+        }
+    
+    def check_slots(
+        self,
+        schedule_data: Dict[str, Any],
+        plan: Dict[str, Any],
+        include_participants: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Check participant availability for every slot of a plan.
+        
+        Each participant's availability view is turned into prefix sums of
+        busy intervals once, so a slot costs one subtraction per participant
+        however long it is.
+        
+        Args:
+            schedule_data: getSchedule data for the plan's covering window
+            plan: Result of plan_slot_checks
+            include_participants: Whether to list available/busy participants
+        
+        Returns:
+            One availability entry per slot, in request order
+        """
+        schedules = schedule_data.get('value', [])
+        emails = [schedule.get('scheduleId', '') for schedule in schedules]
+        prefixes = [
+            self._busy_prefix_sums(schedule.get('availabilityView', ''))
+            for schedule in schedules
+        ]
+        origin = plan['origin']
+        interval = plan['interval']
+        total = len(schedules)
+        results = []
+        
+        for slot_start, slot_end in plan['minutes']:
+            first = (slot_start - origin) // interval
+            last = -(-(slot_end - origin) // interval)
+            available = []
+            busy = []
+            for index, prefix in enumerate(prefixes):
+                # Intervals past the end of a short view count as unknown, i.e. busy
+                if last >= len(prefix) or prefix[last] - prefix[first] > 0:
+                    busy.append(index)
                 else:
-                    busy_participants.append(email)
+                    available.append(index)
             
-            time_slots.append({
-                'start_time': slot_start.isoformat(),
-                'end_time': slot_end.isoformat(),
-                'available_count': len(available_participants),
-                'total_participants': len(schedules),
-                'available_participants': available_participants,
-                'busy_participants': busy_participants,
-                'availability_percentage': (len(available_participants) / len(schedules) * 100) if schedules else 0
-            })
+            result = {
+                'available_count': len(available),
+                'total_participants': total,
+                'availability_percentage': len(available) / total * 100 if total else 0
+            }
+            if include_participants:
+                result['available_participants'] = [emails[index] for index in available]
+                result['busy_participants'] = [emails[index] for index in busy]
+            results.append(result)
         
-        # Sort by available count (descending) and then by time
-        time_slots.sort(key=lambda x: (-x['available_count'], x['start_time']))
+        return results
+    
+    @staticmethod
+    def _busy_prefix_sums(availability_view: str) -> List[int]:
+        """
+        Running count of busy intervals: ``prefix[k]`` covers the first ``k``.
+        
+        Args:
+            availability_view: String of availability codes
+        
+        Returns:
+            List of len(availability_view) + 1 counts
+        """
+        prefix = [0] * (len(availability_view) + 1)
+        busy = 0
+        for index, code in enumerate(availability_view):
+            if code not in '01':
+                busy += 1
+            prefix[index + 1] = busy
+        return prefix
+    
+    @staticmethod
+    def _roster_indices(roster: List[str], emails: List[str]) -> List[int]:
+        """Map schedule ids to their position in ``roster``, appending unknown ones."""
+        positions = {email: index for index, email in enumerate(roster)}
+        indices = []
+        for email in emails:
+            if email not in positions:
+                positions[email] = len(roster)
+                roster.append(email)
+            indices.append(positions[email])
+        return indices
+    
+    @staticmethod
+    def _free_run_lengths(availability_view: str) -> List[int]:
+        """
+        Count consecutive free intervals starting at each position.
+        
+        A participant is free for ``n`` intervals from position ``i`` when
+        ``runs[i] >= n``, so each window check is a single lookup.
         
-        return time_slots
+        Args:
+            availability_view: String of availability codes
+        
+        Returns:
+            List of free run lengths, one per interval
+        """
+        runs = [0] * len(availability_view)
+        run = 0
+        for index in range(len(availability_view) - 1, -1, -1):
+            run = run + 1 if availability_view[index] in '01' else 0
+            runs[index] = run
+        return runs
+    
+    @staticmethod
+    def _min_count_for_percentage(min_percentage: float, total: int) -> int:
+        """Smallest available count whose percentage reaches ``min_percentage``."""
+        if min_percentage <= 0 or total == 0:
+            return 0
+        return math.ceil(min_percentage * total / 100 - 1e-9)
     
     def get_top_suggestions(
         self,
@@ -143,16 +942,45 @@ class MeetingAnalyzer:
         Returns:
             Formatted string
         """
-        start = datetime.fromisoformat(time_slot['start_time'])
-        end = datetime.fromisoformat(time_slot['end_time'])
+        if 'formatted' in time_slot:
+            return time_slot['formatted']
         
+        return self.format_window(
+            datetime.fromisoformat(time_slot['start_time']),
+            datetime.fromisoformat(time_slot['end_time']),
+            time_slot['available_count'],
+            time_slot['total_participants'],
+            time_slot['availability_percentage']
+        )
+    
+    def format_window(
+        self,
+        start: datetime,
+        end: datetime,
+        available_count: int,
+        total_participants: int,
+        availability_percentage: float
+    ) -> str:
+        """
+        Format an already materialized window for display.
+        
+        Args:
+            start: Window start
+            end: Window end
+            available_count: Number of available participants
+            total_participants: Number of participants
+            availability_percentage: Availability percentage
+        
+        Returns:
+            Formatted string
+        """
         formatted_start = start.strftime('%d %B %Y, %H:%M')
         formatted_end = end.strftime('%H:%M')
         
         return (
             f"{formatted_start} - {formatted_end} "
-            f"({time_slot['available_count']}/{time_slot['total_participants']} katılımcı uygun, "
-            f"%{time_slot['availability_percentage']:.0f})"
+            f"({available_count}/{total_participants} katılımcı uygun, "
+            f"%{availability_percentage:.0f})"
         )
     
     def generate_date_range_slots(
@@ -172,29 +1000,102 @@ class MeetingAnalyzer:
         Returns:
             List of (start_datetime, end_datetime) tuples in ISO format
         """
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
+        timeline = self.build_timeline(start_date, end_date, time_range)
+        return [timeline.day_bounds(day) for day in range(len(timeline))]
+
+
+def scan_windows(
+    days: Dict[int, Tuple[list, int]],
+    window_days: Sequence[int],
+    window_offsets: Sequence[int],
+    day_starts: Sequence[int],
+    interval_minutes: int,
+    intervals_needed: int,
+    min_percentage: float = 0.0,
+    top_n: Optional[int] = None,
+    deadline: Optional[Deadline] = None
+) -> Tuple[Dict[int, Tuple[int, List[int], List[int]]], int, int, List[int]]:
+    """
+    Score candidate windows, keeping the top N.
+    
+    The core of MeetingAnalyzer.analyze_timeline, at module level so
+    worker processes can run it on their share of the days.
+    
+    Args:
+        days: (participants, total) keyed by day index; participants are
+            (index, is_required, free_run_lengths) with required ones first
+        window_days: Day index of each candidate window, in scan order
+        window_offsets: Interval offset of each candidate window
+        day_starts: Epoch minute at which each day starts
+        interval_minutes: Interval in minutes
+        intervals_needed: Number of intervals a window spans
+        min_percentage: Minimum availability percentage to keep a window
+        top_n: Keep only the N best windows (None keeps every window)
+        deadline: Stop at the first day reached after the deadline has passed
+    
+    Returns:
+        (windows, analyzed, pruned, unanalyzed_days): kept windows as
+        {epoch_minute: (day, available, busy)}, the window counters, and the
+        days skipped at the deadline
+    """
+    # Min-heap of (available_count, -epoch_minute) holding the best windows so far
+    best: List[Tuple[int, int]] = []
+    windows: Dict[int, Tuple[int, List[int], List[int]]] = {}
+    analyzed = 0
+    pruned_count = 0
+    current_day = None
+    
+    for day, i in zip(window_days, window_offsets):
+        if day not in days:
+            continue
+        if day != current_day:
+            current_day = day
+            if deadline is not None and deadline.passed():
+                return windows, analyzed, pruned_count, sorted(later for later in days if later >= day)
+        participants, total = days[day]
+        analyzed += 1
+        minute = day_starts[day] + i * interval_minutes
         
-        start_hour, end_hour = time_range.split('-')
+        # A window only makes the cut if it beats the current Nth-best;
+        # ties go to the earlier window, which was scanned first.
+        needed = MeetingAnalyzer._min_count_for_percentage(min_percentage, total)
+        if top_n is not None and len(best) >= top_n:
+            needed = max(needed, best[0][0] + 1)
+        if needed > total:
+            pruned_count += 1
+            continue
         
-        time_slots = []
-        current = start
+        available_participants = []
+        busy_participants = []
+        pruned = False
         
-        while current <= end:
-            # Skip weekends (Saturday=5, Sunday=6)
-            if current.weekday() < 5:
-                slot_start = self.timezone.localize(
-                    datetime.combine(current.date(), datetime.strptime(start_hour, '%H:%M').time())
-                )
-                slot_end = self.timezone.localize(
-                    datetime.combine(current.date(), datetime.strptime(end_hour, '%H:%M').time())
-                )
-                
-                time_slots.append((
-                    slot_start.isoformat(),
-                    slot_end.isoformat()
-                ))
+        for position, (index, is_required, free_runs) in enumerate(participants):
+            if len(free_runs) <= i:
+                continue
             
-            current += timedelta(days=1)
+            # Available if every interval in the window is 0 (Free) or 1 (Tentative)
+            if free_runs[i] >= min(intervals_needed, len(free_runs) - i):
+                available_participants.append(index)
+                continue
+            
+            busy_participants.append(index)
+            remaining = total - position - 1
+            if is_required or len(available_participants) + remaining < needed:
+                pruned = True
+                break
+        
+        if pruned or len(available_participants) < needed:
+            pruned_count += 1
+            continue
         
-        return time_slots
+        windows[minute] = (day, available_participants, busy_participants)
+        entry = (len(available_participants), -minute)
+        if top_n is None:
+            continue
+        if len(best) < top_n:
+            heapq.heappush(best, entry)
+        else:
+            evicted = heapq.heappushpop(best, entry)
+            windows.pop(-evicted[1], None)
+    
+    return windows, analyzed, pruned_count, []
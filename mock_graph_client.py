@@ -1,17 +1,54 @@
 """Mock Microsoft Graph API client for testing without actual Graph API access."""
+import logging
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import pytz
+from config import Config
+from schedule_cache import build_schedule_cache, MemoryCacheBackend
+from group_expansion import GroupExpander
+from tenants import Tenant, single_tenant
+
+
+logger = logging.getLogger(__name__)
+
+
+# Simulated groups: address -> (group id, member addresses, nested group addresses)
+MOCK_GROUPS = {
+    'engineering@company.com': (
+        'mock-group-engineering',
+        ['user1@company.com', 'user2@company.com', 'user3@company.com'],
+        []
+    ),
+    'sales@company.com': (
+        'mock-group-sales',
+        ['user3@company.com', 'user4@company.com'],
+        []
+    ),
+    'all-staff@company.com': (
+        'mock-group-all-staff',
+        ['user5@company.com'],
+        ['engineering@company.com', 'sales@company.com']
+    )
+}
 
 
 class MockGraphAPIClient:
     """Mock client that simulates Microsoft Graph API responses."""
     
-    def __init__(self):
+    def __init__(self, tenant: Optional[Tenant] = None):
         """Initialize the mock Graph API client."""
-        self.timezone = pytz.timezone('Europe/Istanbul')
-        print("⚠️  MOCK MODE: Using simulated data (no real Graph API calls)")
+        self.tenant = tenant or single_tenant()
+        self.timezone = pytz.timezone(Config.DEFAULT_TIMEZONE)
+        self.schedule_cache = build_schedule_cache(self.tenant.namespace)
+        self.group_expander = GroupExpander(
+            self._lookup_groups,
+            self._list_group_members,
+            self.schedule_cache.backend if self.schedule_cache is not None else MemoryCacheBackend(),
+            ttl=Config.GROUP_CACHE_TTL,
+            max_workers=Config.GRAPH_PARALLEL_REQUESTS
+        )
+        logger.warning("⚠️  MOCK MODE: Using simulated data (no real Graph API calls)")
     
     def _authenticate(self):
         """Mock authentication - always succeeds."""
@@ -65,7 +102,33 @@ class MockGraphAPIClient:
         Returns:
             Mock schedule data matching Graph API format
         """
-        print(f"📅 MOCK: Getting schedule for {len(emails)} participants from {start_time} to {end_time}")
+        if self.schedule_cache is None:
+            return self._fetch_schedule(emails, start_time, end_time, interval)
+        return self.schedule_cache.get_schedule(
+            emails, start_time, end_time, interval, self._fetch_schedule
+        )
+    
+    def count_cached_schedules(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int = 30
+    ) -> int:
+        """Number of participants get_schedule can answer from the cache."""
+        if self.schedule_cache is None:
+            return 0
+        return self.schedule_cache.count_cached(emails, start_time, end_time, interval)
+    
+    def _fetch_schedule(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int = 30
+    ) -> Dict[str, Any]:
+        """Generate simulated schedules for the given users, bypassing the cache."""
+        logger.info(f"📅 MOCK: Getting schedule for {len(emails)} participants from {start_time} to {end_time}")
         
         # Calculate number of intervals
         start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
@@ -85,7 +148,7 @@ class MockGraphAPIClient:
                     "startTime": "09:00:00",
                     "endTime": "17:00:00",
                     "timeZone": {
-                        "name": "Europe/Istanbul"
+                        "name": Config.DEFAULT_TIMEZONE
                     }
                 }
             })
@@ -95,6 +158,33 @@ class MockGraphAPIClient:
             "value": schedules
         }
     
+    def expand_participants(self, addresses: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Mock group expansion over MOCK_GROUPS.
+        
+        Args:
+            addresses: Participant or group email addresses
+        
+        Returns:
+            (participants, groups): de-duplicated participant addresses and
+            the member count of each expanded group
+        """
+        return self.group_expander.expand(addresses)
+    
+    def _lookup_groups(self, addresses: List[str]) -> Dict[str, str]:
+        """Return {address: group id} for the addresses in MOCK_GROUPS."""
+        return {
+            address: MOCK_GROUPS[address.lower()][0]
+            for address in addresses if address.lower() in MOCK_GROUPS
+        }
+    
+    def _list_group_members(self, group_id: str) -> Tuple[List[str], List[str]]:
+        """Return (member emails, nested group ids) of a mock group."""
+        logger.info(f"👥 MOCK: Listing members of {group_id}")
+        groups_by_id = {gid: (members, nested) for gid, members, nested in MOCK_GROUPS.values()}
+        members, nested = groups_by_id.get(group_id, ([], []))
+        return list(members), [MOCK_GROUPS[address][0] for address in nested]
+    
     def create_meeting(
         self,
         subject: str,
@@ -102,7 +192,8 @@ class MockGraphAPIClient:
         end_time: str,
         attendees: List[str],
         body: str = None,
-        is_online: bool = True
+        is_online: bool = True,
+        transaction_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Mock create meeting - returns simulated meeting data.
@@ -114,11 +205,15 @@ class MockGraphAPIClient:
             attendees: List of attendee email addresses
             body: Optional meeting description
             is_online: Whether to create a Teams online meeting
+            transaction_id: Client identifier, echoed in the event
         
         Returns:
             Mock event data matching Graph API format
         """
-        print(f"✅ MOCK: Creating meeting '{subject}' with {len(attendees)} attendees")
+        logger.info(f"✅ MOCK: Creating meeting '{subject}' with {len(attendees)} attendees")
+        
+        if self.schedule_cache is not None:
+            self.schedule_cache.invalidate(attendees)
         
         # Generate mock IDs
         event_id = f"MOCK_EVENT_{random.randint(100000, 999999)}"
@@ -133,11 +228,11 @@ class MockGraphAPIClient:
             },
             "start": {
                 "dateTime": start_time,
-                "timeZone": "Europe/Istanbul"
+                "timeZone": Config.DEFAULT_TIMEZONE
             },
             "end": {
                 "dateTime": end_time,
-                "timeZone": "Europe/Istanbul"
+                "timeZone": Config.DEFAULT_TIMEZONE
             },
             "location": {
                 "displayName": "Microsoft Teams Meeting"
@@ -160,7 +255,8 @@ class MockGraphAPIClient:
             "webLink": f"https://outlook.office365.com/calendar/item/mock/{event_id}",
             "createdDateTime": datetime.now(self.timezone).isoformat(),
             "lastModifiedDateTime": datetime.now(self.timezone).isoformat(),
-            "isCancelled": False
+            "isCancelled": False,
+            "transactionId": transaction_id
         }
         
         return mock_meeting
@@ -171,7 +267,12 @@ class MockGraphAPIClient:
         start_date: str,
         end_date: str,
         time_range: str = "09:00-17:00",
-        duration: int = 60
+        duration: int = 60,
+        timeslots: Optional[List[Tuple[str, str]]] = None,
+        required_attendees: Optional[List[str]] = None,
+        minimum_attendee_percentage: float = 50,
+        max_candidates: Optional[int] = None,
+        respect_working_hours: bool = True
     ) -> Dict[str, Any]:
         """
         Mock find meeting times - returns simulated suggestions.
@@ -182,36 +283,53 @@ class MockGraphAPIClient:
             end_date: End date (YYYY-MM-DD)
             time_range: Time range (HH:MM-HH:MM)
             duration: Meeting duration in minutes
+            timeslots: ISO 8601 (start, end) windows to search
+            required_attendees: Attendees that are always free in suggestions
+            minimum_attendee_percentage: Ignored by the mock
+            max_candidates: Maximum number of suggestions to return
+            respect_working_hours: Ignored by the mock
         
         Returns:
             Mock meeting time suggestions
         """
-        print(f"🔍 MOCK: Finding meeting times for {len(attendees)} attendees")
+        logger.info(f"🔍 MOCK: Finding meeting times for {len(attendees)} attendees")
         
         # Generate some mock suggestions
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+        if timeslots is None:
+            start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+            suggestion_times = []
+            for i in range(5):
+                suggestion_date = start_dt + timedelta(days=i)
+                # Skip weekends
+                if suggestion_date.weekday() >= 5:
+                    continue
+                    
+                hour = 10 + (i * 2) % 7  # Vary the hours
+                suggestion_times.append(self.timezone.localize(
+                    suggestion_date.replace(hour=hour, minute=0, second=0, microsecond=0)
+                ))
+        else:
+            # One suggestion at a random half hour inside each window
+            suggestion_times = []
+            for slot_start, slot_end in timeslots:
+                window_start = datetime.fromisoformat(slot_start)
+                steps = int((datetime.fromisoformat(slot_end) - window_start).total_seconds() // 60 - duration) // 30
+                if steps >= 0:
+                    suggestion_times.append(window_start + timedelta(minutes=30 * random.randint(0, steps)))
+        
+        required = {email.lower() for email in required_attendees or ()}
         suggestions = []
         
-        for i in range(5):
-            suggestion_date = start_dt + timedelta(days=i)
-            # Skip weekends
-            if suggestion_date.weekday() >= 5:
-                continue
-                
-            hour = 10 + (i * 2) % 7  # Vary the hours
-            suggestion_time = self.timezone.localize(
-                suggestion_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            )
-            
+        for suggestion_time in suggestion_times[:max_candidates]:
             suggestions.append({
                 "meetingTimeSlot": {
                     "start": {
                         "dateTime": suggestion_time.isoformat(),
-                        "timeZone": "Europe/Istanbul"
+                        "timeZone": Config.DEFAULT_TIMEZONE
                     },
                     "end": {
                         "dateTime": (suggestion_time + timedelta(minutes=duration)).isoformat(),
-                        "timeZone": "Europe/Istanbul"
+                        "timeZone": Config.DEFAULT_TIMEZONE
                     }
                 },
                 "confidence": random.randint(60, 100),
@@ -219,7 +337,9 @@ class MockGraphAPIClient:
                 "attendeeAvailability": [
                     {
                         "emailAddress": email,
-                        "availability": random.choice(["free", "free", "free", "tentative"])
+                        "availability": "free" if email.lower() in required else random.choice(
+                            ["free", "free", "free", "tentative"]
+                        )
                     }
                     for email in attendees
                 ],
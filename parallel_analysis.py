@@ -0,0 +1,235 @@
+"""Window scans spread over a process pool, with availability in shared memory."""
+import heapq
+import multiprocessing
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Dict, Optional, Tuple
+from config import Config
+from meeting_analyzer import scan_windows
+
+
+# Free-run lengths are stored as unsigned 32-bit integers
+MATRIX_TYPECODE = 'I'
+
+
+class ParallelScanner:
+    """
+    Runs large window scans on a pool of worker processes.
+    
+    The free-run lengths of every participant and day are written once
+    into a shared-memory matrix; each worker attaches to it by name and
+    scans a contiguous range of days, so only row offsets cross the process
+    boundary instead of pickled schedules. Each worker keeps its own top N
+    windows and the parent merges them, which gives the same result as a
+    single scan because the global top N is always among the local ones.
+    
+    The request thread only waits on the workers, so other requests keep
+    being served while a large search runs.
+    """
+    
+    def __init__(self, processes: int, min_cells: int = 200000):
+        """
+        Initialize the scanner; the pool starts on first use.
+        
+        Args:
+            processes: Worker processes
+            min_cells: Participant-intervals below which a scan stays in
+                the calling thread, where it is cheaper than the hand-off
+        """
+        self.processes = processes
+        self.min_cells = min_cells
+        self.scans = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def worthwhile(self, days: Dict[int, Tuple[list, int]]) -> bool:
+        """Whether a scan over ``days`` is large enough for the pool."""
+        cells = sum(
+            len(free_runs) for participants, _ in days.values() for _, _, free_runs in participants
+        )
+        return cells >= self.min_cells
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        # A pool inherited through fork (e.g. a preloaded Gunicorn master) is
+        # not usable, so each process starts its own
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+    
+    def scan(
+        self,
+        days: Dict[int, Tuple[list, int]],
+        timeline,
+        intervals_needed: int,
+        min_percentage: float = 0.0,
+        top_n: Optional[int] = None,
+        deadline=None
+    ) -> Tuple[Dict[int, Tuple[int, List[int], List[int]]], int, int, List[int]]:
+        """
+        Scan the windows of ``days`` in parallel.
+        
+        Args and result as meeting_analyzer.scan_windows; the timeline
+        supplies the day starts and lengths.
+        """
+        matrix = array(MATRIX_TYPECODE)
+        layout: Dict[int, Tuple[list, int]] = {}
+        for day in sorted(days):
+            participants, total = days[day]
+            rows = []
+            for index, is_required, free_runs in participants:
+                rows.append((index, is_required, len(matrix), len(free_runs)))
+                matrix.extend(free_runs)
+            layout[day] = (rows, total)
+        
+        size = len(matrix) * matrix.itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(size, matrix.itemsize))
+        try:
+            shm.buf[:size] = matrix.tobytes()
+            partitions = self._partitions(layout, timeline, intervals_needed)
+            futures = [
+                self._pool().submit(
+                    _scan_partition,
+                    shm.name,
+                    {day: layout[day] for day in partition},
+                    timeline.day_starts,
+                    timeline.day_lengths,
+                    timeline.interval_minutes,
+                    intervals_needed,
+                    min_percentage,
+                    top_n,
+                    deadline
+                )
+                for partition in partitions
+            ]
+            results = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+        
+        with self._lock:
+            self.scans += 1
+        return merge_partitions(results, top_n)
+    
+    def _partitions(
+        self,
+        layout: Dict[int, Tuple[list, int]],
+        timeline,
+        intervals_needed: int
+    ) -> List[List[int]]:
+        """Split the days into contiguous ranges of about equal work, two per process."""
+        weights = {
+            day: max(timeline.day_lengths[day] - intervals_needed + 1, 0) * len(rows)
+            for day, (rows, _) in layout.items()
+        }
+        target = max(sum(weights.values()) / (self.processes * 2), 1)
+        partitions: List[List[int]] = [[]]
+        load = 0
+        for day in sorted(layout):
+            if load >= target:
+                partitions.append([])
+                load = 0
+            partitions[-1].append(day)
+            load += weights[day]
+        return [partition for partition in partitions if partition]
+    
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _scan_partition(
+    shm_name: str,
+    layout: Dict[int, Tuple[list, int]],
+    day_starts: List[int],
+    day_lengths: List[int],
+    interval_minutes: int,
+    intervals_needed: int,
+    min_percentage: float,
+    top_n: Optional[int],
+    deadline
+) -> Tuple[Dict[int, Tuple[int, List[int], List[int]]], int, int, List[int]]:
+    """Worker: scan the windows of some days, reading free runs from shared memory."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        matrix = shm.buf.cast(MATRIX_TYPECODE)
+        try:
+            days = {
+                day: (
+                    [
+                        (index, is_required, matrix[offset:offset + length])
+                        for index, is_required, offset, length in rows
+                    ],
+                    total
+                )
+                for day, (rows, total) in layout.items()
+            }
+            window_days = array('i')
+            window_offsets = array('i')
+            for day in sorted(layout):
+                count = max(day_lengths[day] - intervals_needed + 1, 0)
+                window_days.extend([day] * count)
+                window_offsets.extend(range(count))
+            result = scan_windows(
+                days, window_days, window_offsets, day_starts,
+                interval_minutes, intervals_needed, min_percentage, top_n, deadline
+            )
+            # Slices of the shared buffer must be gone before it is closed
+            del days
+        finally:
+            matrix.release()
+    finally:
+        shm.close()
+    return result
+
+
+def merge_partitions(
+    results: List[Tuple[Dict[int, Tuple[int, List[int], List[int]]], int, int, List[int]]],
+    top_n: Optional[int]
+) -> Tuple[Dict[int, Tuple[int, List[int], List[int]]], int, int, List[int]]:
+    """Merge the per-partition results of scan_windows into one."""
+    windows: Dict[int, Tuple[int, List[int], List[int]]] = {}
+    analyzed = 0
+    pruned = 0
+    unanalyzed: List[int] = []
+    for partition_windows, partition_analyzed, partition_pruned, partition_unanalyzed in results:
+        windows.update(partition_windows)
+        analyzed += partition_analyzed
+        pruned += partition_pruned
+        unanalyzed.extend(partition_unanalyzed)
+    
+    if top_n is not None and len(windows) > top_n:
+        # Same order as a single scan: more participants first, then earlier
+        kept = heapq.nsmallest(top_n, windows, key=lambda minute: (-len(windows[minute][1]), minute))
+        windows = {minute: windows[minute] for minute in kept}
+    return windows, analyzed, pruned, sorted(unanalyzed)
+
+
+_parallel_scanner: Optional[ParallelScanner] = None
+_parallel_scanner_lock = threading.Lock()
+
+
+def get_parallel_scanner() -> Optional[ParallelScanner]:
+    """The process-wide scanner, or None when ANALYSIS_PROCESSES is 0."""
+    global _parallel_scanner
+    if Config.ANALYSIS_PROCESSES <= 0:
+        return None
+    if _parallel_scanner is None:
+        with _parallel_scanner_lock:
+            if _parallel_scanner is None:
+                _parallel_scanner = ParallelScanner(
+                    Config.ANALYSIS_PROCESSES,
+                    min_cells=Config.PARALLEL_ANALYSIS_MIN_CELLS
+                )
+    return _parallel_scanner
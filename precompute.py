@@ -0,0 +1,390 @@
+"""Background pre-computation of availability for frequently searched participant sets."""
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Callable, NamedTuple
+import pytz
+
+
+logger = logging.getLogger(__name__)
+
+
+class SearchShape(NamedTuple):
+    """What a materialized view answers: who, which hours, how long, how masked, for which tenant."""
+    participants: Tuple[str, ...]
+    time_range: str
+    duration: int
+    time_zone: str
+    respect_working_hours: bool
+    tenant: Optional[str] = None
+
+
+def search_shape(
+    participants: List[str],
+    time_range: str,
+    duration: int,
+    time_zone: str,
+    respect_working_hours: bool,
+    tenant: Optional[str] = None
+) -> SearchShape:
+    """Key of a search; the participant order and address case do not matter."""
+    return SearchShape(
+        tuple(sorted({email.lower() for email in participants})),
+        time_range,
+        int(duration),
+        time_zone,
+        bool(respect_working_hours),
+        tenant
+    )
+
+
+def business_days(time_zone: str, days: int) -> Tuple[str, str]:
+    """(start date, end date) covering the next ``days`` weekdays from today."""
+    current = datetime.now(pytz.timezone(time_zone)).date()
+    while current.weekday() >= 5:
+        current += timedelta(days=1)
+    start = current
+    remaining = days - 1
+    while remaining > 0:
+        current += timedelta(days=1)
+        if current.weekday() < 5:
+            remaining -= 1
+    return start.isoformat(), current.isoformat()
+
+
+class MaterializedView:
+    """
+    Every scored window of one search shape over the next business days.
+    
+    ``slots`` come from MeetingAnalyzer.analyze_timeline with no percentage
+    floor and no top-N cut, so they are already ranked; a search is
+    answered by filtering them to its dates, percentage and required
+    attendees and taking the first N.
+    """
+    
+    def __init__(self, shape: SearchShape, timeline, slots: List[Dict[str, Any]], roster: List[str]):
+        """
+        Initialize a view.
+        
+        Args:
+            shape: Search shape the view answers
+            timeline: Timeline the schedules were fetched for
+            slots: Ranked slots whose participant lists index into ``roster``
+            roster: Participant addresses the slots refer to
+        """
+        self.shape = shape
+        self.slots = slots
+        self.roster = roster
+        self.day_dates = {day.isoformat() for day in timeline.day_dates}
+        self.built_at = time.time()
+    
+    def covers(self, timeline) -> bool:
+        """Whether every day of ``timeline`` is in the view."""
+        return all(day.isoformat() in self.day_dates for day in timeline.day_dates)
+    
+    def suggestions(
+        self,
+        timeline,
+        participants: List[str],
+        min_percentage: float = 0.0,
+        top_n: Optional[int] = None,
+        required_attendees: Optional[List[str]] = None,
+        roster: Optional[List[str]] = None,
+        include_participants: bool = True
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Answer a search from the view.
+        
+        Args:
+            timeline: Timeline of the search
+            participants: Participant addresses as given in the search
+            min_percentage: Minimum availability percentage
+            top_n: Number of suggestions (None returns every match)
+            required_attendees: Attendees that must be available
+            roster: Shared participant list of compact responses; participant
+                lists then hold indices into it instead of addresses
+            include_participants: Whether to list available/busy participants
+        
+        Returns:
+            (suggestions, windows_considered) in the analyze_timeline format
+        """
+        if roster is None:
+            by_address = {email.lower(): email for email in participants}
+        else:
+            by_address = {email.lower(): index for index, email in enumerate(roster)}
+        labels = [by_address.get(email.lower(), email) for email in self.roster]
+        
+        positions = {email.lower(): index for index, email in enumerate(self.roster)}
+        required = {
+            positions[email.lower()] for email in required_attendees or () if email.lower() in positions
+        }
+        dates = {day.isoformat() for day in timeline.day_dates}
+        
+        suggestions = []
+        considered = 0
+        for slot in self.slots:
+            if slot['start_time'][:10] not in dates:
+                continue
+            considered += 1
+            min_count = math.ceil(min_percentage * slot['total_participants'] / 100 - 1e-9)
+            if slot['available_count'] < min_count:
+                continue
+            if not required.issubset(slot['available_participants']):
+                continue
+            if top_n is not None and len(suggestions) >= top_n:
+                continue
+            suggestion = dict(slot)
+            if include_participants:
+                for field in ('available_participants', 'busy_participants'):
+                    members = [labels[index] for index in slot[field]]
+                    suggestion[field] = members if roster is None else sorted(members)
+            else:
+                suggestion.pop('available_participants')
+                suggestion.pop('busy_participants')
+            suggestions.append(suggestion)
+        
+        return suggestions, considered
+
+
+class HotSetTracker:
+    """
+    Search counts per shape, decaying with a half-life.
+    
+    Shapes searched regularly keep a high score; one-off searches fade out
+    and are dropped once more than MAX_TRACKED shapes are known.
+    """
+    
+    HALF_LIFE = 3600
+    MAX_TRACKED = 1000
+    
+    def __init__(self):
+        """Initialize an empty tracker."""
+        self._scores: Dict[SearchShape, Tuple[float, float]] = {}
+        self._participants: Dict[SearchShape, List[str]] = {}
+        self._lock = threading.Lock()
+    
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated) / self.HALF_LIFE)
+    
+    def record(self, shape: SearchShape, participants: List[str]):
+        """Count one search of ``shape``."""
+        now = time.monotonic()
+        with self._lock:
+            score, updated = self._scores.get(shape, (0.0, now))
+            self._scores[shape] = (self._decayed(score, updated, now) + 1, now)
+            self._participants.setdefault(shape, list(participants))
+            if len(self._scores) > self.MAX_TRACKED:
+                coldest = min(self._scores, key=lambda key: self._decayed(*self._scores[key], now))
+                del self._scores[coldest]
+                del self._participants[coldest]
+    
+    def hottest(self, limit: int, min_score: float) -> List[Tuple[SearchShape, List[str]]]:
+        """Up to ``limit`` shapes scoring at least ``min_score``, hottest first."""
+        now = time.monotonic()
+        with self._lock:
+            scored = [
+                (self._decayed(score, updated, now), shape)
+                for shape, (score, updated) in self._scores.items()
+            ]
+            participants = dict(self._participants)
+        scored.sort(key=lambda entry: -entry[0])
+        return [(shape, participants[shape]) for score, shape in scored[:limit] if score >= min_score]
+
+
+class Precomputer:
+    """
+    Keeps materialized views of the hottest search shapes up to date.
+    
+    A background thread rebuilds the views of the hottest shapes every
+    ``interval_seconds``. Each round is held to a budget so it never
+    competes with live traffic: at most ``max_sets`` views, at most
+    ``round_budget`` seconds, and no view is started while more than
+    ``max_live_requests`` API requests are in flight in this process.
+    
+    Views live in each worker process. A booked meeting is recorded per
+    attendee in the shared cache ``backend``, so every worker drops the
+    views it built before that booking.
+    """
+    
+    INVALIDATION_PREFIX = 'precompute-invalidated|'
+    
+    def __init__(
+        self,
+        build_view: Callable[[SearchShape, List[str], float], Optional[MaterializedView]],
+        interval_seconds: int = 300,
+        min_searches: float = 2,
+        max_sets: int = 20,
+        round_budget: float = 10.0,
+        max_live_requests: int = 2,
+        max_age: Optional[float] = None,
+        backend=None
+    ):
+        """
+        Initialize the precomputer.
+        
+        Args:
+            build_view: Builds the view of a shape within a time budget in
+                seconds; returns None when the view would be incomplete
+            interval_seconds: Seconds between refresh rounds
+            min_searches: Search count, halving every HotSetTracker.HALF_LIFE
+                seconds, that makes a shape hot. The count starts decaying as
+                soon as a search is recorded, so a shape is hot only after
+                more than ``min_searches`` searches (3 for the default 2)
+            max_sets: Views refreshed per round
+            round_budget: Seconds a round may spend building views
+            max_live_requests: In-flight API requests above which the
+                refresher waits
+            max_age: Seconds a view is served (default two rounds); at most
+                the schedule cache TTL, so views are no staler than the cache
+            backend: Cache backend shared by the worker processes, with
+                get/set, that carries invalidations between them
+        """
+        self.build_view = build_view
+        self.interval_seconds = interval_seconds
+        self.min_searches = min_searches
+        self.max_sets = max_sets
+        self.round_budget = round_budget
+        self.max_live_requests = max_live_requests
+        self.max_age = max_age if max_age is not None else 2 * interval_seconds
+        self.backend = backend
+        self.tracker = HotSetTracker()
+        self.views: Dict[SearchShape, MaterializedView] = {}
+        self.live_requests = 0
+        self.stats = {'rounds': 0, 'views_built': 0, 'build_failures': 0, 'yielded': 0, 'hits': 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+    
+    def request_started(self):
+        """Count a live API request."""
+        with self._lock:
+            self.live_requests += 1
+    
+    def request_finished(self):
+        """Count the end of a live API request."""
+        with self._lock:
+            self.live_requests -= 1
+    
+    def record_search(self, shape: SearchShape, participants: List[str]):
+        """Count a search and make sure the refresher runs in this process."""
+        self.tracker.record(shape, participants)
+        self.ensure_started()
+    
+    def lookup(self, shape: SearchShape, timeline) -> Optional[MaterializedView]:
+        """A fresh view of ``shape`` covering every day of ``timeline``, if there is one."""
+        view = self.views.get(shape)
+        if view is None or time.time() - view.built_at > self.max_age:
+            return None
+        if not view.covers(timeline):
+            return None
+        if self._invalidated_since(view):
+            self.views.pop(shape, None)
+            return None
+        with self._lock:
+            self.stats['hits'] += 1
+        return view
+    
+    def _invalidation_key(self, tenant: Optional[str], email: str) -> str:
+        return f"{self.INVALIDATION_PREFIX}{tenant or ''}|{email}"
+    
+    def _invalidated_since(self, view: MaterializedView) -> bool:
+        """Whether a meeting with any participant of ``view`` was booked after it was built."""
+        if self.backend is None:
+            return False
+        for email in view.shape.participants:
+            booked_at = self.backend.get(self._invalidation_key(view.shape.tenant, email))
+            if booked_at is not None and float(booked_at) >= view.built_at:
+                return True
+        return False
+    
+    def invalidate(self, emails: List[str], tenant: Optional[str] = None):
+        """
+        Drop the views that include any of ``emails``, e.g. after booking a meeting.
+        
+        Views of this process are dropped at once; other processes drop
+        theirs on their next lookup.
+        """
+        addresses = {email.lower() for email in emails}
+        if self.backend is not None:
+            booked_at = str(time.time()).encode('utf-8')
+            for email in addresses:
+                self.backend.set(self._invalidation_key(tenant, email), booked_at, int(self.max_age) + 1)
+        for shape in list(self.views):
+            if addresses.intersection(shape.participants):
+                self.views.pop(shape, None)
+    
+    def ensure_started(self):
+        """Start the background thread in this process, e.g. after a fork."""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='precompute', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.refresh()
+    
+    def refresh(self):
+        """Run one budgeted refresh round."""
+        started = time.monotonic()
+        hot = self.tracker.hottest(self.max_sets, self.min_searches)
+        
+        for shape, participants in hot:
+            if not self._wait_for_quiet(started):
+                break
+            remaining = self.round_budget - (time.monotonic() - started)
+            # Bookings made while the view is being built must still invalidate it
+            build_started = time.time()
+            try:
+                view = self.build_view(shape, participants, remaining)
+            except Exception as e:
+                logger.exception(f"Precomputing {len(shape.participants)} participants failed: {str(e)}")
+                view = None
+            with self._lock:
+                if view is None:
+                    self.stats['build_failures'] += 1
+                else:
+                    self.stats['views_built'] += 1
+            if view is not None:
+                view.built_at = build_started
+                self.views[shape] = view
+        
+        # Shapes that cooled down are no longer kept
+        keep = {shape for shape, _ in hot}
+        for shape in list(self.views):
+            if shape not in keep:
+                self.views.pop(shape, None)
+        with self._lock:
+            self.stats['rounds'] += 1
+    
+    def _wait_for_quiet(self, started: float) -> bool:
+        """Wait until live traffic is under the limit; False once the round budget is spent."""
+        while time.monotonic() - started < self.round_budget:
+            if self.live_requests <= self.max_live_requests:
+                return True
+            with self._lock:
+                self.stats['yielded'] += 1
+            if self._stop.wait(0.2):
+                return False
+        return False
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """State as a JSON-ready dictionary."""
+        with self._lock:
+            return {
+                **self.stats,
+                'views': len(self.views),
+                'hot_sets': len(self.tracker.hottest(self.max_sets, self.min_searches)),
+                'live_requests': self.live_requests
+            }
@@ -0,0 +1,92 @@
+"""Token bucket that paces outgoing Graph requests and incoming work."""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    
+    Up to ``capacity`` requests can start at once; after that requests
+    are spaced so that no more than ``rate`` start per second.
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        """Initialize a full bucket refilling at ``rate`` tokens per second."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout: float = 60.0) -> bool:
+        """
+        Take one token, waiting for it if the bucket is empty.
+        
+        Args:
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            True if a token was taken, False on timeout
+        """
+        if self.rate <= 0:
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                now = self._updated
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+    
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take ``tokens`` without waiting.
+        
+        A request for more than the capacity is granted once the bucket is full.
+        
+        Returns:
+            0 if the tokens were taken, else the seconds until they will be there
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            needed = min(tokens, self.capacity)
+            if self._tokens >= needed:
+                self._tokens -= tokens
+                return 0.0
+            return (needed - self._tokens) / self.rate
+    
+    def charge(self, tokens: float):
+        """Take ``tokens`` unconditionally; the bucket may go into debt."""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+    
+    def refund(self, tokens: float):
+        """Give back ``tokens`` taken for work that was not done, up to the capacity."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+    
+    def is_full(self) -> bool:
+        """Whether the bucket has refilled completely."""
+        with self._lock:
+            self._refill()
+            return self._tokens >= self.capacity
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def pause(self, seconds: float):
+        """Hold back every request for ``seconds``, e.g. after a 429 Retry-After."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
@@ -0,0 +1,66 @@
+"""Response shapes for meeting time suggestions."""
+from typing import List, Dict, Any
+
+
+RESPONSE_FORMATS = ('full', 'compact', 'columnar')
+
+# Per-slot fields in the order they are emitted by the columnar format
+COLUMNAR_FIELDS = (
+    'start_time',
+    'end_time',
+    'latest_start_time',
+    'available_count',
+    'availability_percentage',
+    'available_participants',
+    'busy_participants',
+    'formatted'
+)
+
+
+def shape_suggestions(
+    suggestions: List[Dict[str, Any]],
+    response_format: str,
+    roster: List[str]
+) -> Dict[str, Any]:
+    """
+    Build the suggestion part of a find-meeting-times response.
+    
+    'full' keeps every slot self-contained. 'compact' lists the participants
+    once as a shared roster, refers to them by index and drops the per-slot
+    participant total. 'columnar' additionally turns the slot list into one
+    array per field.
+    
+    Args:
+        suggestions: Slots from MeetingAnalyzer.analyze_timeline; participant
+            lists must already hold roster indices unless the format is 'full'
+        response_format: One of RESPONSE_FORMATS
+        roster: Shared participant list the indices refer to
+    
+    Returns:
+        Dictionary merged into the JSON response
+    """
+    if response_format == 'full':
+        return {'suggestions': suggestions}
+    
+    slots = []
+    for suggestion in suggestions:
+        slot = dict(suggestion)
+        slot.pop('total_participants', None)
+        slots.append(slot)
+    
+    payload = {
+        'format': response_format,
+        'participants': roster,
+        'total_participants': len(roster)
+    }
+    
+    if response_format == 'compact':
+        payload['suggestions'] = slots
+        return payload
+    
+    payload['suggestions'] = {
+        field: [slot[field] for slot in slots]
+        for field in COLUMNAR_FIELDS
+        if slots and field in slots[0]
+    }
+    return payload
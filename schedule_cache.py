@@ -0,0 +1,392 @@
+"""Free/busy cache shared by all worker processes on a node."""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
+from config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with TTL, used for single-process runs and tests."""
+    
+    def __init__(self, max_entries: int = 10000):
+        """Initialize an empty cache holding at most ``max_entries`` keys."""
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: bytes, ttl: int):
+        """Store a value for ``ttl`` seconds, evicting the least recently used keys."""
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        """Store a value only if the key is missing or expired; return whether it was stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                return False
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+    
+    def delete(self, key: str):
+        """Remove a key, if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def delete_prefix(self, prefix: str):
+        """Remove every key starting with ``prefix``."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class SQLiteCacheBackend:
+    """
+    Node-local cache in an SQLite file shared by every worker process.
+    
+    The default location is /dev/shm, so the file lives in shared memory
+    and no separate cache daemon is needed. Connections are opened per
+    process and thread, which keeps the backend safe across forks.
+    """
+    
+    # Purge expired rows and enforce max_entries every this many writes
+    PURGE_EVERY = 200
+    
+    def __init__(self, path: str, max_entries: int = 10000):
+        """Initialize the backend; the file is created on first use."""
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Return this process and thread's connection, opening it if needed."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value, or None if it is missing or expired."""
+        row = self._connection().execute(
+            'SELECT value FROM cache WHERE key = ? AND expires_at > ?',
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, value: bytes, ttl: int):
+        """Store a value for ``ttl`` seconds."""
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, value, time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge()
+    
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        """Store a value only if the key is missing or expired; return whether it was stored."""
+        now = time.time()
+        cursor = self._connection().execute(
+            'INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at '
+            'WHERE cache.expires_at <= ?',
+            (key, value, now + ttl, now)
+        )
+        return cursor.rowcount == 1
+    
+    def delete(self, key: str):
+        """Remove a key, if present."""
+        self._connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+    
+    def delete_prefix(self, prefix: str):
+        """Remove every key starting with ``prefix``."""
+        if not prefix:
+            self._connection().execute('DELETE FROM cache')
+            return
+        # Keys with the prefix sort between it and its successor, so the
+        # primary key index answers this as a range scan (LIKE cannot use it)
+        successor = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        self._connection().execute(
+            'DELETE FROM cache WHERE key >= ? AND key < ?', (prefix, successor)
+        )
+    
+    def purge(self):
+        """Drop expired rows, then the soonest-expiring rows above max_entries."""
+        connection = self._connection()
+        connection.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+        connection.execute(
+            'DELETE FROM cache WHERE key IN ('
+            'SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+
+class NamespacedCacheBackend:
+    """
+    View of a backend whose keys all start with ``namespace``.
+    
+    Tenants sharing one backend (e.g. the SQLite file) see only their own
+    entries, and invalidating a participant of one tenant leaves the same
+    address in another tenant alone.
+    """
+    
+    def __init__(self, backend, namespace: str):
+        """Initialize the view of ``backend``."""
+        self.backend = backend
+        self.namespace = namespace
+    
+    def get(self, key: str) -> Optional[bytes]:
+        return self.backend.get(self.namespace + key)
+    
+    def set(self, key: str, value: bytes, ttl: int):
+        self.backend.set(self.namespace + key, value, ttl)
+    
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        return self.backend.add(self.namespace + key, value, ttl)
+    
+    def delete(self, key: str):
+        self.backend.delete(self.namespace + key)
+    
+    def delete_prefix(self, prefix: str):
+        self.backend.delete_prefix(self.namespace + prefix)
+
+
+class ScheduleCache:
+    """
+    Per-participant cache of getSchedule results.
+    
+    Each participant's schedule for a (start, end, interval) window is
+    stored separately, so a search only fetches the participants that are
+    missing and overlapping participant sets share cached entries.
+    
+    Entries older than ``ttl`` but younger than ``ttl + stale_ttl`` are
+    served immediately, marked ``"stale": true``, and refreshed in the
+    background (stale-while-revalidate). Searches therefore don't wait on
+    Graph for data they already have, even while Graph is slow or down.
+    """
+    
+    def __init__(self, backend, ttl: int = 300, stale_ttl: int = 0):
+        """Initialize the cache on top of a backend with get/set/delete_prefix."""
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = None
+        self._refresh_pid = None
+    
+    @staticmethod
+    def _key(email: str, start_time: str, end_time: str, interval: int) -> str:
+        return f"{email.lower()}|{start_time}|{end_time}|{interval}"
+    
+    def get_schedule(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int,
+        fetch: Callable[[List[str], str, str, int], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Return getSchedule data, fetching only participants that are not cached.
+        
+        Args:
+            emails: List of participant email addresses
+            start_time: Start time in ISO 8601 format
+            end_time: End time in ISO 8601 format
+            interval: Interval in minutes
+            fetch: Function with the get_schedule signature that calls Graph
+        
+        Returns:
+            Schedule data in Graph API format, in the order of ``emails``;
+            schedules served past their TTL carry ``"stale": true``
+        """
+        schedules: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        stale = []
+        now = time.time()
+        
+        for email in emails:
+            cached = self.backend.get(self._key(email, start_time, end_time, interval))
+            entry = json.loads(cached) if cached is not None else None
+            if entry is None or 'schedule' not in entry:
+                missing.append(email)
+            elif now - entry['fetched_at'] > self.ttl:
+                stale.append(email)
+                schedules[email.lower()] = {**entry['schedule'], 'stale': True}
+            else:
+                schedules[email.lower()] = entry['schedule']
+        
+        self.hits += len(emails) - len(missing) - len(stale)
+        self.stale_hits += len(stale)
+        self.misses += len(missing)
+        
+        if stale:
+            self._refresh_in_background(stale, start_time, end_time, interval, fetch)
+        
+        response: Dict[str, Any] = {}
+        if missing:
+            response = fetch(missing, start_time, end_time, interval)
+            for schedule in response.get('value', []):
+                schedules[schedule.get('scheduleId', '').lower()] = schedule
+            self._store(response, start_time, end_time, interval)
+        
+        return {
+            **{key: value for key, value in response.items() if key != 'value'},
+            'value': [
+                schedules[email.lower()] for email in emails if email.lower() in schedules
+            ]
+        }
+    
+    def _store(self, response: Dict[str, Any], start_time: str, end_time: str, interval: int):
+        """Cache every schedule of a getSchedule response."""
+        fetched_at = time.time()
+        for schedule in response.get('value', []):
+            # Errors (e.g. unknown mailbox) are not worth caching
+            if 'error' in schedule:
+                continue
+            self.backend.set(
+                self._key(schedule.get('scheduleId', ''), start_time, end_time, interval),
+                json.dumps(
+                    {'fetched_at': fetched_at, 'schedule': schedule}, separators=(',', ':')
+                ).encode('utf-8'),
+                self.ttl + self.stale_ttl
+            )
+    
+    def _refresh_in_background(
+        self,
+        emails: List[str],
+        start_time: str,
+        end_time: str,
+        interval: int,
+        fetch: Callable[[List[str], str, str, int], Dict[str, Any]]
+    ):
+        """Refetch stale schedules off the request path, once per key at a time."""
+        with self._refresh_lock:
+            pending = [
+                email for email in emails
+                if self._key(email, start_time, end_time, interval) not in self._refreshing
+            ]
+            if not pending:
+                return
+            keys = {self._key(email, start_time, end_time, interval) for email in pending}
+            self._refreshing.update(keys)
+            # Threads don't survive a fork, so each worker process starts its own pool
+            if self._refresh_executor is None or self._refresh_pid != os.getpid():
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix='schedule-refresh'
+                )
+                self._refresh_pid = os.getpid()
+            executor = self._refresh_executor
+        
+        def refresh():
+            try:
+                self._store(fetch(pending, start_time, end_time, interval), start_time, end_time, interval)
+            except Exception as e:
+                logger.exception(f"Background schedule refresh failed: {str(e)}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.difference_update(keys)
+        
+        executor.submit(refresh)
+    
+    def count_cached(self, emails: List[str], start_time: str, end_time: str, interval: int) -> int:
+        """Number of ``emails`` whose schedule for the window is cached."""
+        return sum(
+            self.backend.get(self._key(email, start_time, end_time, interval)) is not None
+            for email in emails
+        )
+    
+    def invalidate(self, emails: List[str]):
+        """Forget every cached window of the given participants."""
+        for email in emails:
+            self.backend.delete_prefix(f"{email.lower()}|")
+
+
+def build_cache_backend():
+    """
+    Build the cache backend configured in Config.
+    
+    Returns:
+        Backend with get/set/add/delete/delete_prefix, or None when
+        SCHEDULE_CACHE_BACKEND is 'none'
+    """
+    backend_name = Config.SCHEDULE_CACHE_BACKEND
+    
+    if backend_name == 'none':
+        return None
+    if backend_name == 'memory':
+        return MemoryCacheBackend(Config.SCHEDULE_CACHE_MAX_ENTRIES)
+    if backend_name == 'sqlite':
+        path = Config.SCHEDULE_CACHE_PATH or os.path.join(
+            '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+            'meeting-planner-schedule-cache.sqlite'
+        )
+        return SQLiteCacheBackend(path, Config.SCHEDULE_CACHE_MAX_ENTRIES)
+    raise ValueError(f"Unknown SCHEDULE_CACHE_BACKEND: {backend_name}")
+
+
+def build_schedule_cache(namespace: str = '') -> Optional[ScheduleCache]:
+    """
+    Build the schedule cache configured in Config.
+    
+    Args:
+        namespace: Prefix of every key, keeping tenants apart
+    
+    Returns:
+        ScheduleCache, or None when SCHEDULE_CACHE_BACKEND is 'none'
+    """
+    backend = build_cache_backend()
+    if backend is None:
+        return None
+    if namespace:
+        backend = NamespacedCacheBackend(backend, namespace)
+    
+    return ScheduleCache(
+        backend, ttl=Config.SCHEDULE_CACHE_TTL, stale_ttl=Config.SCHEDULE_CACHE_STALE_TTL
+    )
@@ -0,0 +1,197 @@
+"""Choice between local schedule analysis and Graph findMeetingTimes."""
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+
+# auto picks the cheaper path per request; local and server force one
+SEARCH_STRATEGIES = ('auto', 'local', 'server')
+
+
+class LatencyStats:
+    """Request count and latency of one search path."""
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+    
+    def add(self, elapsed_ms: float):
+        """Record one request."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics as a JSON-ready dictionary."""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 1) if self.count else None,
+            'last_ms': round(self.last_ms, 1),
+            'max_ms': round(self.max_ms, 1)
+        }
+
+
+class SearchStrategy:
+    """
+    Cost model that picks the cheaper of the two search paths.
+    
+    The local path costs one getSchedule round trip per day that has
+    participants missing from the cache or mirror, plus analysis time that
+    grows with participants × days. The server path is a single
+    findMeetingTimes call whose latency grows with participants × days as
+    well. Each unit cost starts from a prior and follows the measured
+    latencies as an exponential moving average, so the choice adapts to
+    how the Graph endpoints of the tenant it belongs to actually perform;
+    every tenant has its own model (see get_search_strategy).
+    """
+    
+    # Priors in milliseconds, replaced by measurements as requests come in
+    FETCH_MS_PER_CALL = 250.0
+    ANALYSIS_MS_PER_PARTICIPANT_DAY = 0.5
+    SERVER_MS_PER_PARTICIPANT_DAY = 40.0
+    
+    # Weight of the newest measurement in the moving averages
+    SMOOTHING = 0.2
+    
+    # Seconds the server path is skipped after it fails
+    SERVER_FAILURE_COOLDOWN = 300
+    
+    def __init__(self):
+        """Initialize the model with the prior unit costs."""
+        self.fetch_ms_per_call = self.FETCH_MS_PER_CALL
+        self.analysis_ms_per_participant_day = self.ANALYSIS_MS_PER_PARTICIPANT_DAY
+        self.server_ms_per_participant_day = self.SERVER_MS_PER_PARTICIPANT_DAY
+        self.latency = {'local': LatencyStats(), 'server': LatencyStats()}
+        self.chosen = {'local': 0, 'server': 0}
+        self.server_failures = 0
+        self._server_disabled_until = 0.0
+        self._lock = threading.Lock()
+    
+    def estimate(self, participants: int, days: int, fetch_calls: int) -> Dict[str, float]:
+        """
+        Predicted latency of each path.
+        
+        Args:
+            participants: Number of participants
+            days: Number of days searched
+            fetch_calls: Days with participants that are not cached
+        
+        Returns:
+            Milliseconds keyed by path
+        """
+        participant_days = participants * days
+        return {
+            'local': (
+                self.fetch_ms_per_call * fetch_calls
+                + self.analysis_ms_per_participant_day * participant_days
+            ),
+            'server': self.server_ms_per_participant_day * participant_days
+        }
+    
+    def choose(
+        self,
+        participants: int,
+        days: int,
+        fetch_calls: int,
+        server_supported: bool = True
+    ) -> Tuple[str, Dict[str, float]]:
+        """
+        Pick the path with the lower predicted latency.
+        
+        Args:
+            participants: Number of participants
+            days: Number of days searched
+            fetch_calls: Days with participants that are not cached
+            server_supported: Whether findMeetingTimes can answer the request
+        
+        Returns:
+            (path, estimates) with path 'local' or 'server'
+        """
+        estimates = self.estimate(participants, days, fetch_calls)
+        path = 'local'
+        if (
+            server_supported
+            and time.monotonic() >= self._server_disabled_until
+            and estimates['server'] < estimates['local']
+        ):
+            path = 'server'
+        return path, estimates
+    
+    def record_local(
+        self,
+        fetch_ms: float,
+        fetch_calls: Optional[int],
+        analysis_ms: float,
+        participant_days: int
+    ):
+        """
+        Record a local search, split into schedule fetching and analysis.
+        
+        ``fetch_calls`` is None when the uncached days were not counted; the
+        latency is recorded but the cost per call is left as it is.
+        """
+        with self._lock:
+            self.chosen['local'] += 1
+            self.latency['local'].add(fetch_ms + analysis_ms)
+            if fetch_calls:
+                self.fetch_ms_per_call = self._smooth(self.fetch_ms_per_call, fetch_ms / fetch_calls)
+            if participant_days:
+                self.analysis_ms_per_participant_day = self._smooth(
+                    self.analysis_ms_per_participant_day, analysis_ms / participant_days
+                )
+    
+    def record_server(self, elapsed_ms: float, participant_days: int):
+        """Record a findMeetingTimes search."""
+        with self._lock:
+            self.chosen['server'] += 1
+            self.latency['server'].add(elapsed_ms)
+            if participant_days:
+                self.server_ms_per_participant_day = self._smooth(
+                    self.server_ms_per_participant_day, elapsed_ms / participant_days
+                )
+    
+    def record_server_failure(self):
+        """Skip the server path for a while after a failed call."""
+        with self._lock:
+            self.server_failures += 1
+            self._server_disabled_until = time.monotonic() + self.SERVER_FAILURE_COOLDOWN
+    
+    def _smooth(self, current: float, measured: float) -> float:
+        return current + self.SMOOTHING * (measured - current)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Latency and cost model state as a JSON-ready dictionary."""
+        with self._lock:
+            return {
+                'latency': {path: stats.to_dict() for path, stats in self.latency.items()},
+                'chosen': dict(self.chosen),
+                'server_failures': self.server_failures,
+                'server_available': time.monotonic() >= self._server_disabled_until,
+                'unit_costs_ms': {
+                    'fetch_per_call': round(self.fetch_ms_per_call, 3),
+                    'analysis_per_participant_day': round(self.analysis_ms_per_participant_day, 4),
+                    'server_per_participant_day': round(self.server_ms_per_participant_day, 3)
+                }
+            }
+
+
+_search_strategies: Dict[str, SearchStrategy] = {}
+_search_strategy_lock = threading.Lock()
+
+
+def get_search_strategy(tenant: str = '') -> SearchStrategy:
+    """The cost model of ``tenant`` in this process, built on first use."""
+    strategy = _search_strategies.get(tenant)
+    if strategy is None:
+        with _search_strategy_lock:
+            strategy = _search_strategies.setdefault(tenant, SearchStrategy())
+    return strategy
+
+
+def search_strategies() -> Dict[str, SearchStrategy]:
+    """The cost models built so far in this process, by tenant."""
+    return dict(_search_strategies)
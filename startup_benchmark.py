@@ -0,0 +1,112 @@
+"""
+Startup benchmark for Meeting Planner Assistant
+Measures import time and time-to-first-response in fresh interpreters,
+and fails when either exceeds its budget.
+
+Usage:
+    python startup_benchmark.py [--runs 5] [--max-import-ms 400] [--max-first-response-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Runs in a fresh interpreter; prints its own timings as JSON
+CHILD_SCRIPT = r'''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+health = client.get('/health')
+first_health = time.perf_counter()
+search = client.post('/api/find-meeting-times', json={
+    "startDate": "2025-11-17",
+    "endDate": "2025-11-21",
+    "timeRange": "09:00-17:00",
+    "participants": ["user1@company.com", "user2@company.com"],
+    "duration": 60
+})
+first_search = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "health_ms": (first_health - imported) * 1000,
+    "search_ms": (first_search - first_health) * 1000,
+    "status": [health.status_code, search.status_code]
+}))
+'''
+
+
+def run_once() -> dict:
+    """Start a fresh interpreter, import the app and serve the first requests."""
+    env = dict(os.environ, USE_MOCK_API='True', SCHEDULE_CACHE_BACKEND='memory')
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    finished = time.perf_counter()
+    
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    if timings['status'] != [200, 200]:
+        raise RuntimeError(f"Unexpected status codes: {timings['status']}")
+    
+    # Process start through the first search response, as a cold start sees it
+    timings['first_response_ms'] = (finished - started) * 1000
+    return timings
+
+
+def main() -> int:
+    """Run the benchmark and compare the medians with the budgets."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument(
+        '--max-import-ms', type=float,
+        default=float(os.getenv('STARTUP_BUDGET_IMPORT_MS', 400))
+    )
+    parser.add_argument(
+        '--max-first-response-ms', type=float,
+        default=float(os.getenv('STARTUP_BUDGET_FIRST_RESPONSE_MS', 1500))
+    )
+    args = parser.parse_args()
+    
+    runs = [run_once() for _ in range(args.runs)]
+    medians = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ('import_ms', 'health_ms', 'search_ms', 'first_response_ms')
+    }
+    
+    print("=" * 50)
+    print(f"Startup Benchmark ({args.runs} runs, median)")
+    print("=" * 50)
+    print(f"Import app:              {medians['import_ms']:8.1f} ms")
+    print(f"First /health:           {medians['health_ms']:8.1f} ms")
+    print(f"First find-meeting-times:{medians['search_ms']:8.1f} ms")
+    print(f"Process start → response:{medians['first_response_ms']:8.1f} ms")
+    print("=" * 50)
+    
+    failures = []
+    if medians['import_ms'] > args.max_import_ms:
+        failures.append(f"import {medians['import_ms']:.1f} ms > {args.max_import_ms:.0f} ms")
+    if medians['first_response_ms'] > args.max_first_response_ms:
+        failures.append(
+            f"first response {medians['first_response_ms']:.1f} ms > "
+            f"{args.max_first_response_ms:.0f} ms"
+        )
+    
+    for failure in failures:
+        print(f"❌ Startup budget exceeded: {failure}")
+    if not failures:
+        print("✅ Startup within budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Customer tenants served by one deployment, and a Graph client per tenant."""
+import os
+import threading
+from typing import Dict, List, Optional, Callable, Any
+from config import Config
+
+
+# Name of the tenant configured with the plain CLIENT_ID/CLIENT_SECRET/TENANT_ID variables
+DEFAULT_TENANT_NAME = 'default'
+
+
+class UnknownTenantError(Exception):
+    """Raised when a request names no tenant, or one that is not configured."""
+
+
+class Tenant:
+    """App registration of one customer tenant and the key prefix of its cached data."""
+    
+    def __init__(
+        self,
+        name: str,
+        tenant_id: Optional[str],
+        client_id: Optional[str],
+        client_secret: Optional[str],
+        calendar_sync_users: Optional[List[str]] = None,
+        namespace: str = ''
+    ):
+        """
+        Initialize a tenant.
+        
+        Args:
+            name: Name requests select the tenant by
+            tenant_id: Azure AD tenant ID (also accepted to select the tenant)
+            client_id: Application (client) ID
+            client_secret: Client secret
+            calendar_sync_users: Users whose calendars are mirrored locally
+            namespace: Prefix of the tenant's cache and idempotency keys
+        """
+        self.name = name
+        self.tenant_id = tenant_id
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.calendar_sync_users = calendar_sync_users or []
+        self.namespace = namespace
+    
+    @property
+    def authority(self) -> str:
+        return f'https://login.microsoftonline.com/{self.tenant_id}'
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def single_tenant() -> Tenant:
+    """The tenant of CLIENT_ID/CLIENT_SECRET/TENANT_ID."""
+    return Tenant(
+        DEFAULT_TENANT_NAME,
+        Config.TENANT_ID,
+        Config.CLIENT_ID,
+        Config.CLIENT_SECRET,
+        Config.CALENDAR_SYNC_USERS
+    )
+
+
+def load_tenants() -> Dict[str, Tenant]:
+    """
+    Tenants configured in the environment, by name.
+    
+    With TENANTS unset the deployment serves the single tenant of
+    CLIENT_ID/CLIENT_SECRET/TENANT_ID, named "default", whose keys keep
+    their unprefixed form. Otherwise every name in TENANTS reads
+    <NAME>_TENANT_ID, <NAME>_CLIENT_ID, <NAME>_CLIENT_SECRET and
+    <NAME>_CALENDAR_SYNC_USERS, with NAME upper-cased and dashes as
+    underscores.
+    """
+    if not Config.TENANTS:
+        return {DEFAULT_TENANT_NAME: single_tenant()}
+    
+    tenants = {}
+    for name in Config.TENANTS:
+        prefix = name.upper().replace('-', '_')
+        tenants[name] = Tenant(
+            name,
+            os.getenv(f'{prefix}_TENANT_ID'),
+            os.getenv(f'{prefix}_CLIENT_ID'),
+            os.getenv(f'{prefix}_CLIENT_SECRET'),
+            _split(os.getenv(f'{prefix}_CALENDAR_SYNC_USERS', '')),
+            namespace=f'tenant:{name}|'
+        )
+    return tenants
+
+
+def missing_credentials(tenants: Dict[str, Tenant]) -> List[str]:
+    """Environment variables a configured tenant still needs."""
+    if not Config.TENANTS:
+        fields = {'TENANT_ID': 'tenant_id', 'CLIENT_ID': 'client_id', 'CLIENT_SECRET': 'client_secret'}
+        tenant = tenants[DEFAULT_TENANT_NAME]
+        return [variable for variable, field in fields.items() if not getattr(tenant, field)]
+    
+    missing = []
+    for name, tenant in tenants.items():
+        prefix = name.upper().replace('-', '_')
+        for field in ('tenant_id', 'client_id', 'client_secret'):
+            if not getattr(tenant, field):
+                missing.append(f'{prefix}_{field.upper()}')
+    return missing
+
+
+class GraphClientPool:
+    """
+    One Graph client per tenant, built on first use.
+    
+    Each client has its own MSAL app and token cache, HTTP connection pool,
+    circuit breaker, write rate limiter and (key-prefixed) schedule and
+    group caches, so a tenant that is throttled, slow or failing does not
+    hold up the others.
+    """
+    
+    def __init__(
+        self,
+        build_client: Callable[[Tenant], Any],
+        tenants: Dict[str, Tenant],
+        default: Optional[str] = None
+    ):
+        """
+        Initialize the pool.
+        
+        Args:
+            build_client: Builds the client of a tenant
+            tenants: Configured tenants by name
+            default: Tenant of requests that name none (None makes naming one required)
+        """
+        self.build_client = build_client
+        self.tenants = tenants
+        self.default = default
+        self.clients: Dict[str, Any] = {}
+        self._by_tenant_id = {
+            tenant.tenant_id.lower(): tenant for tenant in tenants.values() if tenant.tenant_id
+        }
+        self._locks = {name: threading.Lock() for name in tenants}
+    
+    def resolve(self, requested: Optional[str]) -> Tenant:
+        """
+        The tenant a request selects by name or Azure AD tenant ID.
+        
+        Raises:
+            UnknownTenantError: If it names no tenant and there is no default,
+                or names one that is not configured
+        """
+        if not requested:
+            if self.default is None:
+                raise UnknownTenantError('Missing X-Tenant-ID header')
+            return self.tenants[self.default]
+        tenant = self.tenants.get(requested) or self._by_tenant_id.get(requested.lower())
+        if tenant is None:
+            raise UnknownTenantError(f'Unknown tenant: {requested}')
+        return tenant
+    
+    def get(self, name: Optional[str] = None):
+        """The client of tenant ``name`` (the default tenant if None)."""
+        tenant = self.resolve(name)
+        client = self.clients.get(tenant.name)
+        if client is None:
+            # Building authenticates with Azure AD; a slow tenant only holds up its own requests
+            with self._locks[tenant.name]:
+                client = self.clients.get(tenant.name)
+                if client is None:
+                    client = self.clients[tenant.name] = self.build_client(tenant)
+        return client
@@ -0,0 +1,44 @@
+"""Tests for per-caller admission control."""
+import threading
+import time
+import pytest
+from admission import AdmissionController, AdmissionRejected
+
+
+def test_failed_request_gets_its_cost_back():
+    controller = AdmissionController(max_concurrent=4, cost_rate=0.001, cost_burst=5000)
+    
+    ticket = controller.admit('caller', 3250)
+    controller.release(ticket, refund=True)
+    
+    # Without the refund the second search would find only 1750 left
+    controller.release(controller.admit('caller', 3250))
+    assert controller.snapshot()['callers']['caller']['cost'] == 3250
+
+
+def test_budget_is_kept_for_completed_requests():
+    controller = AdmissionController(max_concurrent=4, cost_rate=0.001, cost_burst=5000)
+    
+    controller.release(controller.admit('caller', 3250))
+    
+    with pytest.raises(AdmissionRejected):
+        controller.admit('caller', 3250)
+
+
+def test_queued_wait_is_limited_by_max_wait():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+    ticket = controller.admit('caller', 1)
+    
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected):
+        controller.admit('caller', 1, max_wait=0.1)
+    assert time.monotonic() - started < 1
+    controller.release(ticket)
+
+
+def test_queued_request_is_admitted_when_a_slot_frees():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+    ticket = controller.admit('caller', 1)
+    threading.Timer(0.05, controller.release, (ticket,)).start()
+    
+    controller.release(controller.admit('caller', 1, max_wait=2))
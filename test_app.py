@@ -0,0 +1,180 @@
+"""In-process tests of the API endpoints in mock mode."""
+import pytest
+import app
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def meeting(subject, **extra):
+    return {
+        'subject': subject,
+        'startTime': '2026-10-20T10:00:00',
+        'endTime': '2026-10-20T11:00:00',
+        'attendees': ['a@x.com'],
+        **extra
+    }
+
+
+def test_bulk_create_marks_bad_idempotency_keys_invalid(client):
+    response = client.post('/api/create-meetings-bulk', json={'meetings': [
+        meeting('number', idempotencyKey=7),
+        meeting('list', idempotencyKey=['a']),
+        meeting('empty', idempotencyKey=''),
+        meeting('string', idempotencyKey='bulk-key-1'),
+        meeting('none')
+    ]})
+    
+    assert response.status_code == 200
+    statuses = [result['status'] for result in response.get_json()['results']]
+    assert statuses == ['invalid', 'invalid', 'invalid', 'created', 'created']
+
+
+def test_bulk_create_reports_an_unexpected_failure_per_meeting(client, monkeypatch):
+    create_meeting_once = app.create_meeting_once
+    
+    def fail_one(graph_client, item, idempotency_key=None):
+        if item['subject'] == 'boom':
+            raise RuntimeError('boom')
+        return create_meeting_once(graph_client, item, idempotency_key)
+    
+    monkeypatch.setattr(app, 'create_meeting_once', fail_one)
+    response = client.post('/api/create-meetings-bulk', json={
+        'meetings': [meeting('ok'), meeting('boom'), meeting('also ok')]
+    })
+    
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['created', 'failed', 'created']
+    assert results[1]['error'] == 'boom'
+
+
+def test_create_meeting_rejects_a_non_string_idempotency_key(client):
+    response = client.post('/api/create-meeting', json=meeting('single', idempotencyKey=12))
+    
+    assert response.status_code == 400
+    assert 'idempotencyKey' in response.get_json()['error']
+
+
+SEARCH = {
+    'participants': ['a@x.com', 'b@x.com'],
+    'startDate': '2026-10-20',
+    'endDate': '2026-10-21',
+    'timeRange': '09:00-17:00'
+}
+
+
+@pytest.mark.parametrize('field, value', [
+    ('minPercentage', '50'),
+    ('minPercentage', 150),
+    ('duration', '60'),
+    ('duration', 0),
+    ('topN', -1),
+    ('topN', 2.5)
+])
+def test_find_meeting_times_rejects_invalid_numbers(client, field, value):
+    response = client.post('/api/find-meeting-times', json={**SEARCH, field: value})
+    
+    assert response.status_code == 400
+    assert field in response.get_json()['error']
+
+
+def test_find_recurring_meeting_times_rejects_a_string_duration(client):
+    response = client.post('/api/find-recurring-meeting-times', json={
+        'participants': ['a@x.com'],
+        'startDate': '2026-10-19',
+        'weeks': 2,
+        'timeRange': '09:00-17:00',
+        'duration': '60'
+    })
+    
+    assert response.status_code == 400
+    assert 'duration' in response.get_json()['error']
+
+
+def test_local_strategy_does_not_count_cached_days(client, monkeypatch):
+    def count_fetch_calls(*args):
+        raise AssertionError('only the auto strategy needs the count')
+    
+    monkeypatch.setattr(app, 'count_fetch_calls', count_fetch_calls)
+    response = client.post('/api/find-meeting-times', json={**SEARCH, 'strategy': 'local'})
+    
+    assert response.status_code == 200
+    assert response.get_json()['strategy'] == 'local'
+
+
+SCHEDULE = {
+    'startDate': '2026-10-19',
+    'endDate': '2026-10-19',
+    'timeRange': '09:00-10:00'
+}
+
+
+@pytest.mark.parametrize('time_limit', ['abc', True, 0, -5, 10 ** 9])
+def test_schedule_meetings_rejects_invalid_time_limits(client, time_limit):
+    response = client.post('/api/schedule-meetings', json={
+        **SCHEDULE,
+        'meetings': [{'participants': ['a@x.com']}],
+        'timeLimitMs': time_limit
+    })
+    
+    assert response.status_code == 400
+    assert 'timeLimitMs' in response.get_json()['error']
+
+
+def test_schedule_meetings_rejects_non_string_participants(client):
+    response = client.post('/api/schedule-meetings', json={
+        **SCHEDULE,
+        'meetings': [{'participants': [1, 2]}]
+    })
+    
+    assert response.status_code == 400
+    assert 'participant' in response.get_json()['error']
+
+
+def test_schedule_meetings_marks_unplaceable_meetings(client):
+    response = client.post('/api/schedule-meetings', json={
+        **SCHEDULE,
+        'meetings': [
+            {'id': 'short', 'participants': ['a@x.com'], 'duration': 30},
+            {'id': 'too-long', 'participants': ['a@x.com'], 'duration': 120}
+        ]
+    })
+    
+    assert response.status_code == 200
+    assignments = {item['id']: item for item in response.get_json()['assignments']}
+    assert assignments['short']['scheduled'] is True
+    assert assignments['too-long'] == {'id': 'too-long', 'scheduled': False}
+
+
+@pytest.mark.parametrize('end', ['2026-10-20T09:00:00', '2026-10-20T10:00:00'])
+def test_check_availability_bulk_rejects_empty_and_reversed_slots(client, end):
+    response = client.post('/api/check-availability-bulk', json={
+        'participants': ['a@x.com'],
+        'slots': [{'startTime': '2026-10-20T10:00:00', 'endTime': end}]
+    })
+    
+    assert response.status_code == 400
+    assert 'end after it starts' in response.get_json()['error']
+
+
+def test_find_recurring_meeting_times_rejects_boolean_weeks(client):
+    response = client.post('/api/find-recurring-meeting-times', json={
+        'participants': ['a@x.com'],
+        'startDate': '2026-10-19',
+        'weeks': True,
+        'timeRange': '09:00-17:00'
+    })
+    
+    assert response.status_code == 400
+    assert 'weeks' in response.get_json()['error']
+
+
+def test_health_reports_dropped_log_records(client, monkeypatch):
+    monkeypatch.setattr(app.app.extensions['log_handler'], 'dropped', 3)
+    
+    response = client.get('/health')
+    
+    assert response.get_json()['log_records_dropped'] == 3
@@ -0,0 +1,151 @@
+"""Tests for the delta-synced calendar mirror."""
+from datetime import datetime, timezone
+import pytest
+import calendar_sync
+from calendar_sync import CalendarSync
+from working_hours import pattern_of
+
+
+BASE = 'https://graph.test/v1.0'
+WORKING_HOURS = {
+    'daysOfWeek': ['monday', 'tuesday', 'wednesday', 'thursday', 'friday'],
+    'startTime': '09:00:00.0000000',
+    'endTime': '18:00:00.0000000',
+    'timeZone': {'name': 'Turkey Standard Time'}
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload or {}
+        self.text = ''
+    
+    def json(self):
+        return dict(self.payload)
+
+
+class StubGraph:
+    """Answers sync requests from canned pages and records what was asked."""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+    
+    def request(self, method, url, params=None, headers=None):
+        self.requests.append((url, params))
+        if url.endswith('/mailboxSettings/workingHours'):
+            return FakeResponse(200, {'@odata.context': 'ctx', **WORKING_HOURS})
+        return FakeResponse(200, self.pages[url])
+
+
+def event(event_id, start, end, show_as='busy'):
+    return {
+        'id': event_id,
+        'start': {'dateTime': f'{start}.0000000', 'timeZone': 'UTC'},
+        'end': {'dateTime': f'{end}.0000000', 'timeZone': 'UTC'},
+        'showAs': show_as
+    }
+
+
+def frozen_today(monkeypatch, day):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 10, day, 8, 0, tzinfo=timezone.utc)
+    
+    monkeypatch.setattr(calendar_sync, 'datetime', FrozenDatetime)
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    frozen_today(monkeypatch, 19)
+    delta = f'{BASE}/users/a@x.com/calendarView/delta'
+    return StubGraph({
+        delta: {'value': [event('e1', '2026-10-20T07:00:00', '2026-10-20T08:00:00')], '@odata.nextLink': f'{BASE}/page2'},
+        f'{BASE}/page2': {
+            'value': [event('e2', '2026-10-20T09:00:00', '2026-10-20T09:30:00', 'tentative')],
+            '@odata.deltaLink': f'{BASE}/delta?token=1'
+        },
+        f'{BASE}/delta?token=1': {
+            'value': [
+                {'id': 'e1', '@removed': {'reason': 'deleted'}},
+                event('e3', '2026-10-20T10:00:00', '2026-10-20T11:00:00', 'oof')
+            ],
+            '@odata.deltaLink': f'{BASE}/delta?token=2'
+        }
+    })
+
+
+def mirror(graph):
+    return CalendarSync(['A@x.com'], BASE, lambda: {'Authorization': 'Bearer token'}, request=graph.request)
+
+
+def view(sync):
+    start = sync.to_minute('2026-10-20T07:00:00+00:00')
+    return sync.schedule_for('a@x.com', start, start + 5 * 60, 30)
+
+
+def test_first_round_follows_next_links_to_the_delta_link(graph):
+    sync = mirror(graph)
+    
+    sync.sync_user('a@x.com')
+    
+    urls = [url for url, _ in graph.requests]
+    assert urls[1:] == [f'{BASE}/users/a@x.com/calendarView/delta', f'{BASE}/page2']
+    assert graph.requests[1][1] == {'startDateTime': '2026-10-19T00:00:00Z', 'endDateTime': '2026-11-18T00:00:00Z'}
+    assert view(sync)['availabilityView'] == '2200100000'
+
+
+def test_later_rounds_apply_changes_from_the_delta_link(graph):
+    sync = mirror(graph)
+    sync.sync_user('a@x.com')
+    
+    sync.sync_user('a@x.com')
+    
+    assert graph.requests[-1] == (f'{BASE}/delta?token=1', None)
+    assert view(sync)['availabilityView'] == '0000103300'
+
+
+def test_window_rollover_starts_a_fresh_delta_query(graph, monkeypatch):
+    sync = mirror(graph)
+    sync.sync_user('a@x.com')
+    sync.sync_user('a@x.com')
+    
+    frozen_today(monkeypatch, 20)
+    sync.sync_user('a@x.com')
+    
+    url, params = graph.requests[-2]
+    assert url == f'{BASE}/users/a@x.com/calendarView/delta'
+    assert params['startDateTime'] == '2026-10-20T00:00:00Z'
+    # The index is rebuilt from scratch, so the removed event e1 is back
+    assert view(sync)['availabilityView'] == '2200100000'
+    assert not sync.covers('a@x.com', sync.to_minute('2026-10-19T12:00:00+00:00'), sync.to_minute('2026-10-19T13:00:00+00:00'))
+
+
+def test_mirrored_schedules_carry_working_hours(graph):
+    sync = mirror(graph)
+    
+    sync.sync_user('a@x.com')
+    
+    schedule = view(sync)
+    assert schedule['workingHours'] == WORKING_HOURS
+    assert pattern_of(schedule['workingHours']) is not None
+
+
+def test_rollover_stops_serving_the_user_before_clearing_the_index(graph, monkeypatch):
+    sync = mirror(graph)
+    sync.sync_user('a@x.com')
+    start = sync.to_minute('2026-10-20T07:00:00+00:00')
+    covered_while_cleared = []
+    clear = sync.index.clear
+    
+    def clear_and_check(user):
+        clear(user)
+        covered_while_cleared.append(sync.covers(user, start, start + 60))
+    
+    monkeypatch.setattr(sync.index, 'clear', clear_and_check)
+    frozen_today(monkeypatch, 20)
+    sync.sync_user('a@x.com')
+    
+    assert covered_while_cleared == [False]
@@ -0,0 +1,87 @@
+"""Tests for the Graph API client payloads."""
+from datetime import datetime, timezone
+import pytest
+from config import Config
+from tenants import Tenant
+import graph_client
+from graph_client import GraphAPIClient
+
+
+class FakeConfidentialClientApplication:
+    """Stand-in for MSAL that hands out a fixed token without calling Azure AD."""
+    
+    def __init__(self, *args, **kwargs):
+        pass
+    
+    def acquire_token_silent(self, scopes, account=None):
+        return None
+    
+    def acquire_token_for_client(self, scopes):
+        return {'access_token': 'token', 'expires_in': 3600}
+
+
+class FakeResponse:
+    """Minimal requests.Response for a created event."""
+    
+    status_code = 201
+    headers = {}
+    text = ''
+    
+    def __init__(self, payload):
+        self.payload = payload
+    
+    def json(self):
+        return {'id': 'event-1', **self.payload}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A GraphAPIClient whose requests are recorded instead of sent."""
+    monkeypatch.setattr(graph_client.msal, 'ConfidentialClientApplication', FakeConfidentialClientApplication)
+    monkeypatch.setattr(Config, 'DEFAULT_TIMEZONE', 'Europe/Istanbul')
+    client = GraphAPIClient(Tenant('test', 'tenant-id', 'client-id', 'secret'))
+    client.sent = []
+    
+    def record(method, url, **kwargs):
+        client.sent.append(kwargs['json'])
+        return FakeResponse(kwargs['json'])
+    
+    monkeypatch.setattr(client, '_request', record)
+    return client
+
+
+def test_create_meeting_sends_offset_times_as_utc(client):
+    client.create_meeting('Sync', '2026-10-20T09:00:00-04:00', '2026-10-20T10:00:00-04:00', ['a@x.com'])
+    
+    payload = client.sent[0]
+    assert payload['start'] == {'dateTime': '2026-10-20T13:00:00', 'timeZone': 'UTC'}
+    assert payload['end'] == {'dateTime': '2026-10-20T14:00:00', 'timeZone': 'UTC'}
+
+
+def test_create_meeting_keeps_naive_times_in_default_zone(client):
+    client.create_meeting('Sync', '2026-10-20T09:00:00', '2026-10-20T10:00:00', ['a@x.com'])
+    
+    assert client.sent[0]['start'] == {'dateTime': '2026-10-20T09:00:00', 'timeZone': 'Europe/Istanbul'}
+
+
+def test_booking_a_suggestion_from_another_zone_keeps_its_instant(client):
+    import app
+    response = app.app.test_client().post('/api/find-meeting-times', json={
+        'participants': ['a@x.com', 'b@x.com'],
+        'startDate': '2026-10-20',
+        'endDate': '2026-10-20',
+        'timeRange': '09:00-17:00',
+        'duration': 60,
+        'minPercentage': 0,
+        'timeZone': 'America/New_York',
+        'strategy': 'local'
+    })
+    suggestion = response.get_json()['suggestions'][0]
+    assert suggestion['start_time'].endswith('-04:00')
+    
+    client.create_meeting('Sync', suggestion['start_time'], suggestion['end_time'], ['a@x.com'])
+    
+    sent = client.sent[0]['start']
+    booked = datetime.fromisoformat(sent['dateTime']).replace(tzinfo=timezone.utc)
+    assert sent['timeZone'] == 'UTC'
+    assert booked == datetime.fromisoformat(suggestion['start_time'])
@@ -0,0 +1,107 @@
+"""Tests for the minute-precision interval engine."""
+import pytz
+import pytest
+import interval_engine
+from meeting_analyzer import MeetingAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    return MeetingAnalyzer('UTC')
+
+
+def item(status, start, end, time_zone='UTC'):
+    return {
+        'status': status,
+        'start': {'dateTime': f'2026-10-19T{start}:00.0000000', 'timeZone': time_zone},
+        'end': {'dateTime': f'2026-10-19T{end}:00.0000000', 'timeZone': time_zone}
+    }
+
+
+def minute(analyzer, clock):
+    return analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-17:00').minute_of(0, 0) + (
+        int(clock[:2]) - 9) * 60 + int(clock[3:])
+
+
+def test_events_touching_the_range_leave_it_free():
+    starts = interval_engine.valid_starts([(-30, 0), (480, 510)], 0, 480, 60)
+    
+    assert starts == [(0, 421)]
+
+
+def test_valid_starts_between_events():
+    starts = interval_engine.valid_starts([(30, 60), (100, 420)], 0, 480, 40)
+    
+    # 0-30 is too short; 60-100 fits exactly one start; 420-480 fits 21
+    assert starts == [(60, 61), (420, 441)]
+
+
+def test_busy_intervals_merge_overlapping_and_adjacent_items(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-17:00')
+    schedule = {'scheduleItems': [
+        item('busy', '09:30', '10:30'),
+        item('oof', '09:00', '10:00'),
+        item('busy', '10:30', '11:00'),
+        item('tentative', '12:00', '13:00'),
+        item('busy', '14:00', '14:10')
+    ]}
+    
+    busy = interval_engine.busy_intervals(schedule, timeline, 0, pytz.utc)
+    
+    assert busy == [
+        (minute(analyzer, '09:00'), minute(analyzer, '11:00')),
+        (minute(analyzer, '14:00'), minute(analyzer, '14:10'))
+    ]
+
+
+def test_busy_intervals_fall_back_to_the_view_without_items(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-17:00')
+    schedule = {'availabilityView': '0220001000000000', 'scheduleItems': []}
+    
+    busy = interval_engine.busy_intervals(schedule, timeline, 0, pytz.utc)
+    
+    # Tentative ('1') counts as free, as in the grid analysis
+    assert busy == [(minute(analyzer, '09:30'), minute(analyzer, '10:30'))]
+
+
+def test_items_are_used_instead_of_the_view_when_present(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-17:00')
+    schedule = {'availabilityView': '2' + '0' * 15, 'scheduleItems': [item('busy', '09:00', '09:10')]}
+    
+    busy = interval_engine.busy_intervals(schedule, timeline, 0, pytz.utc)
+    
+    assert busy == [(minute(analyzer, '09:00'), minute(analyzer, '09:10'))]
+
+
+def test_sweep_counts_overlapping_ranges_and_skips_gaps():
+    segments = interval_engine.sweep([[(0, 10), (30, 40)], [(5, 20)], [(5, 10)]])
+    
+    assert segments == [(0, 5, 1), (5, 10, 3), (10, 20, 1), (30, 40, 1)]
+
+
+def test_is_free_uses_half_open_ranges():
+    ranges = [(0, 10), (20, 30)]
+    
+    assert interval_engine.is_free(ranges, 0)
+    assert interval_engine.is_free(ranges, 9)
+    assert not interval_engine.is_free(ranges, 10)
+    assert not interval_engine.is_free(ranges, -1)
+    assert interval_engine.is_free(ranges, 29)
+
+
+def test_analyze_intervals_finds_starts_the_grid_cannot_express(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-10:00')
+    day_schedules = {0: {'value': [
+        # The 30-minute views round 10-minute events up to whole intervals
+        {'scheduleId': 'a@x.com', 'availabilityView': '20', 'scheduleItems': [item('busy', '09:00', '09:10')]},
+        {'scheduleId': 'b@x.com', 'availabilityView': '02', 'scheduleItems': [item('busy', '09:50', '10:00')]}
+    ]}}
+    
+    grid = analyzer.analyze_timeline(timeline, day_schedules, duration_minutes=30)
+    slots = analyzer.analyze_intervals(timeline, day_schedules, duration_minutes=30)
+    
+    assert max(slot['available_count'] for slot in grid) == 1
+    best = slots[0]
+    assert best['available_count'] == 2
+    assert best['start_time'].startswith('2026-10-19T09:10')
+    assert best['latest_start_time'].startswith('2026-10-19T09:20')
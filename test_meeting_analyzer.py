@@ -0,0 +1,224 @@
+"""Tests for the meeting slot analysis."""
+import itertools
+import pytest
+from meeting_analyzer import MeetingAnalyzer
+
+
+def schedules(timeline, views):
+    """getSchedule data per day, with ``views`` mapping addresses to a view or a day -> view function."""
+    return {
+        day: {'value': [
+            {
+                'scheduleId': email,
+                'availabilityView': view(day) if callable(view) else view
+            }
+            for email, view in views.items()
+        ]}
+        for day in range(len(timeline))
+    }
+
+
+def overlaps(first, second):
+    return first['start_time'] < second['end_time'] and second['start_time'] < first['end_time']
+
+
+@pytest.fixture
+def analyzer():
+    return MeetingAnalyzer('UTC')
+
+
+def test_meetings_sharing_people_spread_over_the_range(analyzer):
+    # Two 240 minute slots per day over two weeks, all taken by the same two people
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-30', '09:00-17:00')
+    day_schedules = schedules(timeline, {'a@x.com': '0' * 16, 'b@x.com': '0' * 16})
+    meetings = [{'participants': ['a@x.com', 'b@x.com'], 'duration': 240} for _ in range(12)]
+    
+    result = analyzer.schedule_meetings(timeline, day_schedules, meetings, ['a@x.com', 'b@x.com'])
+    
+    placed = result['assignments']
+    assert all(placed)
+    assert not any(overlaps(first, second) for first, second in itertools.combinations(placed, 2))
+    assert result['total_attendance'] == 24
+    assert result['optimal']
+
+
+def test_short_candidate_lists_still_place_every_meeting(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-30', '09:00-17:00')
+    day_schedules = schedules(timeline, {'a@x.com': '0' * 16})
+    meetings = [{'participants': ['a@x.com'], 'duration': 240} for _ in range(3)]
+    
+    result = analyzer.schedule_meetings(timeline, day_schedules, meetings, ['a@x.com'], max_candidates=4)
+    
+    assert all(result['assignments'])
+
+
+def test_cut_candidate_lists_are_not_reported_optimal(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-11:00')
+    day_schedules = schedules(timeline, {'a@x.com': '0000'})
+    meetings = [{'participants': ['a@x.com'], 'duration': 60} for _ in range(2)]
+    
+    # With one candidate each, both meetings want 09:00 and only one gets it
+    result = analyzer.schedule_meetings(timeline, day_schedules, meetings, ['a@x.com'], max_candidates=1)
+    
+    assert result['total_attendance'] == 1
+    assert not result['optimal']
+
+
+def test_meeting_that_cannot_be_placed_is_left_out(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-11:00')
+    day_schedules = schedules(timeline, {'a@x.com': '0000'})
+    meetings = [
+        {'participants': ['a@x.com'], 'duration': 120},
+        {'participants': ['a@x.com'], 'duration': 60}
+    ]
+    
+    result = analyzer.schedule_meetings(timeline, day_schedules, meetings, ['a@x.com'])
+    
+    assert len([slot for slot in result['assignments'] if slot]) == 1
+    assert result['total_attendance'] == 1
+
+
+def brute_force(analyzer, timeline, day_schedules, meetings, roster):
+    """Best total attendance over every combination of windows (or none) per meeting."""
+    options = []
+    for meeting in meetings:
+        duration = meeting['duration']
+        windows = [None]
+        for day, schedule_data in day_schedules.items():
+            masks = analyzer.window_masks(schedule_data, duration // timeline.interval_minutes, roster)
+            for i, mask in enumerate(masks):
+                start = timeline.minute_of(day, i)
+                attending = sum(
+                    mask >> roster.index(email) & 1 for email in meeting['participants']
+                )
+                windows.append((start, start + duration, attending))
+        options.append(windows)
+    
+    best = 0
+    for choice in itertools.product(*options):
+        clash = any(
+            first and second
+            and set(meetings[i]['participants']) & set(meetings[j]['participants'])
+            and first[0] < second[1] and second[0] < first[1]
+            for (i, first), (j, second) in itertools.combinations(enumerate(choice), 2)
+        )
+        if not clash:
+            best = max(best, sum(window[2] for window in choice if window))
+    return best
+
+
+def test_matches_brute_force_on_a_small_case(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-20', '09:00-11:00')
+    roster = ['a@x.com', 'b@x.com', 'c@x.com']
+    day_schedules = schedules(timeline, {
+        'a@x.com': lambda day: '0020' if day == 0 else '0000',
+        'b@x.com': lambda day: '2000' if day == 0 else '0022',
+        'c@x.com': lambda day: '0002' if day == 0 else '2200'
+    })
+    meetings = [
+        {'participants': ['a@x.com', 'b@x.com'], 'duration': 60},
+        {'participants': ['b@x.com', 'c@x.com'], 'duration': 60},
+        {'participants': ['a@x.com', 'c@x.com'], 'duration': 30},
+        {'participants': ['a@x.com', 'b@x.com', 'c@x.com'], 'duration': 60}
+    ]
+    
+    result = analyzer.schedule_meetings(timeline, day_schedules, meetings, roster)
+    
+    assert result['optimal']
+    assert result['total_attendance'] == brute_force(analyzer, timeline, day_schedules, meetings, roster)
+    placed = [(meeting, slot) for meeting, slot in zip(meetings, result['assignments']) if slot]
+    for (first, first_slot), (second, second_slot) in itertools.combinations(placed, 2):
+        if set(first['participants']) & set(second['participants']):
+            assert not overlaps(first_slot, second_slot)
+
+
+def test_check_slots_matches_analyze_timeline_on_aligned_slots(analyzer):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-17:00')
+    views = {
+        'a@x.com': '0022000011000000',
+        'b@x.com': '2000000000002222',
+        'c@x.com': '0000330000000000',
+        'd@x.com': '4400000000000040'
+    }
+    day_schedules = schedules(timeline, views)
+    expected = analyzer.analyze_timeline(timeline, day_schedules, duration_minutes=60)
+    
+    plan = analyzer.plan_slot_checks([(slot['start_time'], slot['end_time']) for slot in expected])
+    results = analyzer.check_slots(day_schedules[0], plan)
+    
+    assert plan['interval'] == 30
+    assert plan['origin'] == timeline.minute_of(0, 0)
+    for slot, result in zip(expected, results):
+        assert result['available_count'] == slot['available_count']
+        assert sorted(result['available_participants']) == sorted(slot['available_participants'])
+
+
+def test_unaligned_slot_is_checked_against_the_interval_around_it(analyzer):
+    plan = analyzer.plan_slot_checks([
+        ('2026-10-19T09:00:00', '2026-10-19T10:00:00'),
+        ('2026-10-19T09:01:00', '2026-10-19T09:02:00'),
+        ('2026-10-19T09:06:00', '2026-10-19T09:14:00')
+    ])
+    # One-minute boundaries fall back to Graph's 5-minute minimum
+    assert plan['interval'] == 5
+    
+    results = analyzer.check_slots({'value': [
+        {'scheduleId': 'a@x.com', 'availabilityView': '200000000000'},
+        {'scheduleId': 'b@x.com', 'availabilityView': '002000000000'}
+    ]}, plan)
+    
+    assert [result['available_participants'] for result in results] == [[], ['b@x.com'], ['a@x.com']]
+
+
+@pytest.mark.parametrize('end', ['2026-10-19T09:00:00', '2026-10-19T10:00:00'])
+def test_slots_that_do_not_end_after_they_start_are_rejected(analyzer, end):
+    with pytest.raises(ValueError):
+        analyzer.plan_slot_checks([('2026-10-19T10:00:00', end)])
+
+
+@pytest.mark.parametrize('duration, available', [(15, ['b@x.com']), (30, ['b@x.com']), (45, []), (60, [])])
+def test_durations_off_the_interval_cover_every_interval_they_touch(analyzer, duration, available):
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-19', '09:00-10:00')
+    # a is always busy; b is busy from 09:30
+    day_schedules = schedules(timeline, {'a@x.com': '22', 'b@x.com': '02'})
+    
+    slots = analyzer.analyze_timeline(timeline, day_schedules, duration_minutes=duration)
+    
+    first = next(slot for slot in slots if slot['start_time'].startswith('2026-10-19T09:00'))
+    assert first['available_participants'] == available
+
+
+def test_recurring_slots_fold_weeks_and_rank_by_worst_case_then_average(analyzer):
+    # Three Mondays, 09:00-10:00 in 30-minute intervals
+    timeline = analyzer.build_timeline('2026-10-19', '2026-11-06', '09:00-10:00')
+    roster = ['a@x.com', 'b@x.com', 'c@x.com']
+    weeks = {
+        # 09:00 loses one person in one week; 09:30 loses one person every week
+        'a@x.com': ['00', '20', '00'],
+        'b@x.com': ['02', '00', '02'],
+        'c@x.com': ['00', '00', '00']
+    }
+    mondays = [day for day in range(len(timeline)) if timeline.day_dates[day].weekday() == 0]
+    day_schedules = {
+        day: {'value': [
+            {'scheduleId': email, 'availabilityView': views[mondays.index(day)] if day in mondays else '00'}
+            for email, views in weeks.items()
+        ]}
+        for day in range(len(timeline))
+    }
+    
+    slots = analyzer.analyze_recurring(timeline, day_schedules, roster, duration_minutes=30)
+    monday = [slot for slot in slots if slot['weekday'] == 'monday']
+    
+    assert [slot['start_time'][11:16] for slot in monday] == ['09:00', '09:30']
+    nine, half_past = monday
+    assert nine['occurrences'] == 3
+    assert nine['occurrence_counts'] == [3, 2, 3]
+    assert nine['worst_case_count'] == 2
+    assert nine['available_every_week'] == ['b@x.com', 'c@x.com']
+    assert half_past['occurrence_counts'] == [2, 3, 2]
+    assert half_past['worst_case_count'] == 2
+    assert nine['average_count'] > half_past['average_count']
+    # Weekdays where everyone is always free rank above both
+    assert slots[0]['worst_case_count'] == 3
+    assert slots.index(nine) < slots.index(half_past)
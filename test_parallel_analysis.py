@@ -0,0 +1,73 @@
+"""Tests for window scans spread over a process pool."""
+import random
+import pytest
+from meeting_analyzer import MeetingAnalyzer, scan_windows
+from parallel_analysis import ParallelScanner, merge_partitions
+
+
+EMAILS = [f'user{index}@x.com' for index in range(12)]
+
+
+@pytest.fixture(scope='module')
+def scanner():
+    scanner = ParallelScanner(2, min_cells=0)
+    yield scanner
+    scanner.shutdown()
+
+
+@pytest.fixture(scope='module')
+def search():
+    """Ten days of random schedules, as the per-day columns analyze_timeline scans."""
+    analyzer = MeetingAnalyzer('UTC')
+    timeline = analyzer.build_timeline('2026-10-19', '2026-10-30', '09:00-17:00')
+    rng = random.Random(7)
+    days = {}
+    for day in range(len(timeline)):
+        participants = [
+            (index, email == EMAILS[0], analyzer._free_run_lengths(
+                ''.join(rng.choice('0000122') for _ in range(16))
+            ))
+            for index, email in enumerate(EMAILS)
+        ]
+        days[day] = (sorted(participants, key=lambda participant: not participant[1]), len(EMAILS))
+    return timeline, days
+
+
+def without_required(days):
+    return {
+        day: ([(index, False, free_runs) for index, _, free_runs in participants], total)
+        for day, (participants, total) in days.items()
+    }
+
+
+@pytest.mark.parametrize('top_n', [None, 5, 20])
+@pytest.mark.parametrize('min_percentage', [0, 60])
+@pytest.mark.parametrize('required', [False, True])
+def test_parallel_scan_matches_a_single_scan(scanner, search, top_n, min_percentage, required):
+    timeline, days = search
+    if not required:
+        days = without_required(days)
+    intervals_needed = 2
+    window_days, window_offsets = timeline.window_index(intervals_needed)
+    
+    serial, _, _, _ = scan_windows(
+        days, window_days, window_offsets, timeline.day_starts,
+        timeline.interval_minutes, intervals_needed, min_percentage, top_n
+    )
+    parallel, analyzed, _, unanalyzed = scanner.scan(
+        days, timeline, intervals_needed, min_percentage, top_n
+    )
+    
+    assert parallel == serial
+    assert analyzed > 0
+    assert unanalyzed == []
+
+
+def test_merge_keeps_the_best_windows_earliest_first():
+    first = ({100: (0, [1, 2], []), 160: (0, [1], [2])}, 2, 0, [])
+    second = ({1540: (1, [1, 2], []), 1600: (1, [], [1, 2])}, 2, 1, [])
+    
+    windows, analyzed, pruned, unanalyzed = merge_partitions([first, second], 2)
+    
+    assert windows == {100: (0, [1, 2], []), 1540: (1, [1, 2], [])}
+    assert (analyzed, pruned, unanalyzed) == (4, 1, [])
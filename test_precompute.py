@@ -0,0 +1,66 @@
+"""Tests for precomputed views of hot search shapes."""
+import datetime
+import time
+from types import SimpleNamespace
+from precompute import HotSetTracker, MaterializedView, Precomputer, search_shape
+from schedule_cache import MemoryCacheBackend
+
+
+TIMELINE = SimpleNamespace(day_dates=[datetime.date(2026, 10, 19)])
+SHAPE = search_shape(['a@example.com', 'b@example.com'], '09:00-17:00', 60, 'UTC', True, 'default')
+
+
+def precomputer(backend=None, max_age=None):
+    def build_view(shape, participants, budget):
+        return MaterializedView(shape, TIMELINE, [], list(participants))
+    
+    return Precomputer(build_view, interval_seconds=300, max_age=max_age, backend=backend)
+
+
+def test_shape_needs_one_search_more_than_min_searches():
+    tracker = HotSetTracker()
+    tracker.record(SHAPE, list(SHAPE.participants))
+    tracker.record(SHAPE, list(SHAPE.participants))
+    assert tracker.hottest(10, 2) == []
+    
+    tracker.record(SHAPE, list(SHAPE.participants))
+    assert [shape for shape, _ in tracker.hottest(10, 2)] == [SHAPE]
+
+
+def test_view_is_not_served_past_max_age():
+    worker = precomputer(max_age=60)
+    worker.views[SHAPE] = MaterializedView(SHAPE, TIMELINE, [], list(SHAPE.participants))
+    assert worker.lookup(SHAPE, TIMELINE) is not None
+    
+    worker.views[SHAPE].built_at = time.time() - 61
+    assert worker.lookup(SHAPE, TIMELINE) is None
+
+
+def test_booking_invalidates_views_of_other_workers():
+    backend = MemoryCacheBackend()
+    booking_worker, other_worker = precomputer(backend), precomputer(backend)
+    for worker in (booking_worker, other_worker):
+        for _ in range(3):
+            worker.tracker.record(SHAPE, list(SHAPE.participants))
+        worker.refresh()
+        assert worker.lookup(SHAPE, TIMELINE) is not None
+    
+    booking_worker.invalidate(['B@example.com'], 'default')
+    
+    assert booking_worker.lookup(SHAPE, TIMELINE) is None
+    assert other_worker.lookup(SHAPE, TIMELINE) is None
+    
+    # A view built after the booking is served again
+    time.sleep(0.01)
+    other_worker.refresh()
+    assert other_worker.lookup(SHAPE, TIMELINE) is not None
+
+
+def test_booking_in_another_tenant_keeps_the_view():
+    backend = MemoryCacheBackend()
+    worker = precomputer(backend)
+    worker.views[SHAPE] = MaterializedView(SHAPE, TIMELINE, [], list(SHAPE.participants))
+    
+    precomputer(backend).invalidate(['a@example.com'], 'other')
+    
+    assert worker.lookup(SHAPE, TIMELINE) is not None
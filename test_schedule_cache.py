@@ -0,0 +1,118 @@
+"""Tests for the per-participant schedule cache."""
+from types import SimpleNamespace
+import pytest
+import schedule_cache
+from schedule_cache import MemoryCacheBackend, ScheduleCache, SQLiteCacheBackend
+
+
+WINDOW = ('2026-10-20T09:00:00', '2026-10-20T17:00:00', 30)
+
+
+class Clock:
+    """Settable stand-in for time.time()."""
+    
+    def __init__(self):
+        self.now = 1_000_000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class Graph:
+    """Records the participants each getSchedule call asks for."""
+    
+    def __init__(self):
+        self.calls = []
+        self.version = 1
+    
+    def fetch(self, emails, start_time, end_time, interval):
+        self.calls.append(list(emails))
+        return {'value': [
+            {'scheduleId': email, 'availabilityView': str(self.version)} for email in emails
+        ]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(schedule_cache, 'time', SimpleNamespace(time=clock))
+    return clock
+
+
+def test_cached_participants_are_not_fetched_again(clock):
+    cache = ScheduleCache(MemoryCacheBackend(), ttl=300)
+    graph = Graph()
+    
+    cache.get_schedule(['a@x.com', 'b@x.com'], *WINDOW, graph.fetch)
+    result = cache.get_schedule(['B@x.com', 'c@x.com', 'a@x.com'], *WINDOW, graph.fetch)
+    
+    assert graph.calls == [['a@x.com', 'b@x.com'], ['c@x.com']]
+    assert [schedule['scheduleId'] for schedule in result['value']] == ['b@x.com', 'c@x.com', 'a@x.com']
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_stale_entries_are_served_and_refreshed_in_background(clock):
+    cache = ScheduleCache(MemoryCacheBackend(), ttl=300, stale_ttl=600)
+    graph = Graph()
+    cache.get_schedule(['a@x.com'], *WINDOW, graph.fetch)
+    
+    clock.now += 400
+    graph.version = 2
+    result = cache.get_schedule(['a@x.com'], *WINDOW, graph.fetch)
+    cache._refresh_executor.shutdown(wait=True)
+    
+    assert result['value'] == [{'scheduleId': 'a@x.com', 'availabilityView': '1', 'stale': True}]
+    assert cache.stale_hits == 1
+    fresh = cache.get_schedule(['a@x.com'], *WINDOW, graph.fetch)
+    assert fresh['value'] == [{'scheduleId': 'a@x.com', 'availabilityView': '2'}]
+    assert len(graph.calls) == 2
+
+
+def test_entries_past_the_stale_window_are_fetched(clock):
+    cache = ScheduleCache(MemoryCacheBackend(), ttl=300, stale_ttl=600)
+    graph = Graph()
+    cache.get_schedule(['a@x.com'], *WINDOW, graph.fetch)
+    
+    clock.now += 901
+    result = cache.get_schedule(['a@x.com'], *WINDOW, graph.fetch)
+    
+    assert 'stale' not in result['value'][0]
+    assert cache.misses == 2
+
+
+def test_invalidate_forgets_every_window_of_a_participant(clock):
+    cache = ScheduleCache(MemoryCacheBackend(), ttl=300)
+    graph = Graph()
+    other_window = ('2026-10-21T09:00:00', '2026-10-21T17:00:00', 30)
+    for window in (WINDOW, other_window):
+        cache.get_schedule(['a@x.com', 'b@x.com'], *window, graph.fetch)
+    
+    cache.invalidate(['A@x.com'])
+    
+    assert cache.count_cached(['a@x.com', 'b@x.com'], *WINDOW) == 1
+    assert cache.count_cached(['a@x.com', 'b@x.com'], *other_window) == 1
+    cache.get_schedule(['a@x.com', 'b@x.com'], *WINDOW, graph.fetch)
+    assert graph.calls[-1] == ['a@x.com']
+
+
+def test_failed_lookups_are_not_cached(clock):
+    cache = ScheduleCache(MemoryCacheBackend(), ttl=300)
+    
+    def fetch(emails, start_time, end_time, interval):
+        return {'value': [{'scheduleId': email, 'error': {'message': 'unknown'}} for email in emails]}
+    
+    cache.get_schedule(['ghost@x.com'], *WINDOW, fetch)
+    
+    assert cache.count_cached(['ghost@x.com'], *WINDOW) == 0
+
+
+def test_sqlite_delete_prefix_removes_only_keys_with_the_prefix(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite'))
+    keys = ['a_b@x.com|1', 'a_b@x.com|2', 'aXb@x.com|1', 'a_b@x.com}', 'a_b@x.com', '100%|1', '1000|1']
+    for key in keys:
+        backend.set(key, b'1', 300)
+    
+    backend.delete_prefix('a_b@x.com|')
+    backend.delete_prefix('100%|')
+    
+    assert [key for key in keys if backend.get(key) is not None] == ['aXb@x.com|1', 'a_b@x.com}', 'a_b@x.com', '1000|1']
@@ -0,0 +1,23 @@
+"""Tests for the search path cost model."""
+from search_strategy import SearchStrategy, get_search_strategy
+
+
+def test_every_tenant_has_its_own_model():
+    slow = get_search_strategy('slow-tenant')
+    fast = get_search_strategy('fast-tenant')
+    
+    for _ in range(20):
+        slow.record_server(20 * 10000.0, 20)
+    
+    assert get_search_strategy('slow-tenant') is slow
+    assert slow.choose(5, 1, fetch_calls=1)[0] == 'local'
+    assert fast.choose(5, 1, fetch_calls=1)[0] == 'server'
+
+
+def test_uncounted_fetch_calls_leave_the_cost_per_call():
+    strategy = SearchStrategy()
+    
+    strategy.record_local(5000.0, None, 10.0, 20)
+    
+    assert strategy.fetch_ms_per_call == SearchStrategy.FETCH_MS_PER_CALL
+    assert strategy.snapshot()['latency']['local']['count'] == 1
@@ -0,0 +1,161 @@
+"""Integer-offset timeline for meeting searches over a date range."""
+from array import array
+from typing import List, Tuple
+from datetime import datetime, date, timedelta, timezone as dt_timezone
+
+
+def to_epoch_minute(value: str, default_tz) -> int:
+    """
+    Convert an ISO 8601 date-time to epoch minutes.
+    
+    Args:
+        value: Date-time string; naive values are read in ``default_tz``
+        default_tz: pytz timezone for naive values
+    
+    Returns:
+        Minutes since 1970-01-01T00:00Z
+    """
+    # Graph returns seven fractional digits, which fromisoformat cannot read
+    if len(value) > 19 and value[19] == '.':
+        value = value[:19] + value[19:].lstrip('.0123456789')
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = default_tz.localize(parsed)
+    return int(parsed.timestamp()) // 60
+
+
+class Timeline:
+    """
+    Columnar representation of the daily search windows in a date range.
+    
+    Every day is stored as the epoch minute of its window start plus its
+    UTC offset, so scanning works on plain integers. Datetimes and ISO
+    strings are only built when a result leaves the service.
+    """
+    
+    def __init__(self, interval_minutes: int = 30, naive: bool = False):
+        """Initialize an empty timeline with the given interval length."""
+        self.interval_minutes = interval_minutes
+        self.naive = naive
+        self.day_dates: List[date] = []
+        self.day_starts = array('q')
+        self.day_offsets = array('i')
+        self.day_lengths = array('i')
+        self.day_spans = array('i')
+    
+    @classmethod
+    def from_date_range(
+        cls,
+        start_date: str,
+        end_date: str,
+        time_range: str,
+        tz,
+        interval_minutes: int = 30
+    ) -> 'Timeline':
+        """
+        Build a timeline with one entry per weekday in the date range.
+        
+        Args:
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            time_range: Daily time range (HH:MM-HH:MM)
+            tz: pytz timezone the time range is expressed in
+            interval_minutes: Interval in minutes for availability views
+        
+        Returns:
+            Timeline covering the working days of the range
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        
+        # Parse the daily range once instead of once per day
+        start_hour, end_hour = time_range.split('-')
+        start_clock = datetime.strptime(start_hour, '%H:%M').time()
+        end_clock = datetime.strptime(end_hour, '%H:%M').time()
+        day_minutes = (
+            (end_clock.hour - start_clock.hour) * 60 + end_clock.minute - start_clock.minute
+        )
+        
+        timeline = cls(interval_minutes)
+        current = start
+        
+        while current <= end:
+            # Skip weekends (Saturday=5, Sunday=6)
+            if current.weekday() < 5:
+                local_start = tz.localize(datetime.combine(current, start_clock))
+                timeline.add_day(
+                    current,
+                    int(local_start.timestamp()) // 60,
+                    int(local_start.utcoffset().total_seconds()) // 60,
+                    max(day_minutes, 0)
+                )
+            current += timedelta(days=1)
+        
+        return timeline
+    
+    @classmethod
+    def from_start(
+        cls,
+        start_time: datetime,
+        length: int,
+        interval_minutes: int = 30
+    ) -> 'Timeline':
+        """Build a single-day timeline starting at an aware or naive datetime."""
+        offset = start_time.utcoffset()
+        timeline = cls(interval_minutes, naive=offset is None)
+        offset_minutes = int(offset.total_seconds()) // 60 if offset is not None else 0
+        naive = start_time.replace(tzinfo=None)
+        epoch_minute = int((naive - datetime(1970, 1, 1)).total_seconds()) // 60 - offset_minutes
+        timeline.add_day(start_time.date(), epoch_minute, offset_minutes, length * interval_minutes)
+        return timeline
+    
+    def add_day(self, day: date, start_minute: int, offset_minutes: int, span_minutes: int):
+        """Append a day whose window starts at ``start_minute`` (epoch minutes)."""
+        self.day_dates.append(day)
+        self.day_starts.append(start_minute)
+        self.day_offsets.append(offset_minutes)
+        self.day_spans.append(span_minutes)
+        self.day_lengths.append(span_minutes // self.interval_minutes)
+    
+    def __len__(self) -> int:
+        return len(self.day_starts)
+    
+    def window_index(self, intervals_needed: int) -> Tuple[array, array]:
+        """
+        Precompute the (day, interval) columns of every candidate window.
+        
+        Args:
+            intervals_needed: Number of intervals a window spans
+        
+        Returns:
+            Parallel arrays of day indices and interval offsets
+        """
+        days = array('i')
+        offsets = array('i')
+        for day, length in enumerate(self.day_lengths):
+            count = max(length - intervals_needed + 1, 0)
+            days.extend([day] * count)
+            offsets.extend(range(count))
+        return days, offsets
+    
+    def minute_of(self, day: int, index: int) -> int:
+        """Epoch minute at which interval ``index`` of ``day`` starts."""
+        return self.day_starts[day] + index * self.interval_minutes
+    
+    def to_datetime(self, day: int, epoch_minute: int) -> datetime:
+        """Materialize an epoch minute in the given day's UTC offset."""
+        offset = self.day_offsets[day]
+        if self.naive:
+            return datetime(1970, 1, 1) + timedelta(minutes=epoch_minute + offset)
+        tz = dt_timezone(timedelta(minutes=offset))
+        return datetime.fromtimestamp(epoch_minute * 60, tz)
+    
+    def isoformat(self, day: int, epoch_minute: int) -> str:
+        """ISO 8601 string for an epoch minute, e.g. ``2025-11-19T10:00:00+03:00``."""
+        return self.to_datetime(day, epoch_minute).isoformat()
+    
+    def day_bounds(self, day: int) -> Tuple[str, str]:
+        """ISO 8601 (start, end) of a day's search window."""
+        start = self.day_starts[day]
+        end = start + self.day_spans[day]
+        return self.isoformat(day, start), self.isoformat(day, end)
@@ -0,0 +1,218 @@
+"""Per-participant working-hours masks derived from getSchedule workingHours."""
+from functools import lru_cache
+from typing import Dict, Any, Tuple, Optional
+from datetime import date, datetime, time, timedelta
+import pytz
+from timeline import Timeline
+
+
+# Windows time zone names Graph uses in workingHours, mapped to IANA names
+WINDOWS_TIMEZONES = {
+    'Turkey Standard Time': 'Europe/Istanbul',
+    'UTC': 'UTC',
+    'GMT Standard Time': 'Europe/London',
+    'W. Europe Standard Time': 'Europe/Berlin',
+    'Romance Standard Time': 'Europe/Paris',
+    'Central Europe Standard Time': 'Europe/Budapest',
+    'Central European Standard Time': 'Europe/Warsaw',
+    'E. Europe Standard Time': 'Europe/Chisinau',
+    'FLE Standard Time': 'Europe/Kiev',
+    'GTB Standard Time': 'Europe/Bucharest',
+    'Russian Standard Time': 'Europe/Moscow',
+    'Arabian Standard Time': 'Asia/Dubai',
+    'India Standard Time': 'Asia/Kolkata',
+    'China Standard Time': 'Asia/Shanghai',
+    'Singapore Standard Time': 'Asia/Singapore',
+    'Tokyo Standard Time': 'Asia/Tokyo',
+    'AUS Eastern Standard Time': 'Australia/Sydney',
+    'Eastern Standard Time': 'America/New_York',
+    'Central Standard Time': 'America/Chicago',
+    'Mountain Standard Time': 'America/Denver',
+    'Pacific Standard Time': 'America/Los_Angeles',
+    'E. South America Standard Time': 'America/Sao_Paulo',
+}
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# A pattern is (IANA time zone, working weekdays, start HH:MM, end HH:MM)
+Pattern = Tuple[str, Tuple[int, ...], str, str]
+
+
+def resolve_timezone(name: Optional[str]) -> Optional[str]:
+    """
+    Map a workingHours time zone name to an IANA name.
+    
+    Returns:
+        IANA name, or None when the name is unknown
+    """
+    if not name:
+        return None
+    name = WINDOWS_TIMEZONES.get(name, name)
+    return name if name in pytz.all_timezones_set else None
+
+
+def pattern_of(working_hours: Optional[Dict[str, Any]]) -> Optional[Pattern]:
+    """
+    Normalize a workingHours block into a hashable pattern.
+    
+    Returns:
+        Pattern, or None when the block is missing or its time zone is unknown
+    """
+    if not working_hours:
+        return None
+    timezone = resolve_timezone((working_hours.get('timeZone') or {}).get('name'))
+    if timezone is None or 'startTime' not in working_hours or 'endTime' not in working_hours:
+        return None
+    days = tuple(sorted(
+        WEEKDAYS.index(day) for day in working_hours.get('daysOfWeek', []) if day in WEEKDAYS
+    ))
+    return (timezone, days, working_hours['startTime'][:5], working_hours['endTime'][:5])
+
+
+@lru_cache(maxsize=4096)
+def working_ranges(pattern: Pattern, week: date) -> Tuple[Tuple[int, int], ...]:
+    """
+    Working time of one pattern during one week, in epoch minutes.
+    
+    Cached per (pattern, week): every participant sharing a pattern reuses
+    the same ranges, and time zone conversion happens once per working day.
+    
+    Args:
+        pattern: Working-hours pattern
+        week: Monday of the week, in the pattern's own time zone
+    
+    Returns:
+        (start, end) ranges, one per working day
+    """
+    timezone, days, start_clock, end_clock = pattern
+    tz = pytz.timezone(timezone)
+    start_time = time.fromisoformat(start_clock)
+    end_time = time.fromisoformat(end_clock)
+    ranges = []
+    for weekday in days:
+        current = week + timedelta(days=weekday)
+        start = tz.localize(datetime.combine(current, start_time))
+        # Night shifts end on the following day
+        end_day = current + timedelta(days=1) if end_time <= start_time else current
+        end = tz.localize(datetime.combine(end_day, end_time))
+        ranges.append((int(start.timestamp()) // 60, int(end.timestamp()) // 60))
+    return tuple(ranges)
+
+
+@lru_cache(maxsize=16384)
+def off_hours_runs(
+    pattern: Pattern,
+    day_start: int,
+    length: int,
+    interval: int
+) -> Tuple[Tuple[int, int], ...]:
+    """
+    Intervals of a search day that fall outside a pattern's working hours.
+    
+    Args:
+        pattern: Working-hours pattern
+        day_start: Epoch minute of the day's first interval
+        length: Number of intervals in the day
+        interval: Interval length in minutes
+    
+    Returns:
+        [first, stop) runs of interval indices outside working hours
+    """
+    # The search day can touch the neighbouring weeks in the pattern's zone
+    local_day = datetime.fromtimestamp(day_start * 60, pytz.timezone(pattern[0])).date()
+    weeks = {
+        local_day - timedelta(days=local_day.weekday() + 7 * shift)
+        for shift in (-1, 0, 1)
+    }
+    working = [False] * length
+    for week in weeks:
+        for start, end in working_ranges(pattern, week):
+            first = max(-(-(start - day_start) // interval), 0)
+            stop = min((end - day_start) // interval, length)
+            for index in range(first, stop):
+                working[index] = True
+    
+    runs = []
+    index = 0
+    while index < length:
+        if working[index]:
+            index += 1
+            continue
+        first = index
+        while index < length and not working[index]:
+            index += 1
+        runs.append((first, index))
+    return tuple(runs)
+
+
+def apply_working_hours(
+    timeline: Timeline,
+    day_schedules: Dict[int, Dict[str, Any]]
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Mark time outside each participant's working hours as busy.
+    
+    Masks are computed once per (pattern, day) and applied to every
+    participant that shares the pattern with string slicing, so the cost
+    does not grow with the number of windows scanned later. Participants
+    without usable workingHours are left unchanged.
+    
+    Args:
+        timeline: Timeline the schedules were fetched for
+        day_schedules: getSchedule data keyed by timeline day index
+    
+    Returns:
+        New day_schedules with masked availabilityView and scheduleItems
+    """
+    interval = timeline.interval_minutes
+    masked = {}
+    
+    for day, schedule_data in day_schedules.items():
+        day_start = timeline.day_starts[day]
+        schedules = []
+        for schedule in schedule_data.get('value', []):
+            pattern = pattern_of(schedule.get('workingHours'))
+            view = schedule.get('availabilityView', '')
+            if pattern is None or not view:
+                schedules.append(schedule)
+                continue
+            
+            runs = off_hours_runs(pattern, day_start, len(view), interval)
+            if not runs:
+                schedules.append(schedule)
+                continue
+            
+            parts = []
+            cursor = 0
+            for first, stop in runs:
+                parts.append(view[cursor:first])
+                parts.append('3' * (stop - first))
+                cursor = stop
+            parts.append(view[cursor:])
+            
+            updated = {**schedule, 'availabilityView': ''.join(parts)}
+            if schedule.get('scheduleItems'):
+                updated['scheduleItems'] = schedule['scheduleItems'] + [
+                    _off_hours_item(timeline, day, first, stop) for first, stop in runs
+                ]
+            schedules.append(updated)
+        
+        masked[day] = {**schedule_data, 'value': schedules}
+    
+    return masked
+
+
+def _off_hours_item(timeline: Timeline, day: int, first: int, stop: int) -> Dict[str, Any]:
+    """scheduleItem covering intervals [first, stop) of a day, in UTC."""
+    start = timeline.minute_of(day, first)
+    end = timeline.minute_of(day, stop)
+    return {
+        'status': 'oof',
+        'isOutsideWorkingHours': True,
+        'start': {'dateTime': _utc_iso(start), 'timeZone': 'UTC'},
+        'end': {'dateTime': _utc_iso(end), 'timeZone': 'UTC'}
+    }
+
+
+def _utc_iso(epoch_minute: int) -> str:
+    return (datetime(1970, 1, 1) + timedelta(minutes=epoch_minute)).strftime('%Y-%m-%dT%H:%M:%S')